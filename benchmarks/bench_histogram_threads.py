@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+"""
+A multi-threaded stress benchmark for histogram. Each thread computes the
+histogram (and optionally the reverse indices) of its own array, as per a
+thread pool of tile processors. As the compiled kernels release the GIL,
+the throughput should scale with the number of threads, up to the number
+of cores.
+
+Usage: python bench_histogram_threads.py [nelements] [max_threads]
+"""
+
+from __future__ import print_function
+import sys
+import time
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+import numpy
+from idl_functions import histogram
+
+
+def run(arrays, nthreads, reverse_indices, backend):
+    pool = ThreadPool(nthreads)
+    start = time.time()
+    pool.map(lambda a: histogram(a, minv=0, reverse_indices=reverse_indices,
+                                 backend=backend), arrays)
+    elapsed = time.time() - start
+    pool.close()
+    pool.join()
+    return elapsed
+
+
+def main(nelements, max_threads):
+    print("cpus: {}".format(cpu_count()))
+    for backend in ['fortran', 'numpy']:
+        for reverse_indices in [None, 'ri']:
+            print("backend: {}, reverse_indices: {}".format(
+                backend, reverse_indices is not None))
+            print("{:>10}{:>14}{:>12}".format('threads', 'Melem/s',
+                                              'speedup'))
+            base = None
+            nthreads = 1
+            while (nthreads <= max_threads):
+                arrays = [numpy.random.randint(0, 1000, nelements)
+                          .astype('int32') for _ in range(nthreads)]
+                elapsed = run(arrays, nthreads, reverse_indices, backend)
+                rate = nthreads * nelements / elapsed / 1e6
+                if base is None:
+                    base = rate
+                print("{:>10}{:>14.1f}{:>12.2f}".format(nthreads, rate,
+                                                        rate / base))
+                nthreads *= 2
+
+
+if __name__ == '__main__':
+    nelements = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+    max_threads = int(sys.argv[2]) if len(sys.argv) > 2 else cpu_count()
+    main(nelements, max_threads)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+
+"""
+Measures the time taken to import idl_functions, and to first access a
+selection of its functions, each within a fresh interpreter.
+
+Usage: python bench_import.py [repeats]
+"""
+
+from __future__ import print_function
+import sys
+import subprocess
+
+STATEMENTS = [('import idl_functions', ''),
+              ('bytscl', 'idl_functions.bytscl'),
+              ('histogram', 'idl_functions.histogram'),
+              ('region_grow', 'idl_functions.region_grow')]
+
+SCRIPT = """
+import sys, time
+start = time.time()
+import idl_functions
+{}
+elapsed = time.time() - start
+print(elapsed, int('scipy' in sys.modules))
+"""
+
+
+def main(repeats):
+    print("{:<22}{:>12}{:>12}".format('access', 'best (ms)', 'scipy'))
+    for name, statement in STATEMENTS:
+        results = []
+        for _ in range(repeats):
+            out = subprocess.check_output([sys.executable, '-c',
+                                           SCRIPT.format(statement)])
+            elapsed, scipy = out.split()
+            results.append((float(elapsed), int(scipy)))
+        best = min(results)
+        print("{:<22}{:>12.2f}{:>12}".format(name, best[0] * 1000,
+                                             bool(best[1])))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -1,10 +1,51 @@
 from __future__ import absolute_import
-from .idl_histogram import histogram
-from .idl_bytscl import bytscl
-from .idl_hist_equal import hist_equal
-from .idl_array_indices import array_indices
-from .idl_label_region import label_region
-from .idl_region_grow import region_grow
-from .idl_randomu import randomu
+import sys
+import importlib
 
 __version__ = '0.5.4'
+
+# The public objects and the submodules defining them. The submodules are
+# imported upon first access (PEP 562), so that importing the package
+# doesn't import scipy or load the compiled extensions until required.
+_exports = {'histogram': 'idl_histogram',
+            'bytscl': 'idl_bytscl',
+            'hist_equal': 'idl_hist_equal',
+            'hist_match': 'idl_hist_match',
+            'array_indices': 'idl_array_indices',
+            'array_ravel': 'idl_array_ravel',
+            'label_region': 'idl_label_region',
+            'ReverseIndices': 'idl_reverse_indices',
+            'CompressedReverseIndices': 'idl_reverse_indices',
+            'histogram_sort': 'idl_histogram_sort',
+            'group_by': 'idl_histogram_sort',
+            'bin_percentile': 'idl_bin_percentile',
+            'region_grow': 'idl_region_grow',
+            'region_grow_batch': 'idl_region_grow',
+            'median': 'idl_median',
+            'mode_filter': 'idl_median',
+            'percentile_filter': 'idl_median',
+            'randomu': 'idl_randomu',
+            'randomu_tile': 'idl_randomu',
+            'randomu_tiles': 'idl_randomu'}
+
+__all__ = sorted(_exports)
+
+
+def __getattr__(name):
+    if name not in _exports:
+        msg = "module {!r} has no attribute {!r}".format(__name__, name)
+        raise AttributeError(msg)
+    module = importlib.import_module('.' + _exports[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+# Module level __getattr__ requires Python 3.7
+if sys.version_info < (3, 7):
+    for _name in __all__:
+        __getattr__(_name)
@@ -0,0 +1,252 @@
+MODULE idl_array_indices
+    IMPLICIT NONE
+    ! Author: Josh Sixsmith, josh.sixsmith@gmail.com
+    !
+    ! Copyright
+    !
+    ! Copyright (c) 2014, Josh Sixsmith
+    ! All rights reserved.
+
+    ! Redistribution and use in source and binary forms, with or without
+    ! modification, are permitted provided that the following conditions are met:
+
+    ! 1. Redistributions of source code must retain the above copyright notice, this
+    !    list of conditions and the following disclaimer. 
+    ! 2. Redistributions in binary form must reproduce the above copyright notice,
+    !    this list of conditions and the following disclaimer in the documentation
+    !    and/or other materials provided with the distribution. 
+
+    ! THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ! ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    ! WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+    ! DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+    ! ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+    ! (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+    ! LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+    ! ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+    ! (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+    ! SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+    ! The views and conclusions contained in the software and documentation are those
+    ! of the authors and should not be interpreted as representing official policies, 
+    ! either expressed or implied, of the FreeBSD Project.
+    !
+
+CONTAINS
+
+    SUBROUTINE unravel_int(index, coords, n, dims, ndim, nelements, status)
+       IMPLICIT NONE
+
+       INTEGER*8 :: i, n, ndim, d, nelements
+       INTEGER*4 :: idx, q
+       INTEGER*4, DIMENSION(n), INTENT(IN) :: index
+       !f2py depend(n), index
+       INTEGER*4, DIMENSION(n * ndim), INTENT(INOUT) :: coords
+       !f2py depend(n, ndim), coords
+       INTEGER*4, DIMENSION(ndim), INTENT(IN) :: dims
+       !f2py depend(ndim), dims
+       INTEGER, INTENT(OUT) :: status
+       !f2py threadsafe
+
+       ! coords is a C ordered (ndim, n) array, so the subscript of
+       ! dimension d for index i is located at (d - 1) * n + i
+       ! The bounds are checked during the same sweep; status is set to 1
+       ! and the sweep abandoned upon the first out of bounds index
+       ! The arithmetic is carried out in the kind of coords, as every
+       ! in bounds index is representable by it
+       status = 0
+       do i = 1, n
+          if ((index(i) .lt. 0) .or. (index(i) .ge. nelements)) then
+             status = 1
+             return
+          endif
+          idx = index(i)
+          do d = ndim, 2, -1
+             q = idx / dims(d)
+             coords((d - 1) * n + i) = idx - q * dims(d)
+             idx = q
+          enddo
+          coords(i) = idx
+       enddo
+
+    END SUBROUTINE unravel_int
+
+    SUBROUTINE unravel_long_int(index, coords, n, dims, ndim, nelements, status)
+       IMPLICIT NONE
+
+       INTEGER*8 :: i, n, ndim, d, nelements
+       INTEGER*4 :: idx, q
+       INTEGER*8, DIMENSION(n), INTENT(IN) :: index
+       !f2py depend(n), index
+       INTEGER*4, DIMENSION(n * ndim), INTENT(INOUT) :: coords
+       !f2py depend(n, ndim), coords
+       INTEGER*4, DIMENSION(ndim), INTENT(IN) :: dims
+       !f2py depend(ndim), dims
+       INTEGER, INTENT(OUT) :: status
+       !f2py threadsafe
+
+       ! coords is a C ordered (ndim, n) array, so the subscript of
+       ! dimension d for index i is located at (d - 1) * n + i
+       ! The bounds are checked during the same sweep; status is set to 1
+       ! and the sweep abandoned upon the first out of bounds index
+       ! The arithmetic is carried out in the kind of coords, as every
+       ! in bounds index is representable by it
+       status = 0
+       do i = 1, n
+          if ((index(i) .lt. 0) .or. (index(i) .ge. nelements)) then
+             status = 1
+             return
+          endif
+          idx = index(i)
+          do d = ndim, 2, -1
+             q = idx / dims(d)
+             coords((d - 1) * n + i) = idx - q * dims(d)
+             idx = q
+          enddo
+          coords(i) = idx
+       enddo
+
+    END SUBROUTINE unravel_long_int
+
+    SUBROUTINE unravel_long(index, coords, n, dims, ndim, nelements, status)
+       IMPLICIT NONE
+
+       INTEGER*8 :: i, n, ndim, d, nelements
+       INTEGER*8 :: idx, q
+       INTEGER*8, DIMENSION(n), INTENT(IN) :: index
+       !f2py depend(n), index
+       INTEGER*8, DIMENSION(n * ndim), INTENT(INOUT) :: coords
+       !f2py depend(n, ndim), coords
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims
+       !f2py depend(ndim), dims
+       INTEGER, INTENT(OUT) :: status
+       !f2py threadsafe
+
+       ! coords is a C ordered (ndim, n) array, so the subscript of
+       ! dimension d for index i is located at (d - 1) * n + i
+       ! The bounds are checked during the same sweep; status is set to 1
+       ! and the sweep abandoned upon the first out of bounds index
+       ! The arithmetic is carried out in the kind of coords, as every
+       ! in bounds index is representable by it
+       status = 0
+       do i = 1, n
+          if ((index(i) .lt. 0) .or. (index(i) .ge. nelements)) then
+             status = 1
+             return
+          endif
+          idx = index(i)
+          do d = ndim, 2, -1
+             q = idx / dims(d)
+             coords((d - 1) * n + i) = idx - q * dims(d)
+             idx = q
+          enddo
+          coords(i) = idx
+       enddo
+
+    END SUBROUTINE unravel_long
+
+    SUBROUTINE ravel_int(coords, index, n, dims, ndim, status)
+       IMPLICIT NONE
+
+       INTEGER*8 :: i, n, ndim, d
+       INTEGER*4, DIMENSION(n * ndim), INTENT(IN) :: coords
+       !f2py depend(n, ndim), coords
+       INTEGER*4, DIMENSION(n), INTENT(INOUT) :: index
+       !f2py depend(n), index
+       INTEGER*4, DIMENSION(ndim), INTENT(IN) :: dims
+       !f2py depend(ndim), dims
+       INTEGER*4 :: idx
+       INTEGER, INTENT(OUT) :: status
+       !f2py threadsafe
+
+       ! coords is a C ordered (ndim, n) array, so the subscript of
+       ! dimension d for index i is located at (d - 1) * n + i
+       ! Each subscript is checked against its dimension during the same
+       ! sweep; status is set to 1 and the sweep abandoned upon the first
+       ! out of bounds subscript
+       status = 0
+       do i = 1, n
+          idx = 0
+          do d = 1, ndim
+             if ((coords((d - 1) * n + i) .lt. 0) .or. &
+                 (coords((d - 1) * n + i) .ge. dims(d))) then
+                status = 1
+                return
+             endif
+             idx = idx * dims(d) + coords((d - 1) * n + i)
+          enddo
+          index(i) = idx
+       enddo
+
+    END SUBROUTINE ravel_int
+
+    SUBROUTINE ravel_long_int(coords, index, n, dims, ndim, status)
+       IMPLICIT NONE
+
+       INTEGER*8 :: i, n, ndim, d
+       INTEGER*8, DIMENSION(n * ndim), INTENT(IN) :: coords
+       !f2py depend(n, ndim), coords
+       INTEGER*4, DIMENSION(n), INTENT(INOUT) :: index
+       !f2py depend(n), index
+       INTEGER*4, DIMENSION(ndim), INTENT(IN) :: dims
+       !f2py depend(ndim), dims
+       INTEGER*4 :: idx
+       INTEGER, INTENT(OUT) :: status
+       !f2py threadsafe
+
+       ! coords is a C ordered (ndim, n) array, so the subscript of
+       ! dimension d for index i is located at (d - 1) * n + i
+       ! Each subscript is checked against its dimension during the same
+       ! sweep; status is set to 1 and the sweep abandoned upon the first
+       ! out of bounds subscript
+       status = 0
+       do i = 1, n
+          idx = 0
+          do d = 1, ndim
+             if ((coords((d - 1) * n + i) .lt. 0) .or. &
+                 (coords((d - 1) * n + i) .ge. dims(d))) then
+                status = 1
+                return
+             endif
+             idx = idx * dims(d) + coords((d - 1) * n + i)
+          enddo
+          index(i) = idx
+       enddo
+
+    END SUBROUTINE ravel_long_int
+
+    SUBROUTINE ravel_long(coords, index, n, dims, ndim, status)
+       IMPLICIT NONE
+
+       INTEGER*8 :: i, n, ndim, d
+       INTEGER*8, DIMENSION(n * ndim), INTENT(IN) :: coords
+       !f2py depend(n, ndim), coords
+       INTEGER*8, DIMENSION(n), INTENT(INOUT) :: index
+       !f2py depend(n), index
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims
+       !f2py depend(ndim), dims
+       INTEGER*8 :: idx
+       INTEGER, INTENT(OUT) :: status
+       !f2py threadsafe
+
+       ! coords is a C ordered (ndim, n) array, so the subscript of
+       ! dimension d for index i is located at (d - 1) * n + i
+       ! Each subscript is checked against its dimension during the same
+       ! sweep; status is set to 1 and the sweep abandoned upon the first
+       ! out of bounds subscript
+       status = 0
+       do i = 1, n
+          idx = 0
+          do d = 1, ndim
+             if ((coords((d - 1) * n + i) .lt. 0) .or. &
+                 (coords((d - 1) * n + i) .ge. dims(d))) then
+                status = 1
+                return
+             endif
+             idx = idx * dims(d) + coords((d - 1) * n + i)
+          enddo
+          index(i) = idx
+       enddo
+
+    END SUBROUTINE ravel_long
+END MODULE idl_array_indices
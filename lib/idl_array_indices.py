@@ -2,8 +2,12 @@
 
 from __future__ import absolute_import
 import numpy
+try:
+    import _idl_array_indices
+except ImportError:
+    _idl_array_indices = None
 
-def array_indices(array, index, dimensions=False):
+def array_indices(array, index, dimensions=False, out=None):
     """
     Replicates the array_indices function available within IDL
     (Interactive Data Language, EXELISvis).
@@ -24,9 +28,17 @@ def array_indices(array, index, dimensions=False):
         the dimensions. Default is False. Dimensions are retrieved by
         array.shape.
 
+    :param out:
+        (Optional) A C contiguous int32 or int64 numpy array of shape
+        (ndimensions, n), where n is the number of indices, into which
+        the subscripts will be written. The returned tuple contains
+        views of its rows.
+
     :return:
         A tuple of numpy 1D arrays containing the multi-dimensional
-        subscripts.
+        subscripts. Unless out is given, the subscripts are of type
+        int32 if the number of elements described by the dimensions
+        permit, otherwise int64.
 
     Example:
 
@@ -42,6 +54,9 @@ def array_indices(array, index, dimensions=False):
 
     :history:
         * 23/10/2013: Created
+        * 19/10/2026: Subscripts are computed by a compiled kernel in a
+                      single pass, including the bounds check. Added the
+                      out keyword.
 
     :notes:
         IDL will return an (m x n) array, with each row (n, IDL is [col,row])
@@ -89,66 +104,92 @@ def array_indices(array, index, dimensions=False):
 
     if dimensions:
         dims = array
-        ndimensions = len(dims)
-        nelements = numpy.prod(numpy.array(dims))
     else:
         dims = array.shape
-        ndimensions = len(dims)
-        nelements = numpy.prod(numpy.array(dims))
-
-    if (len(dims) == 3):
-        rows = dims[1]
-        cols = dims[2]
-        bands = dims[0]
-    elif (len(dims) == 2):
-        rows = dims[0]
-        cols = dims[1]
-        bands = 0
-
-    # Calculate min and max for bounds checking
-    min_ = numpy.min(index)
-    max_ = numpy.max(index)
 
-    # Check that the index is not out of bounds.
+    ndimensions = len(dims)
+    dims = numpy.array(dims, dtype='int64')
+    nelements = numpy.prod(dims)
+
+    # 1D case; basically do nothing other than checking the bounds
     # Negatives are legal in python, but make it harder to determine the
     # multi-dimensional index
-    if ((min_ < 0) | (max_ >= nelements)):
-        raise IndexError('Error. Index out of bounds!')
-        return
-
-    # 1D case; basically do nothing
     if (ndimensions <= 1):
+        if ((numpy.min(index) < 0) | (numpy.max(index) >= nelements)):
+            raise IndexError('Error. Index out of bounds!')
         return index
-    # 2D case
-    elif (ndimensions == 2):
-        r = index // cols
-        c = index % cols
-        ind = (r, c)
-        return ind
-    # 3D case
-    elif (ndimensions == 3):
-        b = index // (cols * rows)
-        r = (index % (cols * rows)) // cols
-        c = index % cols
-        ind = (b, r, c)
-        return ind
-    # Higher D order
+
+    scalar = numpy.isscalar(index)
+    index = numpy.atleast_1d(index).ravel()
+    n = index.shape[0]
+
+    if (index.dtype.kind not in 'iu'):
+        index = index.astype('int64')
+
+    if out is None:
+        if (nelements <= numpy.iinfo('int32').max):
+            out = numpy.empty((ndimensions, n), dtype='int32')
+        else:
+            out = numpy.empty((ndimensions, n), dtype='int64')
+    else:
+        if out.dtype.name not in ('int32', 'int64'):
+            raise TypeError('Error. out must be of type int32 or int64.')
+        if ((out.shape != (ndimensions, n)) | (not out.flags.c_contiguous)):
+            msg = ("Error. out must be a C contiguous array of shape "
+                   "(ndimensions, n).")
+            raise ValueError(msg)
+        if ((out.dtype.name == 'int32') &
+                (nelements > numpy.iinfo('int32').max)):
+            raise TypeError('Error. The dimensions require an int64 out.')
+
+    # Select the kernel by name. When the dimensions fit within an int32, any
+    # 32 bit index can be read as an int32 since indices beyond the int32
+    # range are out of bounds anyway, and read as negative.
+    if ((out.dtype.name == 'int32') & (index.dtype.itemsize <= 4)):
+        unravel = 'unravel_int'
+        if (index.dtype.name in ('uint32', 'int32')):
+            index = index.view('int32')
+        else:
+            index = index.astype('int32')
+    else:
+        if (out.dtype.name == 'int32'):
+            unravel = 'unravel_long_int'
+        else:
+            unravel = 'unravel_long'
+        if (index.dtype.name != 'int64'):
+            if (index.dtype.name == 'uint64'):
+                # Indices beyond the int64 range are out of bounds
+                index = index.clip(max=numpy.iinfo('int64').max)
+            index = index.astype('int64')
+
+    if (n == 0):
+        return tuple(out)
+
+    if (_idl_array_indices is None):
+        unravel = _unravel
     else:
-        dims_rv = dims[::-1]
-        i = 1
-        cumu_dims_rv = []
-        for D in dims_rv:
-            i *= D
-            cumu_dims_rv.append(i)
-
-        cumu_dims = cumu_dims_rv[::-1]
-        idx = []
-
-        # Leftmost dimension to rightmost -1 dimension
-        for i in range(1,len(dims)):
-            idx.append((index // cumu_dims[i]) % dims[i-1])
-
-        # For rightmost dimension, ie the columns.
-        idx.append(index % dims[-1])
-        ind = tuple(idx)
-        return ind
+        unravel = getattr(_idl_array_indices.idl_array_indices, unravel)
+
+    status = unravel(index, out.ravel(), n, dims.astype(out.dtype),
+                     ndimensions, nelements)
+
+    # Check that the index is not out of bounds.
+    if (status != 0):
+        raise IndexError('Error. Index out of bounds!')
+        return
+
+    if scalar:
+        return tuple(out[:, 0])
+
+    return tuple(out)
+
+
+def _unravel(index, coords, n, dims, ndim, nelements):
+    """
+    A numpy equivalent of the unravel kernels, used when the compiled
+    extension is unavailable.
+    """
+    if ((index.min() < 0) | (index.max() >= nelements)):
+        return 1
+    coords.reshape(ndim, n)[:] = numpy.unravel_index(index, tuple(dims))
+    return 0
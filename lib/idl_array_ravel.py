@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import numpy
+try:
+    import _idl_array_indices
+except ImportError:
+    _idl_array_indices = None
+
+def array_ravel(array, coords, dimensions=False, out=None):
+    """
+    Converts multi-dimensional subscripts of an array into the
+    corresponding one-dimensional subscripts. The inverse of
+    array_indices, using the same dimension ordering.
+
+    :param array:
+        A numpy array of any type, whose dimensions should be used in
+        converting the subscripts. If dimensions is set to True then
+        array should be a list or tuple containing the dimensions.
+
+    :param coords:
+        A tuple of numpy 1D arrays, one per dimension, containing the
+        multi-dimensional subscripts, such as returned by
+        array_indices. A 2D numpy array of shape (ndimensions, n) is
+        also accepted.
+
+    :param dimensions:
+        If set to True, then array should be a list or tuple containing
+        the dimensions. Default is False. Dimensions are retrieved by
+        array.shape.
+
+    :param out:
+        (Optional) A contiguous 1D int32 or int64 numpy array of length
+        n, into which the one-dimensional subscripts will be written.
+
+    :return:
+        A numpy 1D array containing the one-dimensional subscripts.
+        Unless out is given, the subscripts are of type int32 if the
+        number of elements described by the dimensions permit,
+        otherwise int64.
+
+    Example:
+
+        >>> a = numpy.random.randint(0,256,(100,100))
+        >>> wh = numpy.where(a == 66)
+        >>> ind1D = array_ravel(a, wh)
+        >>> # Using the dimensions keyword
+        >>> ind1D_b = array_ravel(a.shape, wh, dimensions=True)
+
+    :author:
+        Josh Sixsmith, josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au
+
+    :history:
+        * 19/10/2026: Created
+
+    :notes:
+        The subscripts are converted by a compiled kernel in a single
+        pass, which also checks that each subscript lies within its
+        dimension. If the subscripts are the rows of a single
+        (ndimensions, n) array, as returned by array_indices, then they
+        are read in place, otherwise they are first stacked into one.
+
+    :copyright:
+        Copyright (c) 2014, Josh Sixsmith
+        All rights reserved.
+
+        Redistribution and use in source and binary forms, with or without
+        modification, are permitted provided that the following conditions are met:
+
+        1. Redistributions of source code must retain the above copyright notice, this
+           list of conditions and the following disclaimer.
+        2. Redistributions in binary form must reproduce the above copyright notice,
+           this list of conditions and the following disclaimer in the documentation
+           and/or other materials provided with the distribution.
+
+        THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+        ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+        WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+        DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+        ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+        (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+        LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+        ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+        (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+        SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+        The views and conclusions contained in the software and documentation are those
+        of the authors and should not be interpreted as representing official policies,
+        either expressed or implied, of the FreeBSD Project.
+
+    """
+
+    if dimensions:
+        dims = array
+    else:
+        dims = array.shape
+
+    ndimensions = len(dims)
+    dims = numpy.array(dims, dtype='int64')
+    nelements = numpy.prod(dims)
+
+    coords = _stack(coords)
+
+    if (coords.ndim != 2) | (coords.shape[0] != ndimensions):
+        msg = ("Error. coords must contain a subscript array for each "
+               "dimension.")
+        raise ValueError(msg)
+
+    n = coords.shape[1]
+
+    if (coords.dtype.kind not in 'iu'):
+        msg = "Error. coords must contain integer subscripts."
+        raise TypeError(msg)
+
+    if out is None:
+        if (nelements <= numpy.iinfo('int32').max):
+            out = numpy.empty((n,), dtype='int32')
+        else:
+            out = numpy.empty((n,), dtype='int64')
+    else:
+        if out.dtype.name not in ('int32', 'int64'):
+            raise TypeError('Error. out must be of type int32 or int64.')
+        if ((out.shape != (n,)) | (not out.flags.c_contiguous)):
+            msg = "Error. out must be a contiguous array of length n."
+            raise ValueError(msg)
+        if ((out.dtype.name == 'int32') &
+                (nelements > numpy.iinfo('int32').max)):
+            raise TypeError('Error. The dimensions require an int64 out.')
+
+    # Select the kernel by name. int32 subscripts are read in place, anything
+    # else is converted to int64.
+    if ((out.dtype.name == 'int32') & (coords.dtype.name == 'int32')):
+        ravel = 'ravel_int'
+    else:
+        if (out.dtype.name == 'int32'):
+            ravel = 'ravel_long_int'
+        else:
+            ravel = 'ravel_long'
+        if (coords.dtype.name != 'int64'):
+            if (coords.dtype.name == 'uint64'):
+                # Subscripts beyond the int64 range are out of bounds
+                coords = coords.clip(max=numpy.iinfo('int64').max)
+            coords = coords.astype('int64')
+
+    if (n == 0):
+        return out
+
+    if (_idl_array_indices is None):
+        ravel = _ravel
+    else:
+        ravel = getattr(_idl_array_indices.idl_array_indices, ravel)
+
+    status = ravel(coords.ravel(), out, n, dims.astype(out.dtype),
+                   ndimensions)
+
+    if (status != 0):
+        raise IndexError('Error. Subscript out of bounds!')
+
+    return out
+
+
+def _stack(coords):
+    """
+    Returns the subscripts as a single C contiguous (ndimensions, n)
+    array, avoiding a copy if they are already the rows of one.
+    """
+    if (type(coords) == numpy.ndarray):
+        return numpy.ascontiguousarray(coords)
+
+    if not ((type(coords) == list) | (type(coords) == tuple)):
+        msg = "Error. coords must be a tuple of 1D numpy arrays."
+        raise TypeError(msg)
+
+    base = getattr(coords[0], 'base', None)
+    if ((type(base) == numpy.ndarray) and base.flags.c_contiguous and
+            (base.shape == (len(coords), numpy.size(coords[0])))):
+        inplace = True
+        for i, c in enumerate(coords):
+            if ((type(c) != numpy.ndarray) or (c.base is not base) or
+                    (c.ctypes.data != base[i].ctypes.data) or
+                    (c.shape != base[i].shape) or (c.dtype != base.dtype)):
+                inplace = False
+                break
+        if inplace:
+            return base
+
+    return numpy.vstack([numpy.atleast_1d(c) for c in coords])
+
+
+def _ravel(coords, index, n, dims, ndim):
+    """
+    A numpy equivalent of the ravel kernels, used when the compiled
+    extension is unavailable.
+    """
+    coords = coords.reshape(ndim, n)
+    if ((coords < 0) | (coords >= dims.reshape(ndim, 1))).any():
+        return 1
+    index[:] = numpy.ravel_multi_index(tuple(coords), tuple(dims))
+    return 0
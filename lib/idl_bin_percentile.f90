@@ -0,0 +1,263 @@
+MODULE idl_bin_percentile
+    IMPLICIT NONE
+    ! Author: Josh Sixsmith, josh.sixsmith@gmail.com
+    !
+    ! Copyright
+    !
+    ! Copyright (c) 2014, Josh Sixsmith
+    ! All rights reserved.
+
+    ! Redistribution and use in source and binary forms, with or without
+    ! modification, are permitted provided that the following conditions are met:
+
+    ! 1. Redistributions of source code must retain the above copyright notice, this
+    !    list of conditions and the following disclaimer. 
+    ! 2. Redistributions in binary form must reproduce the above copyright notice,
+    !    this list of conditions and the following disclaimer in the documentation
+    !    and/or other materials provided with the distribution. 
+
+    ! THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ! ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    ! WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+    ! DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+    ! ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+    ! (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+    ! LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+    ! ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+    ! (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+    ! SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+    ! The views and conclusions contained in the software and documentation are those
+    ! of the authors and should not be interpreted as representing official policies, 
+    ! either expressed or implied, of the FreeBSD Project.
+    !
+
+CONTAINS
+
+    SUBROUTINE select_float(a, n, l0, r0, k)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, l0, r0, k, l, r, i, j, m
+       REAL*4, DIMENSION(n), INTENT(INOUT) :: a
+       REAL*4 :: pivot, tmp
+
+       ! Hoare's selection; upon return a(k) is the k-th smallest value of
+       ! a(l0:r0), with a(l0:k-1) <= a(k) <= a(k+1:r0)
+       l = l0
+       r = r0
+       do while (r .gt. l)
+          ! Median of three pivot
+          m = l + (r - l) / 2
+          if (a(m) .lt. a(l)) then
+             tmp = a(m)
+             a(m) = a(l)
+             a(l) = tmp
+          endif
+          if (a(r) .lt. a(l)) then
+             tmp = a(r)
+             a(r) = a(l)
+             a(l) = tmp
+          endif
+          if (a(r) .lt. a(m)) then
+             tmp = a(r)
+             a(r) = a(m)
+             a(m) = tmp
+          endif
+          pivot = a(m)
+          i = l
+          j = r
+          do while (i .le. j)
+             do while (a(i) .lt. pivot)
+                i = i + 1
+             enddo
+             do while (a(j) .gt. pivot)
+                j = j - 1
+             enddo
+             if (i .le. j) then
+                tmp = a(i)
+                a(i) = a(j)
+                a(j) = tmp
+                i = i + 1
+                j = j - 1
+             endif
+          enddo
+          if (k .le. j) then
+             r = j
+          else if (k .ge. i) then
+             l = i
+          else
+             return
+          endif
+       enddo
+
+    END SUBROUTINE select_float
+
+    SUBROUTINE bin_percentile_float(array, ri, work, pct, res, n, nri, &
+                                     nbins, npct, nwork)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, nri, nbins, npct, nwork
+       INTEGER*8 :: b, q, i, cnt, lo, k, start
+       REAL*8 :: pos, frac, vlo, vhi
+       REAL*4, DIMENSION(n), INTENT(IN) :: array
+       !f2py depend(n), array
+       INTEGER*4, DIMENSION(nri), INTENT(IN) :: ri
+       !f2py depend(nri), ri
+       REAL*4, DIMENSION(nwork), INTENT(INOUT) :: work
+       !f2py depend(nwork), work
+       REAL*8, DIMENSION(npct), INTENT(IN) :: pct
+       !f2py depend(npct), pct
+       REAL*8, DIMENSION(npct * nbins), INTENT(INOUT) :: res
+       !f2py depend(npct, nbins), res
+       !f2py threadsafe
+
+       ! ri is the IDL layout of reverse indices, ri(1:nbins+1) being the
+       ! offsets (0 based) of each bin within ri, and the remainder the
+       ! 0 based indices of array
+       ! pct holds the percentiles as fractions, sorted in ascending order
+       ! res is a C ordered (npct, nbins) array, and empty bins are left
+       ! untouched
+       do b = 1, nbins
+          cnt = ri(b + 1) - ri(b)
+          if (cnt .eq. 0) cycle
+          start = ri(b)
+          do i = 1, cnt
+             work(i) = array(ri(start + i) + 1)
+          enddo
+
+          ! As the percentiles are ascending, each selection need only
+          ! partition the values to the right of the previous one
+          lo = 1
+          do q = 1, npct
+             pos = pct(q) * (cnt - 1)
+             k = int(pos, 8) + 1
+             frac = pos - (k - 1)
+             call select_float(work, nwork, lo, cnt, k)
+             lo = k
+             vlo = work(k)
+             if ((frac .gt. 0) .and. (k .lt. cnt)) then
+                call select_float(work, nwork, k + 1, cnt, k + 1)
+                vhi = work(k + 1)
+                res((q - 1) * nbins + b) = vlo + (vhi - vlo) * frac
+             else
+                res((q - 1) * nbins + b) = vlo
+             endif
+          enddo
+       enddo
+
+    END SUBROUTINE bin_percentile_float
+
+    SUBROUTINE select_dfloat(a, n, l0, r0, k)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, l0, r0, k, l, r, i, j, m
+       REAL*8, DIMENSION(n), INTENT(INOUT) :: a
+       REAL*8 :: pivot, tmp
+
+       ! Hoare's selection; upon return a(k) is the k-th smallest value of
+       ! a(l0:r0), with a(l0:k-1) <= a(k) <= a(k+1:r0)
+       l = l0
+       r = r0
+       do while (r .gt. l)
+          ! Median of three pivot
+          m = l + (r - l) / 2
+          if (a(m) .lt. a(l)) then
+             tmp = a(m)
+             a(m) = a(l)
+             a(l) = tmp
+          endif
+          if (a(r) .lt. a(l)) then
+             tmp = a(r)
+             a(r) = a(l)
+             a(l) = tmp
+          endif
+          if (a(r) .lt. a(m)) then
+             tmp = a(r)
+             a(r) = a(m)
+             a(m) = tmp
+          endif
+          pivot = a(m)
+          i = l
+          j = r
+          do while (i .le. j)
+             do while (a(i) .lt. pivot)
+                i = i + 1
+             enddo
+             do while (a(j) .gt. pivot)
+                j = j - 1
+             enddo
+             if (i .le. j) then
+                tmp = a(i)
+                a(i) = a(j)
+                a(j) = tmp
+                i = i + 1
+                j = j - 1
+             endif
+          enddo
+          if (k .le. j) then
+             r = j
+          else if (k .ge. i) then
+             l = i
+          else
+             return
+          endif
+       enddo
+
+    END SUBROUTINE select_dfloat
+
+    SUBROUTINE bin_percentile_dfloat(array, ri, work, pct, res, n, nri, &
+                                     nbins, npct, nwork)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, nri, nbins, npct, nwork
+       INTEGER*8 :: b, q, i, cnt, lo, k, start
+       REAL*8 :: pos, frac, vlo, vhi
+       REAL*8, DIMENSION(n), INTENT(IN) :: array
+       !f2py depend(n), array
+       INTEGER*4, DIMENSION(nri), INTENT(IN) :: ri
+       !f2py depend(nri), ri
+       REAL*8, DIMENSION(nwork), INTENT(INOUT) :: work
+       !f2py depend(nwork), work
+       REAL*8, DIMENSION(npct), INTENT(IN) :: pct
+       !f2py depend(npct), pct
+       REAL*8, DIMENSION(npct * nbins), INTENT(INOUT) :: res
+       !f2py depend(npct, nbins), res
+       !f2py threadsafe
+
+       ! ri is the IDL layout of reverse indices, ri(1:nbins+1) being the
+       ! offsets (0 based) of each bin within ri, and the remainder the
+       ! 0 based indices of array
+       ! pct holds the percentiles as fractions, sorted in ascending order
+       ! res is a C ordered (npct, nbins) array, and empty bins are left
+       ! untouched
+       do b = 1, nbins
+          cnt = ri(b + 1) - ri(b)
+          if (cnt .eq. 0) cycle
+          start = ri(b)
+          do i = 1, cnt
+             work(i) = array(ri(start + i) + 1)
+          enddo
+
+          ! As the percentiles are ascending, each selection need only
+          ! partition the values to the right of the previous one
+          lo = 1
+          do q = 1, npct
+             pos = pct(q) * (cnt - 1)
+             k = int(pos, 8) + 1
+             frac = pos - (k - 1)
+             call select_dfloat(work, nwork, lo, cnt, k)
+             lo = k
+             vlo = work(k)
+             if ((frac .gt. 0) .and. (k .lt. cnt)) then
+                call select_dfloat(work, nwork, k + 1, cnt, k + 1)
+                vhi = work(k + 1)
+                res((q - 1) * nbins + b) = vlo + (vhi - vlo) * frac
+             else
+                res((q - 1) * nbins + b) = vlo
+             endif
+          enddo
+       enddo
+
+    END SUBROUTINE bin_percentile_dfloat
+
+END MODULE idl_bin_percentile
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import numpy
+from idl_functions.idl_reverse_indices import CompressedReverseIndices
+try:
+    import _idl_bin_percentile
+except ImportError:
+    _idl_bin_percentile = None
+
+# The number of indices decoded at a time from compressed reverse indices
+CHUNK_SIZE = 2**22
+
+def bin_percentile(array, reverse_indices, percentile=50):
+    """
+    Computes percentiles of array for every bin of a histogram, driven
+    by the reverse indices.
+
+    The values of each bin are partitioned by a selection algorithm
+    rather than sorted, and every bin is evaluated within a single
+    compiled call.
+
+    :param array:
+        A numpy array of any dimension containing the values from which
+        to compute the percentiles. It is treated as 1D.
+
+    :param reverse_indices:
+        The reverse indices of a histogram whose bins define the groups,
+        i.e. histogram(zones, reverse_indices='ri')['ri'], where zones
+        has the same number of elements as array. A ReverseIndices
+        instance is also accepted, and a CompressedReverseIndices is
+        decoded a group of bins (of up to CHUNK_SIZE indices) at a time.
+
+    :param percentile:
+        A scalar or list of percentiles in the range [0, 100]. Default
+        is 50, i.e. the median. Values between ranks are linearly
+        interpolated, as per numpy.percentile.
+
+    :return:
+        A float64 numpy array of length nbins containing the percentile
+        of each bin. If percentile is a list, an array of shape
+        (npercentiles, nbins). Empty bins are NaN.
+
+    Example:
+
+        >>> h = histogram(zones, minv=0, reverse_indices='ri')
+        >>> median = bin_percentile(image, h['ri'])
+        >>> p5, p95 = bin_percentile(image, h['ri'], [5, 95])
+
+    :notes:
+        NaN's within array are not accounted for, and will yield an
+        undefined result for the bins that contain them.
+
+    :author:
+        Josh Sixsmith, josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au
+
+    :history:
+        * 19/10/2026: Created
+        * 19/10/2026: CompressedReverseIndices are decoded a group of
+                      bins at a time.
+
+    :copyright:
+        Copyright (c) 2014, Josh Sixsmith
+        All rights reserved.
+
+        Redistribution and use in source and binary forms, with or without
+        modification, are permitted provided that the following conditions are met:
+
+        1. Redistributions of source code must retain the above copyright notice, this
+           list of conditions and the following disclaimer.
+        2. Redistributions in binary form must reproduce the above copyright notice,
+           this list of conditions and the following disclaimer in the documentation
+           and/or other materials provided with the distribution.
+
+        THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+        ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+        WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+        DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+        ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+        (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+        LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+        ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+        (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+        SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+        The views and conclusions contained in the software and documentation are those
+        of the authors and should not be interpreted as representing official policies,
+        either expressed or implied, of the FreeBSD Project.
+
+    """
+    dtype = array.dtype.name
+    if dtype not in ['int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32',
+                     'int64', 'uint64', 'float32', 'float64']:
+        msg = ("Error. Incompatable Data Type. Compatable Data Types "
+               "Include: int8, uint8, int16, uint16, int32, uint32, int64, "
+               "uint64, float32, float64")
+        raise TypeError(msg)
+
+    scalar = numpy.isscalar(percentile)
+    pct = numpy.atleast_1d(percentile).astype('float64')
+    if ((pct.min() < 0) | (pct.max() > 100)):
+        raise ValueError('Error. percentile must be between 0 and 100.')
+
+    if isinstance(reverse_indices, CompressedReverseIndices):
+        nbins = reverse_indices.nbins
+        counts = reverse_indices.histogram
+        groups = _decoded_groups(reverse_indices)
+    else:
+        ri = numpy.asarray(reverse_indices)
+        if (ri.ndim != 1):
+            raise TypeError('Error. reverse_indices must be a 1D array.')
+        nbins = int(ri[0]) - 1
+        if (ri.dtype.name == 'uint32'):
+            ri = ri.view('int32')
+        ri = numpy.ascontiguousarray(ri.astype('int32', copy=False))
+        counts = ri[1:nbins+1] - ri[0:nbins]
+        groups = [(0, ri)]
+
+    # The kernel evaluates the percentiles in ascending order
+    order = numpy.argsort(pct)
+    res = numpy.zeros((pct.shape[0], nbins), dtype='float64')
+
+    if (_idl_bin_percentile is None):
+        func = _bin_percentile
+        values = array.ravel()
+    elif (dtype == 'float32'):
+        func = _idl_bin_percentile.idl_bin_percentile.bin_percentile_float
+        values = numpy.ascontiguousarray(array).ravel()
+    else:
+        func = _idl_bin_percentile.idl_bin_percentile.bin_percentile_dfloat
+        values = numpy.ascontiguousarray(array).ravel().astype('float64',
+                                                               copy=False)
+
+    for first, ri in groups:
+        ng = int(ri[0]) - 1
+        if (ri.shape[0] == ng + 1):
+            continue
+        if (ri[ng+1:].max() >= array.size):
+            raise IndexError('Error. reverse_indices exceed the array size.')
+
+        # Scratch space for the values of the largest bin
+        nwork = int(numpy.diff(ri[0:ng+1]).max())
+        work = numpy.zeros(nwork, dtype=values.dtype)
+        out = numpy.zeros(pct.shape[0] * ng, dtype='float64')
+        func(values, ri, work, pct[order] / 100.0, out, values.shape[0],
+             ri.shape[0], ng, pct.shape[0], nwork)
+        res[:, first:first+ng] = out.reshape(pct.shape[0], ng)
+
+    res[:, counts == 0] = numpy.nan
+    result = numpy.empty_like(res)
+    result[order] = res
+
+    if scalar:
+        return result[0]
+
+    return result
+
+
+def _bin_percentile(array, ri, work, pct, res, n, nri, nbins, npct, nwork):
+    """
+    A numpy equivalent of the bin_percentile kernels, used when the
+    compiled extension is unavailable.
+    """
+    res = res.reshape(npct, nbins)
+    for i in range(nbins):
+        if (ri[i+1] > ri[i]):
+            res[:, i] = numpy.percentile(array[ri[ri[i]:ri[i+1]]], pct * 100)
+
+
+def _decoded_groups(ri):
+    """
+    Yields (first, ri) for groups of consecutive bins of a
+    CompressedReverseIndices holding up to CHUNK_SIZE indices, or a
+    single bin; first being the first bin of a group, and ri the raw
+    (int32) reverse indices of the group.
+    """
+    counts = ri.histogram.astype('int64')
+    ends = numpy.cumsum(counts)
+    first = 0
+    while (first < ri.nbins):
+        start = ends[first] - counts[first]
+        last = numpy.searchsorted(ends, start + CHUNK_SIZE, side='right')
+        last = max(first + 1, int(last))
+        ng = last - first
+
+        raw = numpy.empty(ng + 1 + int(ends[last-1] - start), dtype='int32')
+        raw[0] = ng + 1
+        raw[1:ng+1] = ng + 1 + ends[first:last] - start
+        raw[ng+1:] = ri.bins(numpy.arange(first, last)).view('int32')
+        yield first, raw
+
+        first = last
@@ -0,0 +1,415 @@
+MODULE idl_hist_match
+    IMPLICIT NONE
+    ! Author: Josh Sixsmith, josh.sixsmith@gmail.com
+    !
+    ! Copyright
+    !
+    ! Copyright (c) 2014, Josh Sixsmith
+    ! All rights reserved.
+
+    ! Redistribution and use in source and binary forms, with or without
+    ! modification, are permitted provided that the following conditions are met:
+
+    ! 1. Redistributions of source code must retain the above copyright notice, this
+    !    list of conditions and the following disclaimer. 
+    ! 2. Redistributions in binary form must reproduce the above copyright notice,
+    !    this list of conditions and the following disclaimer in the documentation
+    !    and/or other materials provided with the distribution. 
+
+    ! THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ! ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    ! WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+    ! DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+    ! ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+    ! (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+    ! LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+    ! ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+    ! (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+    ! SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+    ! The views and conclusions contained in the software and documentation are those
+    ! of the authors and should not be interpreted as representing official policies, 
+    ! either expressed or implied, of the FreeBSD Project.
+    !
+
+CONTAINS
+
+    ! Applies a lookup table to the histogram bins of an array, the
+    ! entries being copied as bytes so that the table can be of any
+    ! type.
+
+    SUBROUTINE apply_lut_int8(array, lut, out, n, l_sz, o_sz, nbins, sz, min_, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, l_sz, o_sz, nbins, sz, i, b, k, o, l
+       INTEGER*1, DIMENSION(n), INTENT(IN) :: array
+       !f2py depend(n), array
+
+       INTEGER*1, DIMENSION(l_sz), INTENT(IN) :: lut
+       !f2py depend(l_sz), lut
+
+       INTEGER*1, DIMENSION(o_sz), INTENT(INOUT) :: out
+       !f2py depend(o_sz), out
+
+       INTEGER*8 :: min_, v
+       REAL*8 :: binsz, x
+       !f2py threadsafe
+
+       ! The bin of each element is computed as per the histogram kernels,
+       ! elements beyond the first or last bin being assigned to it.
+       ! lut holds an entry of sz bytes per bin, which is copied to out.
+       do i = 1, n
+          v = int(array(i), 8)
+          if (v .lt. min_) then
+             b = 1
+          else
+             x = (v - min_) / binsz
+             if (x .ge. nbins) then
+                b = nbins
+             else
+                b = floor(x, 8) + 1
+             endif
+          endif
+          o = (i - 1) * sz
+          l = (b - 1) * sz
+          do k = 1, sz
+             out(o + k) = lut(l + k)
+          enddo
+       enddo
+
+    END SUBROUTINE apply_lut_int8
+
+    SUBROUTINE apply_lut_uint8(array, lut, out, n, l_sz, o_sz, nbins, sz, min_, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, l_sz, o_sz, nbins, sz, i, b, k, o, l
+       INTEGER*1, DIMENSION(n), INTENT(IN) :: array
+       !f2py depend(n), array
+
+       INTEGER*1, DIMENSION(l_sz), INTENT(IN) :: lut
+       !f2py depend(l_sz), lut
+
+       INTEGER*1, DIMENSION(o_sz), INTENT(INOUT) :: out
+       !f2py depend(o_sz), out
+
+       INTEGER*8 :: min_, v
+       REAL*8 :: binsz, x
+       !f2py threadsafe
+
+       ! The bin of each element is computed as per the histogram kernels,
+       ! elements beyond the first or last bin being assigned to it.
+       ! lut holds an entry of sz bytes per bin, which is copied to out.
+       do i = 1, n
+          v = iand(int(array(i), 8), 255_8)
+          if (v .lt. min_) then
+             b = 1
+          else
+             x = (v - min_) / binsz
+             if (x .ge. nbins) then
+                b = nbins
+             else
+                b = floor(x, 8) + 1
+             endif
+          endif
+          o = (i - 1) * sz
+          l = (b - 1) * sz
+          do k = 1, sz
+             out(o + k) = lut(l + k)
+          enddo
+       enddo
+
+    END SUBROUTINE apply_lut_uint8
+
+    SUBROUTINE apply_lut_int16(array, lut, out, n, l_sz, o_sz, nbins, sz, min_, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, l_sz, o_sz, nbins, sz, i, b, k, o, l
+       INTEGER*2, DIMENSION(n), INTENT(IN) :: array
+       !f2py depend(n), array
+
+       INTEGER*1, DIMENSION(l_sz), INTENT(IN) :: lut
+       !f2py depend(l_sz), lut
+
+       INTEGER*1, DIMENSION(o_sz), INTENT(INOUT) :: out
+       !f2py depend(o_sz), out
+
+       INTEGER*8 :: min_, v
+       REAL*8 :: binsz, x
+       !f2py threadsafe
+
+       ! The bin of each element is computed as per the histogram kernels,
+       ! elements beyond the first or last bin being assigned to it.
+       ! lut holds an entry of sz bytes per bin, which is copied to out.
+       do i = 1, n
+          v = int(array(i), 8)
+          if (v .lt. min_) then
+             b = 1
+          else
+             x = (v - min_) / binsz
+             if (x .ge. nbins) then
+                b = nbins
+             else
+                b = floor(x, 8) + 1
+             endif
+          endif
+          o = (i - 1) * sz
+          l = (b - 1) * sz
+          do k = 1, sz
+             out(o + k) = lut(l + k)
+          enddo
+       enddo
+
+    END SUBROUTINE apply_lut_int16
+
+    SUBROUTINE apply_lut_uint16(array, lut, out, n, l_sz, o_sz, nbins, sz, min_, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, l_sz, o_sz, nbins, sz, i, b, k, o, l
+       INTEGER*2, DIMENSION(n), INTENT(IN) :: array
+       !f2py depend(n), array
+
+       INTEGER*1, DIMENSION(l_sz), INTENT(IN) :: lut
+       !f2py depend(l_sz), lut
+
+       INTEGER*1, DIMENSION(o_sz), INTENT(INOUT) :: out
+       !f2py depend(o_sz), out
+
+       INTEGER*8 :: min_, v
+       REAL*8 :: binsz, x
+       !f2py threadsafe
+
+       ! The bin of each element is computed as per the histogram kernels,
+       ! elements beyond the first or last bin being assigned to it.
+       ! lut holds an entry of sz bytes per bin, which is copied to out.
+       do i = 1, n
+          v = iand(int(array(i), 8), 65535_8)
+          if (v .lt. min_) then
+             b = 1
+          else
+             x = (v - min_) / binsz
+             if (x .ge. nbins) then
+                b = nbins
+             else
+                b = floor(x, 8) + 1
+             endif
+          endif
+          o = (i - 1) * sz
+          l = (b - 1) * sz
+          do k = 1, sz
+             out(o + k) = lut(l + k)
+          enddo
+       enddo
+
+    END SUBROUTINE apply_lut_uint16
+
+    SUBROUTINE apply_lut_int32(array, lut, out, n, l_sz, o_sz, nbins, sz, min_, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, l_sz, o_sz, nbins, sz, i, b, k, o, l
+       INTEGER*4, DIMENSION(n), INTENT(IN) :: array
+       !f2py depend(n), array
+
+       INTEGER*1, DIMENSION(l_sz), INTENT(IN) :: lut
+       !f2py depend(l_sz), lut
+
+       INTEGER*1, DIMENSION(o_sz), INTENT(INOUT) :: out
+       !f2py depend(o_sz), out
+
+       INTEGER*8 :: min_, v
+       REAL*8 :: binsz, x
+       !f2py threadsafe
+
+       ! The bin of each element is computed as per the histogram kernels,
+       ! elements beyond the first or last bin being assigned to it.
+       ! lut holds an entry of sz bytes per bin, which is copied to out.
+       do i = 1, n
+          v = int(array(i), 8)
+          if (v .lt. min_) then
+             b = 1
+          else
+             x = (v - min_) / binsz
+             if (x .ge. nbins) then
+                b = nbins
+             else
+                b = floor(x, 8) + 1
+             endif
+          endif
+          o = (i - 1) * sz
+          l = (b - 1) * sz
+          do k = 1, sz
+             out(o + k) = lut(l + k)
+          enddo
+       enddo
+
+    END SUBROUTINE apply_lut_int32
+
+    SUBROUTINE apply_lut_uint32(array, lut, out, n, l_sz, o_sz, nbins, sz, min_, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, l_sz, o_sz, nbins, sz, i, b, k, o, l
+       INTEGER*4, DIMENSION(n), INTENT(IN) :: array
+       !f2py depend(n), array
+
+       INTEGER*1, DIMENSION(l_sz), INTENT(IN) :: lut
+       !f2py depend(l_sz), lut
+
+       INTEGER*1, DIMENSION(o_sz), INTENT(INOUT) :: out
+       !f2py depend(o_sz), out
+
+       INTEGER*8 :: min_, v
+       REAL*8 :: binsz, x
+       !f2py threadsafe
+
+       ! The bin of each element is computed as per the histogram kernels,
+       ! elements beyond the first or last bin being assigned to it.
+       ! lut holds an entry of sz bytes per bin, which is copied to out.
+       do i = 1, n
+          v = iand(int(array(i), 8), 4294967295_8)
+          if (v .lt. min_) then
+             b = 1
+          else
+             x = (v - min_) / binsz
+             if (x .ge. nbins) then
+                b = nbins
+             else
+                b = floor(x, 8) + 1
+             endif
+          endif
+          o = (i - 1) * sz
+          l = (b - 1) * sz
+          do k = 1, sz
+             out(o + k) = lut(l + k)
+          enddo
+       enddo
+
+    END SUBROUTINE apply_lut_uint32
+
+    SUBROUTINE apply_lut_int64(array, lut, out, n, l_sz, o_sz, nbins, sz, min_, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, l_sz, o_sz, nbins, sz, i, b, k, o, l
+       INTEGER*8, DIMENSION(n), INTENT(IN) :: array
+       !f2py depend(n), array
+
+       INTEGER*1, DIMENSION(l_sz), INTENT(IN) :: lut
+       !f2py depend(l_sz), lut
+
+       INTEGER*1, DIMENSION(o_sz), INTENT(INOUT) :: out
+       !f2py depend(o_sz), out
+
+       INTEGER*8 :: min_, v
+       REAL*8 :: binsz, x
+       !f2py threadsafe
+
+       ! The bin of each element is computed as per the histogram kernels,
+       ! elements beyond the first or last bin being assigned to it.
+       ! lut holds an entry of sz bytes per bin, which is copied to out.
+       do i = 1, n
+          v = array(i)
+          if (v .lt. min_) then
+             b = 1
+          else
+             x = (v - min_) / binsz
+             if (x .ge. nbins) then
+                b = nbins
+             else
+                b = floor(x, 8) + 1
+             endif
+          endif
+          o = (i - 1) * sz
+          l = (b - 1) * sz
+          do k = 1, sz
+             out(o + k) = lut(l + k)
+          enddo
+       enddo
+
+    END SUBROUTINE apply_lut_int64
+
+    SUBROUTINE apply_lut_float32(array, lut, out, n, l_sz, o_sz, nbins, sz, min_, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, l_sz, o_sz, nbins, sz, i, b, k, o, l
+       REAL*4, DIMENSION(n), INTENT(IN) :: array
+       !f2py depend(n), array
+
+       INTEGER*1, DIMENSION(l_sz), INTENT(IN) :: lut
+       !f2py depend(l_sz), lut
+
+       INTEGER*1, DIMENSION(o_sz), INTENT(INOUT) :: out
+       !f2py depend(o_sz), out
+
+       REAL*4 :: min_, v
+       REAL*8 :: binsz, x
+       !f2py threadsafe
+
+       ! The bin of each element is computed as per the histogram kernels,
+       ! elements beyond the first or last bin being assigned to it,
+       ! and NaN's to the entry following the last bin.
+       ! lut holds an entry of sz bytes per bin, which is copied to out.
+       do i = 1, n
+          v = array(i)
+          if (v .ne. v) then
+             b = nbins + 1
+          else if (v .lt. min_) then
+             b = 1
+          else
+             x = (v - min_) / binsz
+             if (x .ge. nbins) then
+                b = nbins
+             else
+                b = floor(x, 8) + 1
+             endif
+          endif
+          o = (i - 1) * sz
+          l = (b - 1) * sz
+          do k = 1, sz
+             out(o + k) = lut(l + k)
+          enddo
+       enddo
+
+    END SUBROUTINE apply_lut_float32
+
+    SUBROUTINE apply_lut_float64(array, lut, out, n, l_sz, o_sz, nbins, sz, min_, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, l_sz, o_sz, nbins, sz, i, b, k, o, l
+       REAL*8, DIMENSION(n), INTENT(IN) :: array
+       !f2py depend(n), array
+
+       INTEGER*1, DIMENSION(l_sz), INTENT(IN) :: lut
+       !f2py depend(l_sz), lut
+
+       INTEGER*1, DIMENSION(o_sz), INTENT(INOUT) :: out
+       !f2py depend(o_sz), out
+
+       REAL*8 :: min_, v
+       REAL*8 :: binsz, x
+       !f2py threadsafe
+
+       ! The bin of each element is computed as per the histogram kernels,
+       ! elements beyond the first or last bin being assigned to it,
+       ! and NaN's to the entry following the last bin.
+       ! lut holds an entry of sz bytes per bin, which is copied to out.
+       do i = 1, n
+          v = array(i)
+          if (v .ne. v) then
+             b = nbins + 1
+          else if (v .lt. min_) then
+             b = 1
+          else
+             x = (v - min_) / binsz
+             if (x .ge. nbins) then
+                b = nbins
+             else
+                b = floor(x, 8) + 1
+             endif
+          endif
+          o = (i - 1) * sz
+          l = (b - 1) * sz
+          do k = 1, sz
+             out(o + k) = lut(l + k)
+          enddo
+       enddo
+
+    END SUBROUTINE apply_lut_float64
+END MODULE idl_hist_match
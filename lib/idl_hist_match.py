@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import numpy
+from idl_functions import histogram
+try:
+    import _idl_hist_match
+except ImportError:
+    _idl_hist_match = None
+
+
+def hist_match(array, reference, binsize=None, maxv=None, minv=None,
+               ref_binsize=None, ref_minv=None, reference_hist=False,
+               dtype=None, lut=None):
+    """
+    Image contrast matching.
+    Converts an array such that its histogram matches that of a
+    reference, i.e. histogram specification.
+
+    :param array:
+        A numpy array of any type.
+
+    :param reference:
+        A numpy array whose histogram is to be matched, or if
+        reference_hist is set, that histogram.
+
+    :param binsize:
+        The binsize to be used in constructing the histogram of array.
+        The default is 1 for integer arrays spanning no more than 65536
+        values, otherwise (maxv - minv) / 5000, an integer for integer
+        arrays.
+
+    :param maxv:
+        The maximum data value of array to be considered. Larger values
+        are mapped as per maxv. Default is the maximum value of array.
+
+    :param minv:
+        The minimum data value of array to be considered. Smaller values
+        are mapped as per minv. Default is the minimum value of array.
+
+    :param ref_binsize:
+        The binsize of the reference histogram. If reference is an array
+        then the default is derived as per binsize, otherwise the default
+        is 1.
+
+    :param ref_minv:
+        The value at the start of the first bin of the reference
+        histogram. If reference is an array then the default is its
+        minimum value, otherwise the default is 0.
+
+    :param reference_hist:
+        Type Bool. Default is False. If set to True, then reference is a
+        histogram, such as returned by histogram(reference, omin='omin')
+        along with ref_minv=h['omin']. This allows many arrays to be
+        matched to a reference without reprocessing it.
+
+    :param dtype:
+        (Optional) The datatype of the result. Default is the datatype of
+        reference if it is an array, otherwise that of array.
+
+    :param lut:
+        (Optional) A string name used to refer to the dictionary key
+        that will contain the lookup table applied to the bins of array.
+        If set, a tuple of the result and the dictionary is returned.
+
+    :return:
+        A numpy array of the same shape as array, whose histogram
+        matches that of reference. Integer results are rounded and
+        clipped to the range of dtype. NaN's remain NaN for floating
+        point results, and are 0 otherwise.
+        If lut is set, then a tuple of the result and a dictionary
+        containing the lookup table is returned.
+
+    Example:
+
+        >>> matched = hist_match(scene, reference)
+        >>> # Match many scenes to a histogram computed once
+        >>> h = histogram(reference, omin='omin')
+        >>> matched = hist_match(scene, h['histogram'], ref_minv=h['omin'],
+        ...                      reference_hist=True, dtype='uint16')
+
+    :notes:
+        The histograms of array and reference are computed via histogram,
+        and every bin of array is mapped to the value at which the
+        cumulative histogram of reference reaches that of the bin's
+        centre. The cumulative histogram of reference is interpolated
+        linearly within each bin, so that the mapping is monotonic. The
+        bins of integer data are centred on their values, such that
+        matching an integer array to itself is the identity.
+        The lookup table is applied to array by a compiled kernel in a
+        single pass.
+
+    :author:
+        Josh Sixsmith; josh.sixsmith@gmail.com; joshua.sixsmith@ga.gov.au
+
+    :history:
+       *  19/10/2026: Created
+
+    :copyright:
+        Copyright (c) 2014, Josh Sixsmith
+        All rights reserved.
+
+        Redistribution and use in source and binary forms, with or without
+        modification, are permitted provided that the following conditions are met:
+
+        1. Redistributions of source code must retain the above copyright notice, this
+           list of conditions and the following disclaimer.
+        2. Redistributions in binary form must reproduce the above copyright notice,
+           this list of conditions and the following disclaimer in the documentation
+           and/or other materials provided with the distribution.
+
+        THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+        ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+        WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+        DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+        ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+        (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+        LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+        ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+        (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+        SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+        The views and conclusions contained in the software and documentation are those
+        of the authors and should not be interpreted as representing official policies,
+        either expressed or implied, of the FreeBSD Project.
+
+    """
+    if reference_hist:
+        ref_hist = numpy.asarray(reference).ravel()
+        if (ref_binsize is None):
+            ref_binsize = 1
+        if (ref_minv is None):
+            ref_minv = 0
+        if (dtype is None):
+            dtype = array.dtype
+    else:
+        if ((ref_binsize is not None) | (ref_minv is not None)):
+            msg = ("Error. Conflicting Keywords. ref_binsize and ref_minv "
+                   "require reference_hist.")
+            raise Exception(msg)
+        if (dtype is None):
+            dtype = reference.dtype
+        ref_minv, ref_binsize, ref_max = _bins(reference)
+        ref_hist = _histogram(reference, ref_binsize, ref_minv, ref_max)
+
+    dtype = numpy.dtype(dtype)
+    if (ref_binsize <= 0):
+        raise ValueError("Error. ref_binsize must be positive.")
+    if ((ref_hist.shape[0] == 0) or (ref_hist.sum() == 0)):
+        raise ValueError("Error. The reference histogram is empty.")
+
+    minv, binsize, maxv = _bins(array, binsize, minv, maxv)
+    hist = _histogram(array, binsize, minv, maxv)
+    nbins = hist.shape[0]
+
+    # The fraction of array below the centre of each bin
+    cumu = numpy.cumsum(hist, dtype='float64')
+    n = max(cumu[-1], 1)
+    frac = (cumu - hist / 2.0) / n
+
+    # The reference value at each fraction, interpolated within the first
+    # reference bin reaching it. The fraction is above the cumulative
+    # histogram of the previous bin, hence the bin is occupied.
+    ref_cumu = numpy.cumsum(ref_hist, dtype='float64') / ref_hist.sum()
+    frac = frac.clip(min=numpy.finfo('float64').tiny)
+    k = numpy.searchsorted(ref_cumu, frac).clip(max=ref_hist.shape[0] - 1)
+    below = numpy.where(k > 0, ref_cumu[k - 1], 0.0)
+    width = (ref_cumu[k] - below).clip(min=numpy.finfo('float64').tiny)
+    within = ((frac - below) / width).clip(0, 1)
+
+    # Integer values are centred within their bins
+    start = numpy.float64(ref_minv) - (0.5 if dtype.kind in 'iu' else 0.0)
+    values = start + (k + within) * numpy.float64(ref_binsize)
+
+    # The table holds an additional entry for NaN's
+    table = numpy.zeros(nbins + 1, dtype=dtype)
+    if (dtype.kind in 'iu'):
+        info = numpy.iinfo(dtype)
+        table[:-1] = numpy.rint(values).clip(info.min, info.max)
+    else:
+        table[:-1] = values
+        table[-1] = numpy.nan
+
+    matched = _apply_lut(array, table, minv, binsize)
+
+    if (lut is not None):
+        return matched, {lut: table[:-1]}
+
+    return matched
+
+
+def _bins(array, binsize=None, minv=None, maxv=None):
+    """
+    Returns a tuple of (minv, binsize, maxv), applying the defaults of
+    hist_match. minv and binsize are of the type of array, as per
+    histogram.
+    """
+    if (maxv is None):
+        maxv = numpy.nanmax(array)
+    if (minv is None):
+        minv = numpy.nanmin(array)
+
+    if (binsize is None):
+        if (array.dtype.kind in 'iu'):
+            span = int(maxv) - int(minv)
+            binsize = 1 if (span < 2**16) else max(1, span // 5000)
+        else:
+            binsize = (maxv - minv) / 5000.
+            if (binsize == 0):
+                binsize = 1.0
+
+    convert = array.dtype.type
+    return convert(minv), convert(binsize), maxv
+
+
+def _histogram(array, binsize, minv, maxv):
+    """
+    Returns the histogram of array, NaN's being excluded.
+    """
+    # The number of bins is computed by histogram in the type of array,
+    # which can overflow for signed types spanning more than half their
+    # range
+    if ((array.dtype.kind == 'i') & (array.dtype.itemsize <= 2)):
+        if (int(maxv) - int(minv) > numpy.iinfo(array.dtype).max):
+            array = array.astype('int32')
+
+    return histogram(array, binsize=binsize, minv=minv, maxv=maxv,
+                     nan=True)['histogram']
+
+
+def _apply_lut(array, table, minv, binsize):
+    """
+    Returns table indexed by the histogram bin of each element of
+    array, the last entry of table being for NaN's.
+    """
+    nbins = table.shape[0] - 1
+    values = numpy.ascontiguousarray(array).ravel()
+    name = array.dtype.name
+
+    if ((_idl_hist_match is None) | (name == 'uint64') | (values.size == 0)):
+        if (array.dtype.kind in 'iu'):
+            offset = values.astype('float64') - numpy.float64(minv)
+        else:
+            offset = values - minv
+        x = offset / numpy.float64(binsize)
+        nan = numpy.isnan(x)
+        x = x.clip(0, nbins - 1)
+        x[nan] = nbins
+        return table[numpy.floor(x).astype('int64')].reshape(array.shape)
+
+    out = numpy.empty(array.shape, dtype=table.dtype)
+    func = getattr(_idl_hist_match.idl_hist_match, 'apply_lut_' + name)
+    lut = table.view('int8')
+    res = out.reshape(-1).view('int8')
+    func(values.view(name.replace('uint', 'int')), lut, res, values.shape[0],
+         lut.shape[0], res.shape[0], nbins, table.dtype.itemsize, minv,
+         binsize)
+
+    return out
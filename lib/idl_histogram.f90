@@ -46,6 +46,7 @@ CONTAINS
        INTEGER*2 :: min_, max_
        REAL*8 :: binsz, max_bin
        INTEGER :: tf
+       !f2py threadsafe
 
        ! need to check that the value of array(i) is le max
        do i = 1, a_sz
@@ -72,6 +73,7 @@ CONTAINS
        INTEGER*4 :: min_, max_
        REAL*8 :: binsz, max_bin
        INTEGER :: tf
+       !f2py threadsafe
 
        ! need to check that the value of array(i) is le max
        do i = 1, a_sz
@@ -98,6 +100,7 @@ CONTAINS
        INTEGER*8 :: min_, max_
        REAL*8 :: binsz, max_bin
        INTEGER :: tf
+       !f2py threadsafe
 
        ! need to check that the value of array(i) is le max
        do i = 1, a_sz
@@ -124,6 +127,7 @@ CONTAINS
        REAL*4 :: min_, max_
        REAL*8 :: binsz, max_bin
        INTEGER :: tf
+       !f2py threadsafe
 
        ! need to check that the value of array(i) is le max
        do i = 1, a_sz
@@ -150,6 +154,7 @@ CONTAINS
        REAL*8 :: min_, max_
        REAL*8 :: binsz, max_bin
        INTEGER :: tf
+       !f2py threadsafe
 
        ! need to check that the value of array(i) is le max
        do i = 1, a_sz
@@ -178,6 +183,7 @@ CONTAINS
        INTEGER*4 :: min_, max_
        REAL*8 :: binsz, max_bin
        INTEGER :: tf
+       !f2py threadsafe
 
        ri(2) = nbins
        hist(1) = 0
@@ -221,6 +227,7 @@ CONTAINS
        INTEGER*4 :: min_, max_
        REAL*8 :: binsz, max_bin
        INTEGER :: tf
+       !f2py threadsafe
 
        ri(2) = nbins
        hist(1) = 0
@@ -263,6 +270,7 @@ CONTAINS
        INTEGER*8 :: min_, max_
        REAL*8 :: binsz, max_bin
        INTEGER :: tf
+       !f2py threadsafe
 
        ri(2) = nbins
        hist(1) = 0
@@ -304,6 +312,7 @@ CONTAINS
        REAL*4 :: min_, max_
        REAL*8 :: binsz, max_bin
        INTEGER :: tf
+       !f2py threadsafe
 
        ri(2) = nbins
        hist(1) = 0
@@ -345,6 +354,7 @@ CONTAINS
        REAL*8 :: min_, max_
        REAL*8 :: binsz, max_bin
        INTEGER :: tf
+       !f2py threadsafe
 
        ri(2) = nbins
        hist(1) = 0
@@ -369,5 +379,4481 @@ CONTAINS
        enddo
 
     END SUBROUTINE reverse_indices_dfloat
-END MODULE idl_histogram
+    ! Strided kernels
+
+    SUBROUTINE histogram_strided_int8(buf, hist, b_sz, nbins, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of an N-D array of shape dims, whose element
+       ! strides are given by strides. The arithmetic is that of the
+       ! contiguous kernels.
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_strided_int8
+
+    SUBROUTINE histogram_strided_uint8(buf, hist, b_sz, nbins, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of an N-D array of shape dims, whose element
+       ! strides are given by strides. The arithmetic is that of the
+       ! contiguous kernels.
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 2), 255_2)
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_strided_uint8
+
+    SUBROUTINE histogram_strided_int16(buf, hist, b_sz, nbins, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of an N-D array of shape dims, whose element
+       ! strides are given by strides. The arithmetic is that of the
+       ! contiguous kernels.
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_strided_int16
+
+    SUBROUTINE histogram_strided_uint16(buf, hist, b_sz, nbins, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of an N-D array of shape dims, whose element
+       ! strides are given by strides. The arithmetic is that of the
+       ! contiguous kernels.
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 4), 65535_4)
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_strided_uint16
+
+    SUBROUTINE histogram_strided_int32(buf, hist, b_sz, nbins, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of an N-D array of shape dims, whose element
+       ! strides are given by strides. The arithmetic is that of the
+       ! contiguous kernels.
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_strided_int32
+
+    SUBROUTINE histogram_strided_uint32(buf, hist, b_sz, nbins, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of an N-D array of shape dims, whose element
+       ! strides are given by strides. The arithmetic is that of the
+       ! contiguous kernels.
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 8), 4294967295_8)
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_strided_uint32
+
+    SUBROUTINE histogram_strided_int64(buf, hist, b_sz, nbins, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of an N-D array of shape dims, whose element
+       ! strides are given by strides. The arithmetic is that of the
+       ! contiguous kernels.
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_strided_int64
+
+    SUBROUTINE histogram_strided_float32(buf, hist, b_sz, nbins, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       REAL*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       REAL*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of an N-D array of shape dims, whose element
+       ! strides are given by strides. The arithmetic is that of the
+       ! contiguous kernels.
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_strided_float32
+
+    SUBROUTINE histogram_strided_float64(buf, hist, b_sz, nbins, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       REAL*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       REAL*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of an N-D array of shape dims, whose element
+       ! strides are given by strides. The arithmetic is that of the
+       ! contiguous kernels.
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_strided_float64
+
+    SUBROUTINE reverse_indices_strided_int8(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ri(2) = nbins
+       hist(1) = 0
+
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       ! The reverse indices refer to the C ordered position of each
+       ! element, i.e. the count of elements walked thus far
+       i = 0
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             i = i + 1
+             tf = (v .lt. max_bin) .and. (v .ge. min_) .and. (v .le. max_)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             ri(ri(ind) + hist(ind) + 1) = i - 1
+             ri(1) = 1
+             hist(1) = 0
+             ri(2) = nbins
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_strided_int8
+
+    SUBROUTINE reverse_indices_strided_uint8(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ri(2) = nbins
+       hist(1) = 0
+
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       ! The reverse indices refer to the C ordered position of each
+       ! element, i.e. the count of elements walked thus far
+       i = 0
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 2), 255_2)
+             i = i + 1
+             tf = (v .lt. max_bin) .and. (v .ge. min_) .and. (v .le. max_)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             ri(ri(ind) + hist(ind) + 1) = i - 1
+             ri(1) = 1
+             hist(1) = 0
+             ri(2) = nbins
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_strided_uint8
+
+    SUBROUTINE reverse_indices_strided_int16(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ri(2) = nbins
+       hist(1) = 0
+
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       ! The reverse indices refer to the C ordered position of each
+       ! element, i.e. the count of elements walked thus far
+       i = 0
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             i = i + 1
+             tf = (v .lt. max_bin) .and. (v .ge. min_) .and. (v .le. max_)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             ri(ri(ind) + hist(ind) + 1) = i - 1
+             ri(1) = 1
+             hist(1) = 0
+             ri(2) = nbins
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_strided_int16
+
+    SUBROUTINE reverse_indices_strided_uint16(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ri(2) = nbins
+       hist(1) = 0
+
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       ! The reverse indices refer to the C ordered position of each
+       ! element, i.e. the count of elements walked thus far
+       i = 0
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 4), 65535_4)
+             i = i + 1
+             tf = (v .lt. max_bin) .and. (v .ge. min_) .and. (v .le. max_)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             ri(ri(ind) + hist(ind) + 1) = i - 1
+             ri(1) = 1
+             hist(1) = 0
+             ri(2) = nbins
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_strided_uint16
+
+    SUBROUTINE reverse_indices_strided_int32(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ri(2) = nbins
+       hist(1) = 0
+
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       ! The reverse indices refer to the C ordered position of each
+       ! element, i.e. the count of elements walked thus far
+       i = 0
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             i = i + 1
+             tf = (v .lt. max_bin) .and. (v .ge. min_) .and. (v .le. max_)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             ri(ri(ind) + hist(ind) + 1) = i - 1
+             ri(1) = 1
+             hist(1) = 0
+             ri(2) = nbins
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_strided_int32
+
+    SUBROUTINE reverse_indices_strided_uint32(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ri(2) = nbins
+       hist(1) = 0
+
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       ! The reverse indices refer to the C ordered position of each
+       ! element, i.e. the count of elements walked thus far
+       i = 0
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 8), 4294967295_8)
+             i = i + 1
+             tf = (v .lt. max_bin) .and. (v .ge. min_) .and. (v .le. max_)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             ri(ri(ind) + hist(ind) + 1) = i - 1
+             ri(1) = 1
+             hist(1) = 0
+             ri(2) = nbins
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_strided_uint32
+
+    SUBROUTINE reverse_indices_strided_int64(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ri(2) = nbins
+       hist(1) = 0
+
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       ! The reverse indices refer to the C ordered position of each
+       ! element, i.e. the count of elements walked thus far
+       i = 0
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             i = i + 1
+             tf = (v .lt. max_bin) .and. (v .ge. min_) .and. (v .le. max_)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             ri(ri(ind) + hist(ind) + 1) = i - 1
+             ri(1) = 1
+             hist(1) = 0
+             ri(2) = nbins
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_strided_int64
+
+    SUBROUTINE reverse_indices_strided_float32(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       REAL*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       REAL*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ri(2) = nbins
+       hist(1) = 0
+
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       ! The reverse indices refer to the C ordered position of each
+       ! element, i.e. the count of elements walked thus far
+       i = 0
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             i = i + 1
+             tf = (v .lt. max_bin) .and. (v .ge. min_) .and. (v .le. max_)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             ri(ri(ind) + hist(ind) + 1) = i - 1
+             ri(1) = 1
+             hist(1) = 0
+             ri(2) = nbins
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_strided_float32
+
+    SUBROUTINE reverse_indices_strided_float64(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       REAL*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       REAL*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ri(2) = nbins
+       hist(1) = 0
+
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       ! The reverse indices refer to the C ordered position of each
+       ! element, i.e. the count of elements walked thus far
+       i = 0
+       ! Walk the array in C order; the last dimension within the inner
+       ! loop, and the remaining dimensions via an odometer
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             i = i + 1
+             tf = (v .lt. max_bin) .and. (v .ge. min_) .and. (v .le. max_)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             hist(ind) = hist(ind) + y
+             ri(ri(ind) + hist(ind) + 1) = i - 1
+             ri(1) = 1
+             hist(1) = 0
+             ri(2) = nbins
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_strided_float64
+    ! Shift kernels
+
+    SUBROUTINE histogram_shift_int8(buf, hist, b_sz, nbins, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*4 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! Integer data with a binsize of 2**shift. An element is within
+       ! the histogram if its offset from min_ lies within [0, limit],
+       ! limit accounting for both max_ and the upper edge of the last
+       ! bin, and its bin is then the offset shifted right by shift.
+       ! Out of range elements are counted in hist(1).
+       mn = min_
+       lim = limit
+       sh = shift
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = int(buf(p), 4) - mn
+             ind = merge(int(ishft(off, -sh), 8) + 2, 1_8, &
+                         (off .ge. 0) .and. (off .le. lim))
+             hist(ind) = hist(ind) + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_shift_int8
+
+    SUBROUTINE histogram_shift_uint8(buf, hist, b_sz, nbins, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*4 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! Integer data with a binsize of 2**shift. An element is within
+       ! the histogram if its offset from min_ lies within [0, limit],
+       ! limit accounting for both max_ and the upper edge of the last
+       ! bin, and its bin is then the offset shifted right by shift.
+       ! Out of range elements are counted in hist(1).
+       mn = min_
+       lim = limit
+       sh = shift
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = iand(int(buf(p), 4), 255_4) - mn
+             ind = merge(int(ishft(off, -sh), 8) + 2, 1_8, &
+                         (off .ge. 0) .and. (off .le. lim))
+             hist(ind) = hist(ind) + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_shift_uint8
+
+    SUBROUTINE histogram_shift_int16(buf, hist, b_sz, nbins, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*4 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! Integer data with a binsize of 2**shift. An element is within
+       ! the histogram if its offset from min_ lies within [0, limit],
+       ! limit accounting for both max_ and the upper edge of the last
+       ! bin, and its bin is then the offset shifted right by shift.
+       ! Out of range elements are counted in hist(1).
+       mn = min_
+       lim = limit
+       sh = shift
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = int(buf(p), 4) - mn
+             ind = merge(int(ishft(off, -sh), 8) + 2, 1_8, &
+                         (off .ge. 0) .and. (off .le. lim))
+             hist(ind) = hist(ind) + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_shift_int16
+
+    SUBROUTINE histogram_shift_uint16(buf, hist, b_sz, nbins, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*4 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! Integer data with a binsize of 2**shift. An element is within
+       ! the histogram if its offset from min_ lies within [0, limit],
+       ! limit accounting for both max_ and the upper edge of the last
+       ! bin, and its bin is then the offset shifted right by shift.
+       ! Out of range elements are counted in hist(1).
+       mn = min_
+       lim = limit
+       sh = shift
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = iand(int(buf(p), 4), 65535_4) - mn
+             ind = merge(int(ishft(off, -sh), 8) + 2, 1_8, &
+                         (off .ge. 0) .and. (off .le. lim))
+             hist(ind) = hist(ind) + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_shift_uint16
+
+    SUBROUTINE histogram_shift_int32(buf, hist, b_sz, nbins, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*8 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! Integer data with a binsize of 2**shift. An element is within
+       ! the histogram if its offset from min_ lies within [0, limit],
+       ! limit accounting for both max_ and the upper edge of the last
+       ! bin, and its bin is then the offset shifted right by shift.
+       ! Out of range elements are counted in hist(1).
+       mn = min_
+       lim = limit
+       sh = shift
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = int(buf(p), 8) - mn
+             ind = merge(int(ishft(off, -sh), 8) + 2, 1_8, &
+                         (off .ge. 0) .and. (off .le. lim))
+             hist(ind) = hist(ind) + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_shift_int32
+
+    SUBROUTINE histogram_shift_uint32(buf, hist, b_sz, nbins, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*8 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! Integer data with a binsize of 2**shift. An element is within
+       ! the histogram if its offset from min_ lies within [0, limit],
+       ! limit accounting for both max_ and the upper edge of the last
+       ! bin, and its bin is then the offset shifted right by shift.
+       ! Out of range elements are counted in hist(1).
+       mn = min_
+       lim = limit
+       sh = shift
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = iand(int(buf(p), 8), 4294967295_8) - mn
+             ind = merge(int(ishft(off, -sh), 8) + 2, 1_8, &
+                         (off .ge. 0) .and. (off .le. lim))
+             hist(ind) = hist(ind) + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_shift_uint32
+
+    SUBROUTINE histogram_shift_int64(buf, hist, b_sz, nbins, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*8 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! Integer data with a binsize of 2**shift. An element is within
+       ! the histogram if its offset from min_ lies within [0, limit],
+       ! limit accounting for both max_ and the upper edge of the last
+       ! bin, and its bin is then the offset shifted right by shift.
+       ! Out of range elements are counted in hist(1).
+       mn = min_
+       lim = limit
+       sh = shift
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = buf(p) - mn
+             ind = merge(int(ishft(off, -sh), 8) + 2, 1_8, &
+                         (off .ge. 0) .and. (off .le. lim))
+             hist(ind) = hist(ind) + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_shift_int64
+
+    SUBROUTINE reverse_indices_shift_int8(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*4 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! The reverse indices for the layout of histogram_shift, hist
+       ! holding its result. The out of range elements are skipped.
+       mn = min_
+       lim = limit
+       sh = shift
+
+       ri(1) = 0
+       ri(2) = nbins
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = int(buf(p), 4) - mn
+             if ((off .ge. 0) .and. (off .le. lim)) then
+                ind = int(ishft(off, -sh), 8) + 2
+                hist(ind) = hist(ind) + 1
+                ri(ri(ind) + hist(ind) + 1) = i
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_shift_int8
+
+    SUBROUTINE reverse_indices_shift_uint8(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*4 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! The reverse indices for the layout of histogram_shift, hist
+       ! holding its result. The out of range elements are skipped.
+       mn = min_
+       lim = limit
+       sh = shift
+
+       ri(1) = 0
+       ri(2) = nbins
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = iand(int(buf(p), 4), 255_4) - mn
+             if ((off .ge. 0) .and. (off .le. lim)) then
+                ind = int(ishft(off, -sh), 8) + 2
+                hist(ind) = hist(ind) + 1
+                ri(ri(ind) + hist(ind) + 1) = i
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_shift_uint8
+
+    SUBROUTINE reverse_indices_shift_int16(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*4 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! The reverse indices for the layout of histogram_shift, hist
+       ! holding its result. The out of range elements are skipped.
+       mn = min_
+       lim = limit
+       sh = shift
+
+       ri(1) = 0
+       ri(2) = nbins
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = int(buf(p), 4) - mn
+             if ((off .ge. 0) .and. (off .le. lim)) then
+                ind = int(ishft(off, -sh), 8) + 2
+                hist(ind) = hist(ind) + 1
+                ri(ri(ind) + hist(ind) + 1) = i
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_shift_int16
+
+    SUBROUTINE reverse_indices_shift_uint16(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*4 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! The reverse indices for the layout of histogram_shift, hist
+       ! holding its result. The out of range elements are skipped.
+       mn = min_
+       lim = limit
+       sh = shift
+
+       ri(1) = 0
+       ri(2) = nbins
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = iand(int(buf(p), 4), 65535_4) - mn
+             if ((off .ge. 0) .and. (off .le. lim)) then
+                ind = int(ishft(off, -sh), 8) + 2
+                hist(ind) = hist(ind) + 1
+                ri(ri(ind) + hist(ind) + 1) = i
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_shift_uint16
+
+    SUBROUTINE reverse_indices_shift_int32(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*8 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! The reverse indices for the layout of histogram_shift, hist
+       ! holding its result. The out of range elements are skipped.
+       mn = min_
+       lim = limit
+       sh = shift
+
+       ri(1) = 0
+       ri(2) = nbins
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = int(buf(p), 8) - mn
+             if ((off .ge. 0) .and. (off .le. lim)) then
+                ind = int(ishft(off, -sh), 8) + 2
+                hist(ind) = hist(ind) + 1
+                ri(ri(ind) + hist(ind) + 1) = i
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_shift_int32
+
+    SUBROUTINE reverse_indices_shift_uint32(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*8 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! The reverse indices for the layout of histogram_shift, hist
+       ! holding its result. The out of range elements are skipped.
+       mn = min_
+       lim = limit
+       sh = shift
+
+       ri(1) = 0
+       ri(2) = nbins
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = iand(int(buf(p), 8), 4294967295_8) - mn
+             if ((off .ge. 0) .and. (off .le. lim)) then
+                ind = int(ishft(off, -sh), 8) + 2
+                hist(ind) = hist(ind) + 1
+                ri(ri(ind) + hist(ind) + 1) = i
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_shift_uint32
+
+    SUBROUTINE reverse_indices_shift_int64(buf, hist, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, limit, shift)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i, n
+       INTEGER*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, limit, shift
+       INTEGER*8 :: mn, lim, off
+       INTEGER*4 :: sh
+       !f2py threadsafe
+
+       ! The reverse indices for the layout of histogram_shift, hist
+       ! holding its result. The out of range elements are skipped.
+       mn = min_
+       lim = limit
+       sh = shift
+
+       ri(1) = 0
+       ri(2) = nbins
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             off = buf(p) - mn
+             if ((off .ge. 0) .and. (off .le. lim)) then
+                ind = int(ishft(off, -sh), 8) + 2
+                hist(ind) = hist(ind) + 1
+                ri(ri(ind) + hist(ind) + 1) = i
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE reverse_indices_shift_int64
+    ! Edge kernels
+
+    SUBROUTINE histogram_edges_float(array, hist, edges, a_sz, nbins, ne, max_, lmin, lbinsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: i, a_sz, nbins, ne
+       REAL*4, DIMENSION(a_sz), INTENT(IN) :: array
+       !f2py depend(a_sz), array
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       REAL*8, DIMENSION(ne), INTENT(IN) :: edges
+       !f2py depend(ne), edges
+
+       REAL*8 :: max_, lmin, lbinsz, v
+       INTEGER*8 :: lo, hi, mid
+       !f2py threadsafe
+
+       ! Bins of arbitrary width, defined by ne monotonically increasing
+       ! edges. An element is within the histogram if it lies within
+       ! edges(1) and the lesser of max_ and edges(ne), inclusive. If
+       ! lbinsz is positive then the edges are log spaced, i.e.
+       ! log10(edges(k)) = lmin + (k - 1) * lbinsz.
+       ! Out of range elements, including NaN's, are counted in hist(1).
+       do i = 1, a_sz
+          v = array(i)
+          if ((v .ge. edges(1)) .and. (v .le. max_) .and. (v .le. edges(ne))) then
+             if (lbinsz .gt. 0) then
+                ! Log spaced edges; the bin is estimated from the
+                ! logarithm then corrected against the edges, so that
+                ! the result matches a search of the edges
+                lo = floor((log10(v) - lmin) / lbinsz) + 1
+                lo = max(1_8, min(lo, ne - 1))
+                do while ((lo .gt. 1) .and. (v .lt. edges(lo)))
+                   lo = lo - 1
+                enddo
+                do while ((lo .lt. ne - 1) .and. (v .ge. edges(lo+1)))
+                   lo = lo + 1
+                enddo
+             else
+                ! Binary search of the edges
+                lo = 1
+                hi = ne
+                do while (hi - lo .gt. 1)
+                   mid = (lo + hi) / 2
+                   if (v .ge. edges(mid)) then
+                      lo = mid
+                   else
+                      hi = mid
+                   endif
+                enddo
+             endif
+             hist(lo + 1) = hist(lo + 1) + 1
+          else
+             hist(1) = hist(1) + 1
+          endif
+       enddo
+
+    END SUBROUTINE histogram_edges_float
+
+    SUBROUTINE histogram_edges_dfloat(array, hist, edges, a_sz, nbins, ne, max_, lmin, lbinsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: i, a_sz, nbins, ne
+       REAL*8, DIMENSION(a_sz), INTENT(IN) :: array
+       !f2py depend(a_sz), array
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       REAL*8, DIMENSION(ne), INTENT(IN) :: edges
+       !f2py depend(ne), edges
+
+       REAL*8 :: max_, lmin, lbinsz, v
+       INTEGER*8 :: lo, hi, mid
+       !f2py threadsafe
+
+       ! Bins of arbitrary width, defined by ne monotonically increasing
+       ! edges. An element is within the histogram if it lies within
+       ! edges(1) and the lesser of max_ and edges(ne), inclusive. If
+       ! lbinsz is positive then the edges are log spaced, i.e.
+       ! log10(edges(k)) = lmin + (k - 1) * lbinsz.
+       ! Out of range elements, including NaN's, are counted in hist(1).
+       do i = 1, a_sz
+          v = array(i)
+          if ((v .ge. edges(1)) .and. (v .le. max_) .and. (v .le. edges(ne))) then
+             if (lbinsz .gt. 0) then
+                ! Log spaced edges; the bin is estimated from the
+                ! logarithm then corrected against the edges, so that
+                ! the result matches a search of the edges
+                lo = floor((log10(v) - lmin) / lbinsz) + 1
+                lo = max(1_8, min(lo, ne - 1))
+                do while ((lo .gt. 1) .and. (v .lt. edges(lo)))
+                   lo = lo - 1
+                enddo
+                do while ((lo .lt. ne - 1) .and. (v .ge. edges(lo+1)))
+                   lo = lo + 1
+                enddo
+             else
+                ! Binary search of the edges
+                lo = 1
+                hi = ne
+                do while (hi - lo .gt. 1)
+                   mid = (lo + hi) / 2
+                   if (v .ge. edges(mid)) then
+                      lo = mid
+                   else
+                      hi = mid
+                   endif
+                enddo
+             endif
+             hist(lo + 1) = hist(lo + 1) + 1
+          else
+             hist(1) = hist(1) + 1
+          endif
+       enddo
+
+    END SUBROUTINE histogram_edges_dfloat
+
+    SUBROUTINE reverse_indices_edges_float(array, hist, ri, edges, nbins, a_sz, ri_sz, ne, max_, lmin, lbinsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: i, n, a_sz, ri_sz, nbins, ne
+       REAL*4, DIMENSION(a_sz), INTENT(IN) :: array
+       !f2py depend(a_sz), array
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       REAL*8, DIMENSION(ne), INTENT(IN) :: edges
+       !f2py depend(ne), edges
+
+       REAL*8 :: max_, lmin, lbinsz, v
+       INTEGER*8 :: lo, hi, mid
+       !f2py threadsafe
+
+       ! The reverse indices for the layout of histogram_edges, hist
+       ! holding its result. The out of range elements are skipped.
+       ri(2) = nbins
+       hist(1) = 0
+
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       do i = 1, a_sz
+          v = array(i)
+          if ((v .ge. edges(1)) .and. (v .le. max_) .and. (v .le. edges(ne))) then
+             if (lbinsz .gt. 0) then
+                ! Log spaced edges; the bin is estimated from the
+                ! logarithm then corrected against the edges, so that
+                ! the result matches a search of the edges
+                lo = floor((log10(v) - lmin) / lbinsz) + 1
+                lo = max(1_8, min(lo, ne - 1))
+                do while ((lo .gt. 1) .and. (v .lt. edges(lo)))
+                   lo = lo - 1
+                enddo
+                do while ((lo .lt. ne - 1) .and. (v .ge. edges(lo+1)))
+                   lo = lo + 1
+                enddo
+             else
+                ! Binary search of the edges
+                lo = 1
+                hi = ne
+                do while (hi - lo .gt. 1)
+                   mid = (lo + hi) / 2
+                   if (v .ge. edges(mid)) then
+                      lo = mid
+                   else
+                      hi = mid
+                   endif
+                enddo
+             endif
+             hist(lo + 1) = hist(lo + 1) + 1
+             ri(ri(lo + 1) + hist(lo + 1) + 1) = i - 1
+          endif
+       enddo
+
+    END SUBROUTINE reverse_indices_edges_float
+
+    SUBROUTINE reverse_indices_edges_dfloat(array, hist, ri, edges, nbins, a_sz, ri_sz, ne, max_, lmin, lbinsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: i, n, a_sz, ri_sz, nbins, ne
+       REAL*8, DIMENSION(a_sz), INTENT(IN) :: array
+       !f2py depend(a_sz), array
+
+       INTEGER*4, DIMENSION(nbins), INTENT(INOUT) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       REAL*8, DIMENSION(ne), INTENT(IN) :: edges
+       !f2py depend(ne), edges
+
+       REAL*8 :: max_, lmin, lbinsz, v
+       INTEGER*8 :: lo, hi, mid
+       !f2py threadsafe
+
+       ! The reverse indices for the layout of histogram_edges, hist
+       ! holding its result. The out of range elements are skipped.
+       ri(2) = nbins
+       hist(1) = 0
+
+       do n = 2, nbins
+          ri(n+1) = ri(n) + hist(n)
+       enddo
+
+       hist = 0
+
+       do i = 1, a_sz
+          v = array(i)
+          if ((v .ge. edges(1)) .and. (v .le. max_) .and. (v .le. edges(ne))) then
+             if (lbinsz .gt. 0) then
+                ! Log spaced edges; the bin is estimated from the
+                ! logarithm then corrected against the edges, so that
+                ! the result matches a search of the edges
+                lo = floor((log10(v) - lmin) / lbinsz) + 1
+                lo = max(1_8, min(lo, ne - 1))
+                do while ((lo .gt. 1) .and. (v .lt. edges(lo)))
+                   lo = lo - 1
+                enddo
+                do while ((lo .lt. ne - 1) .and. (v .ge. edges(lo+1)))
+                   lo = lo + 1
+                enddo
+             else
+                ! Binary search of the edges
+                lo = 1
+                hi = ne
+                do while (hi - lo .gt. 1)
+                   mid = (lo + hi) / 2
+                   if (v .ge. edges(mid)) then
+                      lo = mid
+                   else
+                      hi = mid
+                   endif
+                enddo
+             endif
+             hist(lo + 1) = hist(lo + 1) + 1
+             ri(ri(lo + 1) + hist(lo + 1) + 1) = i - 1
+          endif
+       enddo
+
+    END SUBROUTINE reverse_indices_edges_dfloat
+    ! Sparse kernels
+
+    SUBROUTINE hash_bins_int8(buf, keys, counts, b_sz, tsize, dims, strides, ndim, min_, max_, max_bin, binsz, nocc)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, ndim, nocc, o, j, d, p, base, n_outer, h, mask, key
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(INOUT) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(INOUT) :: counts
+       !f2py depend(tsize), counts
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py intent(out) nocc
+       !f2py threadsafe
+
+       ! Counts the occurrences of the bin of each element within an open
+       ! addressing hash table of tsize (a power of two) slots, empty slots
+       ! having a key of -1. The array is walked, and the bins computed, as
+       ! per the strided kernels, so that no temporary arrays are required.
+       ! nocc is the number of occupied slots, or -1 if the table became
+       ! over half full, in which case a larger table is required.
+       mask = tsize - 1
+       nocc = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                ! Fibonacci hashing, the multiplication wrapping around
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while ((keys(h) .ne. key) .and. (keys(h) .ne. -1))
+                   h = iand(h, mask) + 1
+                enddo
+                if (keys(h) .eq. -1) then
+                   keys(h) = key
+                   nocc = nocc + 1
+                   if (2 * nocc .gt. tsize) then
+                      nocc = -1
+                      return
+                   endif
+                endif
+                counts(h) = counts(h) + 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE hash_bins_int8
+
+    SUBROUTINE reverse_indices_hashed_int8(buf, keys, rank, hist, ri, b_sz, tsize, nbins, ri_sz, dims, strides, ndim, &
+                                           min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, nbins, ri_sz, ndim, i, o, j, d, p, base, n_outer, h, mask, key, b
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(IN) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(IN) :: rank
+       !f2py depend(tsize), rank
+
+       INTEGER*4, DIMENSION(nbins), INTENT(IN) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py threadsafe
+
+       ! The reverse indices of the occupied bins, given the hash table
+       ! filled by hash_bins, the (0 based) rank of each occupied slot
+       ! amongst the ascending bins, and the histogram of those bins. The
+       ! slot of each element is found by probing the table again, rather
+       ! than being recorded by hash_bins.
+       ri(1) = nbins + 1
+       do b = 1, nbins
+          ri(b+1) = ri(b) + hist(b)
+       enddo
+
+       allocate(pos(nbins))
+       pos = 0
+       mask = tsize - 1
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while (keys(h) .ne. key)
+                   h = iand(h, mask) + 1
+                enddo
+                b = rank(h) + 1
+                pos(b) = pos(b) + 1
+                ri(ri(b) + pos(b)) = int(i, 4)
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_hashed_int8
+
+    SUBROUTINE hash_bins_uint8(buf, keys, counts, b_sz, tsize, dims, strides, ndim, min_, max_, max_bin, binsz, nocc)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, ndim, nocc, o, j, d, p, base, n_outer, h, mask, key
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(INOUT) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(INOUT) :: counts
+       !f2py depend(tsize), counts
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py intent(out) nocc
+       !f2py threadsafe
+       mask = tsize - 1
+       nocc = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 2), 255_2)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while ((keys(h) .ne. key) .and. (keys(h) .ne. -1))
+                   h = iand(h, mask) + 1
+                enddo
+                if (keys(h) .eq. -1) then
+                   keys(h) = key
+                   nocc = nocc + 1
+                   if (2 * nocc .gt. tsize) then
+                      nocc = -1
+                      return
+                   endif
+                endif
+                counts(h) = counts(h) + 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE hash_bins_uint8
+
+    SUBROUTINE reverse_indices_hashed_uint8(buf, keys, rank, hist, ri, b_sz, tsize, nbins, ri_sz, dims, strides, ndim, &
+                                           min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, nbins, ri_sz, ndim, i, o, j, d, p, base, n_outer, h, mask, key, b
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(IN) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(IN) :: rank
+       !f2py depend(tsize), rank
+
+       INTEGER*4, DIMENSION(nbins), INTENT(IN) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py threadsafe
+       ri(1) = nbins + 1
+       do b = 1, nbins
+          ri(b+1) = ri(b) + hist(b)
+       enddo
+
+       allocate(pos(nbins))
+       pos = 0
+       mask = tsize - 1
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 2), 255_2)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while (keys(h) .ne. key)
+                   h = iand(h, mask) + 1
+                enddo
+                b = rank(h) + 1
+                pos(b) = pos(b) + 1
+                ri(ri(b) + pos(b)) = int(i, 4)
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_hashed_uint8
+
+    SUBROUTINE hash_bins_int16(buf, keys, counts, b_sz, tsize, dims, strides, ndim, min_, max_, max_bin, binsz, nocc)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, ndim, nocc, o, j, d, p, base, n_outer, h, mask, key
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(INOUT) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(INOUT) :: counts
+       !f2py depend(tsize), counts
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py intent(out) nocc
+       !f2py threadsafe
+       mask = tsize - 1
+       nocc = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while ((keys(h) .ne. key) .and. (keys(h) .ne. -1))
+                   h = iand(h, mask) + 1
+                enddo
+                if (keys(h) .eq. -1) then
+                   keys(h) = key
+                   nocc = nocc + 1
+                   if (2 * nocc .gt. tsize) then
+                      nocc = -1
+                      return
+                   endif
+                endif
+                counts(h) = counts(h) + 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE hash_bins_int16
+
+    SUBROUTINE reverse_indices_hashed_int16(buf, keys, rank, hist, ri, b_sz, tsize, nbins, ri_sz, dims, strides, ndim, &
+                                           min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, nbins, ri_sz, ndim, i, o, j, d, p, base, n_outer, h, mask, key, b
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(IN) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(IN) :: rank
+       !f2py depend(tsize), rank
+
+       INTEGER*4, DIMENSION(nbins), INTENT(IN) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py threadsafe
+       ri(1) = nbins + 1
+       do b = 1, nbins
+          ri(b+1) = ri(b) + hist(b)
+       enddo
+
+       allocate(pos(nbins))
+       pos = 0
+       mask = tsize - 1
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while (keys(h) .ne. key)
+                   h = iand(h, mask) + 1
+                enddo
+                b = rank(h) + 1
+                pos(b) = pos(b) + 1
+                ri(ri(b) + pos(b)) = int(i, 4)
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_hashed_int16
+
+    SUBROUTINE hash_bins_uint16(buf, keys, counts, b_sz, tsize, dims, strides, ndim, min_, max_, max_bin, binsz, nocc)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, ndim, nocc, o, j, d, p, base, n_outer, h, mask, key
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(INOUT) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(INOUT) :: counts
+       !f2py depend(tsize), counts
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py intent(out) nocc
+       !f2py threadsafe
+       mask = tsize - 1
+       nocc = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 4), 65535_4)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while ((keys(h) .ne. key) .and. (keys(h) .ne. -1))
+                   h = iand(h, mask) + 1
+                enddo
+                if (keys(h) .eq. -1) then
+                   keys(h) = key
+                   nocc = nocc + 1
+                   if (2 * nocc .gt. tsize) then
+                      nocc = -1
+                      return
+                   endif
+                endif
+                counts(h) = counts(h) + 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE hash_bins_uint16
+
+    SUBROUTINE reverse_indices_hashed_uint16(buf, keys, rank, hist, ri, b_sz, tsize, nbins, ri_sz, dims, strides, ndim, &
+                                           min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, nbins, ri_sz, ndim, i, o, j, d, p, base, n_outer, h, mask, key, b
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(IN) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(IN) :: rank
+       !f2py depend(tsize), rank
+
+       INTEGER*4, DIMENSION(nbins), INTENT(IN) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py threadsafe
+       ri(1) = nbins + 1
+       do b = 1, nbins
+          ri(b+1) = ri(b) + hist(b)
+       enddo
+
+       allocate(pos(nbins))
+       pos = 0
+       mask = tsize - 1
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 4), 65535_4)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while (keys(h) .ne. key)
+                   h = iand(h, mask) + 1
+                enddo
+                b = rank(h) + 1
+                pos(b) = pos(b) + 1
+                ri(ri(b) + pos(b)) = int(i, 4)
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_hashed_uint16
+
+    SUBROUTINE hash_bins_int32(buf, keys, counts, b_sz, tsize, dims, strides, ndim, min_, max_, max_bin, binsz, nocc)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, ndim, nocc, o, j, d, p, base, n_outer, h, mask, key
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(INOUT) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(INOUT) :: counts
+       !f2py depend(tsize), counts
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py intent(out) nocc
+       !f2py threadsafe
+       mask = tsize - 1
+       nocc = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while ((keys(h) .ne. key) .and. (keys(h) .ne. -1))
+                   h = iand(h, mask) + 1
+                enddo
+                if (keys(h) .eq. -1) then
+                   keys(h) = key
+                   nocc = nocc + 1
+                   if (2 * nocc .gt. tsize) then
+                      nocc = -1
+                      return
+                   endif
+                endif
+                counts(h) = counts(h) + 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE hash_bins_int32
+
+    SUBROUTINE reverse_indices_hashed_int32(buf, keys, rank, hist, ri, b_sz, tsize, nbins, ri_sz, dims, strides, ndim, &
+                                           min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, nbins, ri_sz, ndim, i, o, j, d, p, base, n_outer, h, mask, key, b
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(IN) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(IN) :: rank
+       !f2py depend(tsize), rank
+
+       INTEGER*4, DIMENSION(nbins), INTENT(IN) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py threadsafe
+       ri(1) = nbins + 1
+       do b = 1, nbins
+          ri(b+1) = ri(b) + hist(b)
+       enddo
+
+       allocate(pos(nbins))
+       pos = 0
+       mask = tsize - 1
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while (keys(h) .ne. key)
+                   h = iand(h, mask) + 1
+                enddo
+                b = rank(h) + 1
+                pos(b) = pos(b) + 1
+                ri(ri(b) + pos(b)) = int(i, 4)
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_hashed_int32
+
+    SUBROUTINE hash_bins_uint32(buf, keys, counts, b_sz, tsize, dims, strides, ndim, min_, max_, max_bin, binsz, nocc)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, ndim, nocc, o, j, d, p, base, n_outer, h, mask, key
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(INOUT) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(INOUT) :: counts
+       !f2py depend(tsize), counts
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py intent(out) nocc
+       !f2py threadsafe
+       mask = tsize - 1
+       nocc = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 8), 4294967295_8)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while ((keys(h) .ne. key) .and. (keys(h) .ne. -1))
+                   h = iand(h, mask) + 1
+                enddo
+                if (keys(h) .eq. -1) then
+                   keys(h) = key
+                   nocc = nocc + 1
+                   if (2 * nocc .gt. tsize) then
+                      nocc = -1
+                      return
+                   endif
+                endif
+                counts(h) = counts(h) + 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE hash_bins_uint32
+
+    SUBROUTINE reverse_indices_hashed_uint32(buf, keys, rank, hist, ri, b_sz, tsize, nbins, ri_sz, dims, strides, ndim, &
+                                           min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, nbins, ri_sz, ndim, i, o, j, d, p, base, n_outer, h, mask, key, b
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(IN) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(IN) :: rank
+       !f2py depend(tsize), rank
+
+       INTEGER*4, DIMENSION(nbins), INTENT(IN) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py threadsafe
+       ri(1) = nbins + 1
+       do b = 1, nbins
+          ri(b+1) = ri(b) + hist(b)
+       enddo
+
+       allocate(pos(nbins))
+       pos = 0
+       mask = tsize - 1
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 8), 4294967295_8)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while (keys(h) .ne. key)
+                   h = iand(h, mask) + 1
+                enddo
+                b = rank(h) + 1
+                pos(b) = pos(b) + 1
+                ri(ri(b) + pos(b)) = int(i, 4)
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_hashed_uint32
+
+    SUBROUTINE hash_bins_int64(buf, keys, counts, b_sz, tsize, dims, strides, ndim, min_, max_, max_bin, binsz, nocc)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, ndim, nocc, o, j, d, p, base, n_outer, h, mask, key
+       INTEGER*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(INOUT) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(INOUT) :: counts
+       !f2py depend(tsize), counts
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py intent(out) nocc
+       !f2py threadsafe
+       mask = tsize - 1
+       nocc = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while ((keys(h) .ne. key) .and. (keys(h) .ne. -1))
+                   h = iand(h, mask) + 1
+                enddo
+                if (keys(h) .eq. -1) then
+                   keys(h) = key
+                   nocc = nocc + 1
+                   if (2 * nocc .gt. tsize) then
+                      nocc = -1
+                      return
+                   endif
+                endif
+                counts(h) = counts(h) + 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE hash_bins_int64
+
+    SUBROUTINE reverse_indices_hashed_int64(buf, keys, rank, hist, ri, b_sz, tsize, nbins, ri_sz, dims, strides, ndim, &
+                                           min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, nbins, ri_sz, ndim, i, o, j, d, p, base, n_outer, h, mask, key, b
+       INTEGER*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(IN) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(IN) :: rank
+       !f2py depend(tsize), rank
+
+       INTEGER*4, DIMENSION(nbins), INTENT(IN) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py threadsafe
+       ri(1) = nbins + 1
+       do b = 1, nbins
+          ri(b+1) = ri(b) + hist(b)
+       enddo
+
+       allocate(pos(nbins))
+       pos = 0
+       mask = tsize - 1
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while (keys(h) .ne. key)
+                   h = iand(h, mask) + 1
+                enddo
+                b = rank(h) + 1
+                pos(b) = pos(b) + 1
+                ri(ri(b) + pos(b)) = int(i, 4)
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_hashed_int64
+
+    SUBROUTINE hash_bins_float32(buf, keys, counts, b_sz, tsize, dims, strides, ndim, min_, max_, max_bin, binsz, nocc)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, ndim, nocc, o, j, d, p, base, n_outer, h, mask, key
+       REAL*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(INOUT) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(INOUT) :: counts
+       !f2py depend(tsize), counts
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       REAL*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py intent(out) nocc
+       !f2py threadsafe
+       mask = tsize - 1
+       nocc = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while ((keys(h) .ne. key) .and. (keys(h) .ne. -1))
+                   h = iand(h, mask) + 1
+                enddo
+                if (keys(h) .eq. -1) then
+                   keys(h) = key
+                   nocc = nocc + 1
+                   if (2 * nocc .gt. tsize) then
+                      nocc = -1
+                      return
+                   endif
+                endif
+                counts(h) = counts(h) + 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE hash_bins_float32
+
+    SUBROUTINE reverse_indices_hashed_float32(buf, keys, rank, hist, ri, b_sz, tsize, nbins, ri_sz, dims, strides, ndim, &
+                                           min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, nbins, ri_sz, ndim, i, o, j, d, p, base, n_outer, h, mask, key, b
+       REAL*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(IN) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(IN) :: rank
+       !f2py depend(tsize), rank
+
+       INTEGER*4, DIMENSION(nbins), INTENT(IN) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       REAL*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py threadsafe
+       ri(1) = nbins + 1
+       do b = 1, nbins
+          ri(b+1) = ri(b) + hist(b)
+       enddo
+
+       allocate(pos(nbins))
+       pos = 0
+       mask = tsize - 1
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while (keys(h) .ne. key)
+                   h = iand(h, mask) + 1
+                enddo
+                b = rank(h) + 1
+                pos(b) = pos(b) + 1
+                ri(ri(b) + pos(b)) = int(i, 4)
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_hashed_float32
+
+    SUBROUTINE hash_bins_float64(buf, keys, counts, b_sz, tsize, dims, strides, ndim, min_, max_, max_bin, binsz, nocc)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, ndim, nocc, o, j, d, p, base, n_outer, h, mask, key
+       REAL*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(INOUT) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(INOUT) :: counts
+       !f2py depend(tsize), counts
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       REAL*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py intent(out) nocc
+       !f2py threadsafe
+       mask = tsize - 1
+       nocc = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while ((keys(h) .ne. key) .and. (keys(h) .ne. -1))
+                   h = iand(h, mask) + 1
+                enddo
+                if (keys(h) .eq. -1) then
+                   keys(h) = key
+                   nocc = nocc + 1
+                   if (2 * nocc .gt. tsize) then
+                      nocc = -1
+                      return
+                   endif
+                endif
+                counts(h) = counts(h) + 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+
+    END SUBROUTINE hash_bins_float64
+
+    SUBROUTINE reverse_indices_hashed_float64(buf, keys, rank, hist, ri, b_sz, tsize, nbins, ri_sz, dims, strides, ndim, &
+                                           min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, tsize, nbins, ri_sz, ndim, i, o, j, d, p, base, n_outer, h, mask, key, b
+       REAL*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*8, DIMENSION(tsize), INTENT(IN) :: keys
+       !f2py depend(tsize), keys
+
+       INTEGER*4, DIMENSION(tsize), INTENT(IN) :: rank
+       !f2py depend(tsize), rank
+
+       INTEGER*4, DIMENSION(nbins), INTENT(IN) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       REAL*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       !f2py threadsafe
+       ri(1) = nbins + 1
+       do b = 1, nbins
+          ri(b+1) = ri(b) + hist(b)
+       enddo
+
+       allocate(pos(nbins))
+       pos = 0
+       mask = tsize - 1
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             if ((v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)) then
+                key = floor((v - min_) / binsz, 8)
+                h = iand(ishft(key * (-7046029254386353131_8), -32), mask) + 1
+                do while (keys(h) .ne. key)
+                   h = iand(h, mask) + 1
+                enddo
+                b = rank(h) + 1
+                pos(b) = pos(b) + 1
+                ri(ri(b) + pos(b)) = int(i, 4)
+             endif
+             i = i + 1
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_hashed_float64
+    ! Selected bin kernels
+
+    SUBROUTINE reverse_indices_select_int8(buf, sel, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*1, DIMENSION(nbins), INTENT(IN) :: sel
+       !f2py depend(nbins), sel
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! The reverse indices of the selected bins only, sel flagging the
+       ! bins to record. ri holds the offsets of the bins on input, as
+       ! per the layout of the strided kernels, the unselected bins
+       ! being empty.
+       allocate(pos(nbins))
+       pos = 0
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             i = i + 1
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             if (sel(ind) .ne. 0) then
+                pos(ind) = pos(ind) + 1
+                ri(ri(ind) + pos(ind) + 1) = i - 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_select_int8
+
+    SUBROUTINE reverse_indices_select_uint8(buf, sel, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*1, DIMENSION(nbins), INTENT(IN) :: sel
+       !f2py depend(nbins), sel
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! The reverse indices of the selected bins only, sel flagging the
+       ! bins to record. ri holds the offsets of the bins on input, as
+       ! per the layout of the strided kernels, the unselected bins
+       ! being empty.
+       allocate(pos(nbins))
+       pos = 0
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 2), 255_2)
+             i = i + 1
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             if (sel(ind) .ne. 0) then
+                pos(ind) = pos(ind) + 1
+                ri(ri(ind) + pos(ind) + 1) = i - 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_select_uint8
+
+    SUBROUTINE reverse_indices_select_int16(buf, sel, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*1, DIMENSION(nbins), INTENT(IN) :: sel
+       !f2py depend(nbins), sel
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! The reverse indices of the selected bins only, sel flagging the
+       ! bins to record. ri holds the offsets of the bins on input, as
+       ! per the layout of the strided kernels, the unselected bins
+       ! being empty.
+       allocate(pos(nbins))
+       pos = 0
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             i = i + 1
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             if (sel(ind) .ne. 0) then
+                pos(ind) = pos(ind) + 1
+                ri(ri(ind) + pos(ind) + 1) = i - 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_select_int16
+
+    SUBROUTINE reverse_indices_select_uint16(buf, sel, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*1, DIMENSION(nbins), INTENT(IN) :: sel
+       !f2py depend(nbins), sel
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! The reverse indices of the selected bins only, sel flagging the
+       ! bins to record. ri holds the offsets of the bins on input, as
+       ! per the layout of the strided kernels, the unselected bins
+       ! being empty.
+       allocate(pos(nbins))
+       pos = 0
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 4), 65535_4)
+             i = i + 1
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             if (sel(ind) .ne. 0) then
+                pos(ind) = pos(ind) + 1
+                ri(ri(ind) + pos(ind) + 1) = i - 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_select_uint16
+
+    SUBROUTINE reverse_indices_select_int32(buf, sel, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*1, DIMENSION(nbins), INTENT(IN) :: sel
+       !f2py depend(nbins), sel
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! The reverse indices of the selected bins only, sel flagging the
+       ! bins to record. ri holds the offsets of the bins on input, as
+       ! per the layout of the strided kernels, the unselected bins
+       ! being empty.
+       allocate(pos(nbins))
+       pos = 0
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             i = i + 1
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             if (sel(ind) .ne. 0) then
+                pos(ind) = pos(ind) + 1
+                ri(ri(ind) + pos(ind) + 1) = i - 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_select_int32
+
+    SUBROUTINE reverse_indices_select_uint32(buf, sel, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*1, DIMENSION(nbins), INTENT(IN) :: sel
+       !f2py depend(nbins), sel
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! The reverse indices of the selected bins only, sel flagging the
+       ! bins to record. ri holds the offsets of the bins on input, as
+       ! per the layout of the strided kernels, the unselected bins
+       ! being empty.
+       allocate(pos(nbins))
+       pos = 0
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = iand(int(buf(p), 8), 4294967295_8)
+             i = i + 1
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             if (sel(ind) .ne. 0) then
+                pos(ind) = pos(ind) + 1
+                ri(ri(ind) + pos(ind) + 1) = i - 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_select_uint32
+
+    SUBROUTINE reverse_indices_select_int64(buf, sel, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i
+       INTEGER*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*1, DIMENSION(nbins), INTENT(IN) :: sel
+       !f2py depend(nbins), sel
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
 
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       INTEGER*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! The reverse indices of the selected bins only, sel flagging the
+       ! bins to record. ri holds the offsets of the bins on input, as
+       ! per the layout of the strided kernels, the unselected bins
+       ! being empty.
+       allocate(pos(nbins))
+       pos = 0
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             i = i + 1
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             if (sel(ind) .ne. 0) then
+                pos(ind) = pos(ind) + 1
+                ri(ri(ind) + pos(ind) + 1) = i - 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_select_int64
+
+    SUBROUTINE reverse_indices_select_float32(buf, sel, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i
+       REAL*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*1, DIMENSION(nbins), INTENT(IN) :: sel
+       !f2py depend(nbins), sel
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       REAL*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! The reverse indices of the selected bins only, sel flagging the
+       ! bins to record. ri holds the offsets of the bins on input, as
+       ! per the layout of the strided kernels, the unselected bins
+       ! being empty.
+       allocate(pos(nbins))
+       pos = 0
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             i = i + 1
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             if (sel(ind) .ne. 0) then
+                pos(ind) = pos(ind) + 1
+                ri(ri(ind) + pos(ind) + 1) = i - 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_select_float32
+
+    SUBROUTINE reverse_indices_select_float64(buf, sel, ri, nbins, b_sz, ri_sz, dims, strides, ndim, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, ri_sz, nbins, ndim, y, ind, o, j, d, p, base, n_outer
+       INTEGER*8 :: i
+       REAL*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*1, DIMENSION(nbins), INTENT(IN) :: sel
+       !f2py depend(nbins), sel
+
+       INTEGER*4, DIMENSION(ri_sz), INTENT(INOUT) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(ndim), INTENT(IN) :: dims, strides
+       !f2py depend(ndim), dims, strides
+
+       INTEGER*8, DIMENSION(ndim) :: ctr
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: pos
+       REAL*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! The reverse indices of the selected bins only, sel flagging the
+       ! bins to record. ri holds the offsets of the bins on input, as
+       ! per the layout of the strided kernels, the unselected bins
+       ! being empty.
+       allocate(pos(nbins))
+       pos = 0
+       i = 0
+       n_outer = 1
+       do d = 1, ndim - 1
+          n_outer = n_outer * dims(d)
+       enddo
+       ctr = 0
+       base = 1
+       do o = 1, n_outer
+          p = base
+          do j = 1, dims(ndim)
+             v = buf(p)
+             i = i + 1
+             tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+             y = tf * tf
+             ind = 1 + ((floor((v - min_) / binsz) + 1) * y)
+             if (sel(ind) .ne. 0) then
+                pos(ind) = pos(ind) + 1
+                ri(ri(ind) + pos(ind) + 1) = i - 1
+             endif
+             p = p + strides(ndim)
+          enddo
+          d = ndim - 1
+          do while (d .ge. 1)
+             ctr(d) = ctr(d) + 1
+             base = base + strides(d)
+             if (ctr(d) .lt. dims(d)) exit
+             base = base - ctr(d) * strides(d)
+             ctr(d) = 0
+             d = d - 1
+          enddo
+       enddo
+       deallocate(pos)
+
+    END SUBROUTINE reverse_indices_select_float64
+    ! Axis kernels
+
+    SUBROUTINE histogram_axis_int8(buf, hist, b_sz, h_sz, nbins, npix, ntime, tstride, pstride, &
+                                    p0, p1, blk, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, h_sz, nbins, npix, ntime, tstride, pstride
+       INTEGER*8 :: p0, p1, blk, y, ind, t, p, b0, b1, q, base
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(h_sz), INTENT(INOUT) :: hist
+       !f2py depend(h_sz), hist
+
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of a (ntime, npix) array, whose element
+       ! strides are tstride and pstride, and hist is a C ordered
+       ! (nbins, npix) array, the first bin holding the out of range
+       ! elements. Only the pixels within [p0, p1] are counted, so that
+       ! disjoint ranges can be counted concurrently. The arithmetic is
+       ! that of the contiguous kernels.
+       ! The pixels are counted in blocks of blk, streaming through the
+       ! time slices of a block whilst its histograms remain in cache.
+       do b0 = p0, p1, blk
+          b1 = min(b0 + blk - 1, p1)
+          base = 1 + (b0 - 1) * pstride
+          do t = 1, ntime
+             q = base
+             do p = b0, b1
+                v = buf(q)
+                tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+                y = tf * tf
+                ind = (floor((v - min_) / binsz) + 1) * y
+                hist(ind * npix + p) = hist(ind * npix + p) + y
+                q = q + pstride
+             enddo
+             base = base + tstride
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_axis_int8
+
+    SUBROUTINE histogram_axis_uint8(buf, hist, b_sz, h_sz, nbins, npix, ntime, tstride, pstride, &
+                                    p0, p1, blk, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, h_sz, nbins, npix, ntime, tstride, pstride
+       INTEGER*8 :: p0, p1, blk, y, ind, t, p, b0, b1, q, base
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(h_sz), INTENT(INOUT) :: hist
+       !f2py depend(h_sz), hist
+
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of a (ntime, npix) array, whose element
+       ! strides are tstride and pstride, and hist is a C ordered
+       ! (nbins, npix) array, the first bin holding the out of range
+       ! elements. Only the pixels within [p0, p1] are counted, so that
+       ! disjoint ranges can be counted concurrently. The arithmetic is
+       ! that of the contiguous kernels.
+       ! The pixels are counted in blocks of blk, streaming through the
+       ! time slices of a block whilst its histograms remain in cache.
+       do b0 = p0, p1, blk
+          b1 = min(b0 + blk - 1, p1)
+          base = 1 + (b0 - 1) * pstride
+          do t = 1, ntime
+             q = base
+             do p = b0, b1
+                v = iand(int(buf(q), 2), 255_2)
+                tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+                y = tf * tf
+                ind = (floor((v - min_) / binsz) + 1) * y
+                hist(ind * npix + p) = hist(ind * npix + p) + y
+                q = q + pstride
+             enddo
+             base = base + tstride
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_axis_uint8
+
+    SUBROUTINE histogram_axis_int16(buf, hist, b_sz, h_sz, nbins, npix, ntime, tstride, pstride, &
+                                    p0, p1, blk, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, h_sz, nbins, npix, ntime, tstride, pstride
+       INTEGER*8 :: p0, p1, blk, y, ind, t, p, b0, b1, q, base
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(h_sz), INTENT(INOUT) :: hist
+       !f2py depend(h_sz), hist
+
+       INTEGER*2 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of a (ntime, npix) array, whose element
+       ! strides are tstride and pstride, and hist is a C ordered
+       ! (nbins, npix) array, the first bin holding the out of range
+       ! elements. Only the pixels within [p0, p1] are counted, so that
+       ! disjoint ranges can be counted concurrently. The arithmetic is
+       ! that of the contiguous kernels.
+       ! The pixels are counted in blocks of blk, streaming through the
+       ! time slices of a block whilst its histograms remain in cache.
+       do b0 = p0, p1, blk
+          b1 = min(b0 + blk - 1, p1)
+          base = 1 + (b0 - 1) * pstride
+          do t = 1, ntime
+             q = base
+             do p = b0, b1
+                v = buf(q)
+                tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+                y = tf * tf
+                ind = (floor((v - min_) / binsz) + 1) * y
+                hist(ind * npix + p) = hist(ind * npix + p) + y
+                q = q + pstride
+             enddo
+             base = base + tstride
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_axis_int16
+
+    SUBROUTINE histogram_axis_uint16(buf, hist, b_sz, h_sz, nbins, npix, ntime, tstride, pstride, &
+                                    p0, p1, blk, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, h_sz, nbins, npix, ntime, tstride, pstride
+       INTEGER*8 :: p0, p1, blk, y, ind, t, p, b0, b1, q, base
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(h_sz), INTENT(INOUT) :: hist
+       !f2py depend(h_sz), hist
+
+       INTEGER*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of a (ntime, npix) array, whose element
+       ! strides are tstride and pstride, and hist is a C ordered
+       ! (nbins, npix) array, the first bin holding the out of range
+       ! elements. Only the pixels within [p0, p1] are counted, so that
+       ! disjoint ranges can be counted concurrently. The arithmetic is
+       ! that of the contiguous kernels.
+       ! The pixels are counted in blocks of blk, streaming through the
+       ! time slices of a block whilst its histograms remain in cache.
+       do b0 = p0, p1, blk
+          b1 = min(b0 + blk - 1, p1)
+          base = 1 + (b0 - 1) * pstride
+          do t = 1, ntime
+             q = base
+             do p = b0, b1
+                v = iand(int(buf(q), 4), 65535_4)
+                tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+                y = tf * tf
+                ind = (floor((v - min_) / binsz) + 1) * y
+                hist(ind * npix + p) = hist(ind * npix + p) + y
+                q = q + pstride
+             enddo
+             base = base + tstride
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_axis_uint16
+
+    SUBROUTINE histogram_axis_int32(buf, hist, b_sz, h_sz, nbins, npix, ntime, tstride, pstride, &
+                                    p0, p1, blk, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, h_sz, nbins, npix, ntime, tstride, pstride
+       INTEGER*8 :: p0, p1, blk, y, ind, t, p, b0, b1, q, base
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(h_sz), INTENT(INOUT) :: hist
+       !f2py depend(h_sz), hist
+
+       INTEGER*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of a (ntime, npix) array, whose element
+       ! strides are tstride and pstride, and hist is a C ordered
+       ! (nbins, npix) array, the first bin holding the out of range
+       ! elements. Only the pixels within [p0, p1] are counted, so that
+       ! disjoint ranges can be counted concurrently. The arithmetic is
+       ! that of the contiguous kernels.
+       ! The pixels are counted in blocks of blk, streaming through the
+       ! time slices of a block whilst its histograms remain in cache.
+       do b0 = p0, p1, blk
+          b1 = min(b0 + blk - 1, p1)
+          base = 1 + (b0 - 1) * pstride
+          do t = 1, ntime
+             q = base
+             do p = b0, b1
+                v = buf(q)
+                tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+                y = tf * tf
+                ind = (floor((v - min_) / binsz) + 1) * y
+                hist(ind * npix + p) = hist(ind * npix + p) + y
+                q = q + pstride
+             enddo
+             base = base + tstride
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_axis_int32
+
+    SUBROUTINE histogram_axis_uint32(buf, hist, b_sz, h_sz, nbins, npix, ntime, tstride, pstride, &
+                                    p0, p1, blk, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, h_sz, nbins, npix, ntime, tstride, pstride
+       INTEGER*8 :: p0, p1, blk, y, ind, t, p, b0, b1, q, base
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(h_sz), INTENT(INOUT) :: hist
+       !f2py depend(h_sz), hist
+
+       INTEGER*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of a (ntime, npix) array, whose element
+       ! strides are tstride and pstride, and hist is a C ordered
+       ! (nbins, npix) array, the first bin holding the out of range
+       ! elements. Only the pixels within [p0, p1] are counted, so that
+       ! disjoint ranges can be counted concurrently. The arithmetic is
+       ! that of the contiguous kernels.
+       ! The pixels are counted in blocks of blk, streaming through the
+       ! time slices of a block whilst its histograms remain in cache.
+       do b0 = p0, p1, blk
+          b1 = min(b0 + blk - 1, p1)
+          base = 1 + (b0 - 1) * pstride
+          do t = 1, ntime
+             q = base
+             do p = b0, b1
+                v = iand(int(buf(q), 8), 4294967295_8)
+                tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+                y = tf * tf
+                ind = (floor((v - min_) / binsz) + 1) * y
+                hist(ind * npix + p) = hist(ind * npix + p) + y
+                q = q + pstride
+             enddo
+             base = base + tstride
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_axis_uint32
+
+    SUBROUTINE histogram_axis_int64(buf, hist, b_sz, h_sz, nbins, npix, ntime, tstride, pstride, &
+                                    p0, p1, blk, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, h_sz, nbins, npix, ntime, tstride, pstride
+       INTEGER*8 :: p0, p1, blk, y, ind, t, p, b0, b1, q, base
+       INTEGER*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(h_sz), INTENT(INOUT) :: hist
+       !f2py depend(h_sz), hist
+
+       INTEGER*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of a (ntime, npix) array, whose element
+       ! strides are tstride and pstride, and hist is a C ordered
+       ! (nbins, npix) array, the first bin holding the out of range
+       ! elements. Only the pixels within [p0, p1] are counted, so that
+       ! disjoint ranges can be counted concurrently. The arithmetic is
+       ! that of the contiguous kernels.
+       ! The pixels are counted in blocks of blk, streaming through the
+       ! time slices of a block whilst its histograms remain in cache.
+       do b0 = p0, p1, blk
+          b1 = min(b0 + blk - 1, p1)
+          base = 1 + (b0 - 1) * pstride
+          do t = 1, ntime
+             q = base
+             do p = b0, b1
+                v = buf(q)
+                tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+                y = tf * tf
+                ind = (floor((v - min_) / binsz) + 1) * y
+                hist(ind * npix + p) = hist(ind * npix + p) + y
+                q = q + pstride
+             enddo
+             base = base + tstride
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_axis_int64
+
+    SUBROUTINE histogram_axis_float32(buf, hist, b_sz, h_sz, nbins, npix, ntime, tstride, pstride, &
+                                    p0, p1, blk, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, h_sz, nbins, npix, ntime, tstride, pstride
+       INTEGER*8 :: p0, p1, blk, y, ind, t, p, b0, b1, q, base
+       REAL*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(h_sz), INTENT(INOUT) :: hist
+       !f2py depend(h_sz), hist
+
+       REAL*4 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of a (ntime, npix) array, whose element
+       ! strides are tstride and pstride, and hist is a C ordered
+       ! (nbins, npix) array, the first bin holding the out of range
+       ! elements. Only the pixels within [p0, p1] are counted, so that
+       ! disjoint ranges can be counted concurrently. The arithmetic is
+       ! that of the contiguous kernels.
+       ! The pixels are counted in blocks of blk, streaming through the
+       ! time slices of a block whilst its histograms remain in cache.
+       do b0 = p0, p1, blk
+          b1 = min(b0 + blk - 1, p1)
+          base = 1 + (b0 - 1) * pstride
+          do t = 1, ntime
+             q = base
+             do p = b0, b1
+                v = buf(q)
+                tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+                y = tf * tf
+                ind = (floor((v - min_) / binsz) + 1) * y
+                hist(ind * npix + p) = hist(ind * npix + p) + y
+                q = q + pstride
+             enddo
+             base = base + tstride
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_axis_float32
+
+    SUBROUTINE histogram_axis_float64(buf, hist, b_sz, h_sz, nbins, npix, ntime, tstride, pstride, &
+                                    p0, p1, blk, min_, max_, max_bin, binsz)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, h_sz, nbins, npix, ntime, tstride, pstride
+       INTEGER*8 :: p0, p1, blk, y, ind, t, p, b0, b1, q, base
+       REAL*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+
+       INTEGER*4, DIMENSION(h_sz), INTENT(INOUT) :: hist
+       !f2py depend(h_sz), hist
+
+       REAL*8 :: min_, max_, v
+       REAL*8 :: binsz, max_bin
+       INTEGER :: tf
+       !f2py threadsafe
+
+       ! buf spans the memory of a (ntime, npix) array, whose element
+       ! strides are tstride and pstride, and hist is a C ordered
+       ! (nbins, npix) array, the first bin holding the out of range
+       ! elements. Only the pixels within [p0, p1] are counted, so that
+       ! disjoint ranges can be counted concurrently. The arithmetic is
+       ! that of the contiguous kernels.
+       ! The pixels are counted in blocks of blk, streaming through the
+       ! time slices of a block whilst its histograms remain in cache.
+       do b0 = p0, p1, blk
+          b1 = min(b0 + blk - 1, p1)
+          base = 1 + (b0 - 1) * pstride
+          do t = 1, ntime
+             q = base
+             do p = b0, b1
+                v = buf(q)
+                tf = (v .le. max_) .and. (v .ge. min_) .and. (v .lt. max_bin)
+                y = tf * tf
+                ind = (floor((v - min_) / binsz) + 1) * y
+                hist(ind * npix + p) = hist(ind * npix + p) + y
+                q = q + pstride
+             enddo
+             base = base + tstride
+          enddo
+       enddo
+
+    END SUBROUTINE histogram_axis_float64
+END MODULE idl_histogram
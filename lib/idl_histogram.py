@@ -3,13 +3,44 @@
 from __future__ import print_function
 from __future__ import absolute_import
 import numpy
+from numpy.lib.stride_tricks import as_strided
 import datetime
-import _idl_histogram
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+try:
+    import _idl_histogram
+except ImportError:
+    _idl_histogram = None
+
+# The engines available for computing the histogram, in order of
+# preference. The numpy engine is always available, whereas the fortran
+# engine requires the compiled extension.
+BACKENDS = ['fortran', 'numpy'] if _idl_histogram is not None else ['numpy']
+
+# The number of elements per chunk when computing compressed reverse indices
+CHUNK_SIZE = 2**22
+
+# The number of log spaced bins beyond which the bin of an element is
+# estimated from its logarithm, rather than by a binary search of the edges.
+LOG_SEARCH_BINS = 8192
+
+# The size in bytes of the per pixel histograms counted as a block when
+# axis is set, chosen so that a block remains in cache.
+AXIS_BLOCK_BYTES = 2**18
+
+# The number of elements sampled to estimate the number of occupied bins
+# of a sparse histogram.
+SPARSE_SAMPLE = 2**16
+
+# The ratio of nbins to the estimated number of occupied bins beyond which
+# the occupied bins of a sparse histogram are hashed rather than counted.
+SPARSE_RATIO = 16
 
 
 def histogram(data, binsize=None, maxv=None, minv=None, nbins=None, omax=None,
               omin=None, reverse_indices=None, locations=None, input_arr=None,
-              nan=False):
+              nan=False, backend=None, edges=None, log=False, sparse=None,
+              compress=False, ri_bins=None, axis=None, nthreads=None):
     """
     Replicates the histogram function avaiable within IDL
     (Interactive Data Language, EXELISvis).
@@ -61,9 +92,72 @@ def histogram(data, binsize=None, maxv=None, minv=None, nbins=None, omax=None,
         If set to True (Default is False) then nan values will be
         accounted for and treated as missing data.
 
+    :param backend:
+        (Optional) The engine used to compute the histogram and reverse
+        indices; 'fortran' or 'numpy'. Both produce identical results.
+        Default is the first of BACKENDS, i.e. 'fortran' if the compiled
+        extension is available, otherwise 'numpy'.
+
+    :param edges:
+        (Optional) A 1-Dimensional array of monotonically increasing bin
+        edges, defining len(edges) - 1 bins of arbitrary width. The ith
+        bin contains the values within [edges[i], edges[i+1]), the last
+        bin also containing edges[-1]. Cannot be set with binsize, maxv,
+        minv, nbins or log.
+
+    :param log:
+        If set to True (Default is False) then the bins are evenly spaced
+        in log10, binsize being in decades (Default is 1). minv must be
+        positive, and if not specified the array will be searched for the
+        smallest positive value. Values are included up to maxv, as per
+        the linear bins.
+
+    :param sparse:
+        (Optional) A string name used to refer to the dictionary key that
+        will contain the (int64) bins containing at least one element, in
+        ascending order. The histogram, locations and reverse indices then
+        refer to those bins only. If the histogram is larger than the
+        array, or than SPARSE_RATIO times the number of occupied bins
+        (estimated from a sample of SPARSE_SAMPLE elements), then the
+        bins are found by hashing rather than counting, so that memory
+        scales with the number of distinct bins rather than nbins; e.g.
+        for sparse label ids. Cannot be set with input_arr, edges or
+        log.
+
+    :param compress:
+        If set to True (Default is False) then the reverse indices are
+        returned as a CompressedReverseIndices, computed over chunks of
+        CHUNK_SIZE elements so that the raw reverse indices of the
+        entire array are never held. Requires reverse_indices, and cannot
+        be set with edges, log or sparse.
+
+    :param ri_bins:
+        (Optional) A list or 1D array of the bins whose reverse indices
+        are to be recorded. Every bin is still counted, however the
+        reverse indices of the other bins are empty, so that their size
+        is that of the selected elements rather than the array.
+        Requires reverse_indices, and cannot be set with edges, log,
+        sparse or compress.
+
+    :param axis:
+        (Optional) The axis along which a histogram is computed for every
+        element of the remaining dimensions, e.g. the time axis of a
+        (time, rows, cols) image stack. The bins are common to all the
+        histograms, and are derived from the entire array as per usual.
+        The histogram is then of shape (nbins, rows, cols). Cannot be set
+        with reverse_indices, input_arr, edges, log or sparse.
+
+    :param nthreads:
+        (Optional) The number of threads over which the elements are
+        distributed when axis is set. Default is the number of CPUs.
+
     :return:
         A dictionary containing the histogram and other optional components.
         The dictionary key name for the histogram is 'histogram'.
+        If edges or log are set, then the locations are the left edges of
+        the bins, of type float64.
+        If axis is set, then the histogram is of shape (nbins,) plus the
+        shape of the remaining dimensions.
 
     Example:
 
@@ -81,6 +175,14 @@ def histogram(data, binsize=None, maxv=None, minv=None, nbins=None, omax=None,
        *  05/04/2013: Added nan keyword
        *  05/06/2013: Now checks for max value of 256 and datatype of 'uint8'
        *  12/06/2013: Added input_arr keyword
+       *  19/10/2026: Added backend keyword and a numpy engine
+       *  19/10/2026: Integer data with a power of two binsize is binned
+                      with integer arithmetic
+       *  19/10/2026: Added edges and log keywords
+       *  19/10/2026: Added sparse keyword
+       *  19/10/2026: Added compress keyword
+       *  19/10/2026: Added ri_bins keyword
+       *  19/10/2026: Added axis and nthreads keywords
 
     :copyright:
         Copyright (c) 2014, Josh Sixsmith
@@ -291,19 +393,30 @@ def histogram(data, binsize=None, maxv=None, minv=None, nbins=None, omax=None,
                 'float64': '5'}.get(instr, 'Error')
 
     def data_convert(val, b):
+        # Only the requested type is evaluated, as a value may not be
+        # representable by the others
         instr = str(val)
-        return {'int8': numpy.int8(b),
-                'uint8': numpy.uint8(b),
-                'int16': numpy.int16(b),
-                'uint16': numpy.uint16(b),
-                'int32': numpy.int32(b),
-                'uint32': numpy.uint32(b),
-                'int64': numpy.int64(b),
-                'uint64': numpy.uint64(b),
-                'int': numpy.int64(b),
-                'float32': numpy.float32(b),
-                'float64': numpy.float64(b)}.get(instr, 'Error')
-
+        convert = {'int8': numpy.int8,
+                   'uint8': numpy.uint8,
+                   'int16': numpy.int16,
+                   'uint16': numpy.uint16,
+                   'int32': numpy.int32,
+                   'uint32': numpy.uint32,
+                   'int64': numpy.int64,
+                   'uint64': numpy.uint64,
+                   'int': numpy.int64,
+                   'float32': numpy.float32,
+                   'float64': numpy.float64}
+        if instr not in convert:
+            return 'Error'
+        return convert[instr](b)
+
+
+    if backend is None:
+        backend = BACKENDS[0]
+    if backend not in BACKENDS:
+        msg = "Error. backend must be one of {}".format(BACKENDS)
+        raise ValueError(msg)
 
     dtype = datatype(data.dtype.name)
     if (dtype == 'Error'):
@@ -312,7 +425,16 @@ def histogram(data, binsize=None, maxv=None, minv=None, nbins=None, omax=None,
                "float32, float64")
         raise TypeError(msg)
 
-    if len(data.shape) != 1:
+    # Non-contiguous arrays are walked in place by the strided kernels,
+    # rather than copied by ravel. The strided kernels read each type
+    # natively, so they also avoid the copy made by f2py when converting
+    # the types that the contiguous kernels promote.
+    strided = None
+    promoted = data.dtype.name in ('int8', 'uint8', 'uint16', 'uint32')
+    if ((backend == 'fortran') & ((not data.flags.c_contiguous) | promoted)):
+        strided = _strided_buffer(data)
+
+    if ((strided is None) & (len(data.shape) != 1) & (axis is None)):
         data = data.ravel()
 
     if ((maxv is not None) & (binsize is not None) & (nbins is not None)):
@@ -325,6 +447,61 @@ def histogram(data, binsize=None, maxv=None, minv=None, nbins=None, omax=None,
                "reverse_indices cannot be set at the same time.")
         raise Exception(msg)
 
+    if (compress & ((reverse_indices is None) | (edges is not None) | log |
+                    (sparse is not None))):
+        msg = ("Error. Conflicting Keywords. compress requires "
+               "reverse_indices, and cannot be set with edges, log or "
+               "sparse.")
+        raise Exception(msg)
+
+    if ((ri_bins is not None) & ((reverse_indices is None) |
+                                 (edges is not None) | log | compress |
+                                 (sparse is not None))):
+        msg = ("Error. Conflicting Keywords. ri_bins requires "
+               "reverse_indices, and cannot be set with edges, log, sparse "
+               "or compress.")
+        raise Exception(msg)
+
+    if ((sparse is not None) & ((input_arr is not None) |
+                                (edges is not None) | log)):
+        msg = ("Error. Conflicting Keywords. sparse cannot be set with "
+               "input_arr, edges or log.")
+        raise Exception(msg)
+
+    if ((axis is not None) & ((reverse_indices is not None) |
+                              (input_arr is not None) | (edges is not None) |
+                              log | (sparse is not None))):
+        msg = ("Error. Conflicting Keywords. axis cannot be set with "
+               "reverse_indices, input_arr, edges, log or sparse.")
+        raise Exception(msg)
+
+    if (edges is not None):
+        if (log | (binsize is not None) | (maxv is not None) |
+                (minv is not None) | (nbins is not None)):
+            msg = ("Error. Conflicting Keywords. edges cannot be set with "
+                   "binsize, maxv, minv, nbins or log.")
+            raise Exception(msg)
+        edges = _check_edges(edges)
+        maxv = edges[-1]
+    elif log:
+        edges, maxv = _log_edges(data, binsize, maxv, minv, nbins, nan)
+
+    if (edges is not None):
+        hist, ri = _edges_histogram(data.ravel(), edges, maxv, log, backend,
+                                    reverse_indices is not None)
+        if (input_arr is not None):
+            hist = _add_input(hist, input_arr)
+        results = {'histogram': hist}
+        if (reverse_indices is not None):
+            results[reverse_indices] = ri
+        if (omax is not None):
+            results[omax] = maxv
+        if (omin is not None):
+            results[omin] = edges[0]
+        if (locations is not None):
+            results[locations] = edges[:-1].copy()
+        return results
+
     if (maxv is None):
         if nan:
             maxv = numpy.nanmax(data)
@@ -377,6 +554,14 @@ def histogram(data, binsize=None, maxv=None, minv=None, nbins=None, omax=None,
     if (binsize == 0):
         raise ValueError("Error. Binsize = 0, histogram can't be computed.")
 
+    # Integer data with a power of two binsize is binned with integer
+    # arithmetic, the offset from minv being shifted rather than divided.
+    shift = None
+    if ((backend == 'fortran') & (axis is None)):
+        shift = _shift_params(data, minv, maxv, max_bin, binsize, nbins)
+        if ((shift is not None) & (strided is None)):
+            strided = _strided_buffer(data)
+
     # Probably unessessary to include the max and max_bin equality warning
     #if (max == max_bin):
     #    msg = ("!!!!!Warning!!!!! \n"
@@ -413,35 +598,91 @@ def histogram(data, binsize=None, maxv=None, minv=None, nbins=None, omax=None,
                 'float32': hist_float,
                 'float64': hist_dfloat}
 
+    def hist_only(data, strided):
+        # The histogram via the selected kernels
+        n = numpy.size(data)
+        if (backend == 'numpy'):
+            hist = _numpy_histogram(data, minv, maxv, max_bin, binsize,
+                                    nbins)[0]
+        elif shift is not None:
+            hist = _shift_histogram(data, strided, shift, nbins)[0]
+        elif strided is not None:
+            hist = _strided_histogram(data, strided, minv, maxv, max_bin,
+                                      binsize, nbins)[0]
+        else:
+            hist = get_hist[data.dtype.name](data, n, minv, maxv, binsize,
+                                             nbins, max_bin, False)
+        return hist
+
+    def hist_ri(data, strided):
+        # The histogram and reverse indices via the selected kernels
+        n = numpy.size(data)
+        if (backend == 'numpy'):
+            hri = _numpy_histogram(data, minv, maxv, max_bin, binsize, nbins,
+                                   reverse_indices=True)
+        elif shift is not None:
+            hri = _shift_histogram(data, strided, shift, nbins,
+                                   reverse_indices=True)
+        elif strided is not None:
+            hri = _strided_histogram(data, strided, minv, maxv, max_bin,
+                                     binsize, nbins, reverse_indices=True)
+        else:
+            hist = get_hist[data.dtype.name](data, n, minv, maxv, binsize,
+                                             nbins, max_bin, True)
+            cum_sum = numpy.sum(hist[1:])
+            ri_sz = nbins + cum_sum + 1 + 1
+
+            get_ri = {'int8': ri_int,
+                      'uint8': ri_int,
+                      'int16': ri_int,
+                      'uint16': ri_long,
+                      'int32': ri_long,
+                      'uint32': ri_dlong,
+                      'int64': ri_dlong,
+                      'uint64': ri_dlong,
+                      'int': ri_dlong,
+                      'float32': ri_float,
+                      'float64': ri_dfloat}
+
+            hri = get_ri[data.dtype.name](data, hist, nbins, n, ri_sz, minv,
+                                          maxv, max_bin, binsize)
+        return hri
+
     ri = False
 
-    if (reverse_indices is not None):
-        ri = True
-        hist = get_hist[data.dtype.name](data, n, minv, maxv, binsize, nbins,
-                                         max_bin, ri)
-        cum_sum = numpy.sum(hist[1:])
-        ri_sz = nbins + cum_sum + 1 + 1
-
-        get_ri = {'int8': ri_int,
-                  'uint8': ri_int,
-                  'int16': ri_int,
-                  'uint16': ri_long,
-                  'int32': ri_long,
-                  'uint32': ri_dlong,
-                  'int64': ri_dlong,
-                  'uint64': ri_dlong,
-                  'int': ri_dlong,
-                  'float32': ri_float,
-                  'float64': ri_dfloat}
-
-        hri = get_ri[data.dtype.name](data, hist, nbins, n, ri_sz, minv, maxv,
-                                      max_bin, binsize)
+    # A sparse histogram is counted as per a dense one then compacted,
+    # unless it is larger than the array or its occupied bins are estimated
+    # to be few, in which case the occupied bins are hashed
+    hashed = False
+    if (sparse is not None):
+        nocc = _estimate_occupied(data, minv, maxv, max_bin, binsize)
+        hashed = (nbins > n) or (nbins > SPARSE_RATIO * nocc)
+
+    if (axis is not None):
+        hist = _axis_histogram(data, axis, minv, maxv, max_bin, binsize,
+                               nbins, backend, nthreads)
+        results = {'histogram': hist}
+    elif hashed:
+        hri = _hashed_histogram(data, minv, maxv, max_bin, binsize, backend,
+                                reverse_indices is not None, nocc)
+        results = {'histogram': hri[1], sparse: hri[0]}
+        if (reverse_indices is not None):
+            results[reverse_indices] = hri[2]
+    elif (reverse_indices is not None):
+        if compress:
+            hri = _compressed_histogram(data, strided, hist_ri, nbins)
+        elif (ri_bins is not None):
+            hist = hist_only(data, strided)
+            hri = (hist, _selected_reverse_indices(data, hist, ri_bins, minv,
+                                                   maxv, max_bin, binsize,
+                                                   backend))
+        else:
+            hri = hist_ri(data, strided)
 
         results = {'histogram': hri[0]}
         results[reverse_indices] = hri[1]
     else:
-        hist = get_hist[data.dtype.name](data, n, minv, maxv, binsize, nbins,
-                                         max_bin, ri)
+        hist = hist_only(data, strided)
         if (input_arr is not None):
             # Now to add the input array to the histogram.
             # The result will take the shape of the larger of the two arrays.
@@ -456,13 +697,23 @@ def histogram(data, binsize=None, maxv=None, minv=None, nbins=None, omax=None,
         else:
             results = {'histogram': hist}
 
+    if ((sparse is not None) & (not hashed)):
+        hri = _compact(results['histogram'], results.get(reverse_indices))
+        results['histogram'] = hri[1]
+        results[sparse] = hri[0]
+        if (reverse_indices is not None):
+            results[reverse_indices] = hri[2]
+
     if (omax is not None):
         results[omax] = maxv
 
     if (omin is not None):
         results[omin] = minv
 
-    if (locations is not None):
+    if ((locations is not None) & (sparse is not None)):
+        loc = minv + results[sparse] * binsize
+        results[locations] = loc.astype(data.dtype.name)
+    elif (locations is not None):
         loc = numpy.zeros(int(nbins), dtype=data.dtype.name)
         for i in numpy.arange(int(nbins)):
             loc[i] = minv + i * binsize
@@ -470,3 +721,640 @@ def histogram(data, binsize=None, maxv=None, minv=None, nbins=None, omax=None,
         results[locations] = loc
 
     return results
+
+
+def _axis_histogram(data, axis, minv, maxv, max_bin, binsize, nbins, backend,
+                    nthreads=None):
+    """
+    Computes a histogram along axis for every element of the remaining
+    dimensions of data.
+    Returns the histograms as an array of shape (nbins,) plus the shape
+    of the remaining dimensions.
+    """
+    nbins = int(nbins)
+    stack = numpy.moveaxis(data, axis, 0)
+    shape = stack.shape[1:]
+
+    # A (ntime, npix) view of the stack, copied only if the remaining
+    # dimensions can't be merged
+    ntime = stack.shape[0]
+    npix = int(numpy.prod(shape))
+    stack = stack.reshape(ntime, npix)
+
+    buf = None
+    if ((backend == 'fortran') & (ntime * npix != 0)):
+        buf = _strided_buffer(stack)
+        if buf is None:
+            stack = numpy.ascontiguousarray(stack)
+            buf = _strided_buffer(stack)
+
+    if buf is None:
+        idx, bins = _numpy_bins(stack.ravel(), minv, maxv, max_bin, binsize)
+        hist = numpy.bincount(bins * npix + idx % max(npix, 1),
+                              minlength=nbins * npix).astype('uint32')
+        return hist.reshape((nbins,) + shape)
+
+    name = stack.dtype.name
+    if (name == 'uint64'):
+        # Treated as int64 by the contiguous kernels
+        name = 'int64'
+
+    tstride, pstride = (s // stack.dtype.itemsize for s in stack.strides)
+    func = getattr(_idl_histogram.idl_histogram, 'histogram_axis_' + name)
+
+    # The first bin holds the out of range elements, as per the other
+    # kernels
+    nbins_ = nbins + 1
+    hist = numpy.zeros(nbins_ * npix, dtype='uint32')
+    blk = max(1, AXIS_BLOCK_BYTES // (4 * nbins_))
+
+    if nthreads is None:
+        nthreads = cpu_count()
+
+    # Each thread counts a contiguous range of whole blocks
+    nblocks = -(-npix // blk)
+    step = -(-nblocks // max(1, min(nthreads, nblocks))) * blk
+    ranges = [(p, min(p + step, npix)) for p in range(0, npix, step)]
+
+    def count(bounds):
+        func(buf, hist, buf.shape[0], hist.shape[0], nbins_, npix, ntime,
+             tstride, pstride, bounds[0] + 1, bounds[1], blk, minv, maxv,
+             max_bin, binsize)
+
+    if (len(ranges) == 1):
+        count(ranges[0])
+    else:
+        pool = ThreadPool(len(ranges))
+        pool.map(count, ranges)
+        pool.close()
+        pool.join()
+
+    return hist[npix:].reshape((nbins,) + shape)
+
+
+def _selected_reverse_indices(data, hist, ri_bins, minv, maxv, max_bin,
+                              binsize, backend):
+    """
+    Computes the reverse indices of the bins listed in ri_bins only,
+    given the histogram of data, the other bins being empty.
+    """
+    nbins = hist.shape[0]
+    bins = numpy.unique(numpy.asarray(ri_bins, dtype='int64').ravel())
+    if ((bins.shape[0] != 0) and ((bins[0] < 0) | (bins[-1] >= nbins))):
+        raise IndexError('Error. Bin out of bounds!')
+
+    # The first bin holds the out of range elements, as per the kernels
+    sel = numpy.zeros(nbins + 1, dtype='int8')
+    sel[bins + 1] = 1
+    counts = numpy.where(sel[1:], hist, 0)
+
+    ri = numpy.zeros(nbins + 2 + int(numpy.sum(counts)), dtype='uint32')
+    ri[1] = nbins + 1
+    numpy.cumsum(counts, out=ri[2:nbins+2])
+    ri[2:nbins+2] += nbins + 1
+
+    if (ri.shape[0] == nbins + 2):
+        return ri[1:]
+
+    if (backend == 'numpy'):
+        idx, bins = _numpy_bins(data.ravel(), minv, maxv, max_bin, binsize)
+        keep = sel[bins + 1] != 0
+        idx = idx[keep]
+        order = numpy.argsort(bins[keep], kind='stable')
+        ri[nbins+2:] = idx[order]
+        return ri[1:]
+
+    buf = _strided_buffer(data)
+    if buf is None:
+        data = numpy.ascontiguousarray(data)
+        buf = _strided_buffer(data)
+
+    name = data.dtype.name
+    if (name == 'uint64'):
+        # Treated as int64 by the contiguous kernels
+        name = 'int64'
+
+    dims = numpy.array(data.shape, dtype='int64')
+    strides = numpy.array(data.strides, dtype='int64') // data.dtype.itemsize
+    ndim = dims.shape[0]
+
+    func = getattr(_idl_histogram.idl_histogram,
+                   'reverse_indices_select_' + name)
+    func(buf, sel, ri, nbins + 1, buf.shape[0], ri.shape[0], dims, strides,
+         ndim, minv, maxv, max_bin, binsize)
+
+    return ri[1:]
+
+
+def _compressed_histogram(data, strided, hist_ri, nbins):
+    """
+    Computes the histogram and compressed reverse indices of data, over
+    chunks of about CHUNK_SIZE elements along the first dimension.
+    hist_ri computes the histogram and reverse indices of a chunk, given
+    its strided buffer if strided is set.
+    Returns a tuple of (hist, ri).
+    """
+    from idl_functions.idl_reverse_indices import CompressedReverseIndices
+
+    nbins = int(nbins)
+    rowsize = int(numpy.prod(data.shape[1:]))
+    rows = max(1, CHUNK_SIZE // max(rowsize, 1))
+
+    # Evaluated twice by from_chunks, so that a single chunk of the raw
+    # reverse indices is held at a time
+    def chunks():
+        for i in range(0, data.shape[0], rows):
+            chunk = data[i:i+rows]
+            buf = None if strided is None else _strided_buffer(chunk)
+            yield i * rowsize, hist_ri(chunk, buf)[1]
+
+    ri = CompressedReverseIndices.from_chunks(nbins, chunks)
+
+    return ri.histogram.copy(), ri
+
+
+def _numpy_histogram(data, minv, maxv, max_bin, binsize, nbins,
+                     reverse_indices=False):
+    """
+    A numpy engine for histogram, replicating the arithmetic of the
+    Fortran kernels so that the results are identical.
+    Returns a tuple of (hist, ri), ri being None unless reverse_indices
+    is set.
+    """
+    idx, bins = _numpy_bins(data, minv, maxv, max_bin, binsize)
+
+    hist = numpy.bincount(bins, minlength=int(nbins)).astype('uint32')
+
+    if not reverse_indices:
+        return hist, None
+
+    return hist, _numpy_reverse_indices(hist, bins, idx)
+
+
+def _strided_buffer(data):
+    """
+    Returns a 1D view spanning the memory of data, as required by the
+    strided kernels, or None if data has negative strides or strides
+    that aren't a multiple of the item size.
+    Unsigned types are viewed as the signed type of the same size.
+    """
+    itemsize = data.dtype.itemsize
+    if any((s < 0) | (s % itemsize != 0) for s in data.strides):
+        return None
+
+    span = sum((n - 1) * s for n, s in zip(data.shape, data.strides))
+    buf = as_strided(data, shape=(span // itemsize + 1,),
+                     strides=(itemsize,), writeable=False)
+
+    return buf.view(buf.dtype.name.replace('uint', 'int'))
+
+
+def _strided_histogram(data, buf, minv, maxv, max_bin, binsize, nbins,
+                       reverse_indices=False):
+    """
+    Computes the histogram, and optionally the reverse indices, of an N-D
+    array by walking buf in place. The reverse indices refer to the C
+    ordered positions of the elements of data.
+    Returns a tuple of (hist, ri), ri being None unless reverse_indices
+    is set.
+    """
+    kernels = _idl_histogram.idl_histogram
+    name = data.dtype.name
+    if (name == 'uint64'):
+        # Treated as int64 by the contiguous kernels
+        name = 'int64'
+
+    dims = numpy.array(data.shape, dtype='int64')
+    strides = numpy.array(data.strides, dtype='int64') // data.dtype.itemsize
+    ndim = dims.shape[0]
+
+    # The first bin holds the out of range elements, as per the contiguous
+    # kernels
+    nbins_ = int(nbins) + 1
+    hist = numpy.zeros(nbins_, dtype='uint32')
+    func = getattr(kernels, 'histogram_strided_' + name)
+    func(buf, hist, buf.shape[0], nbins_, dims, strides, ndim, minv, maxv,
+         max_bin, binsize)
+
+    if not reverse_indices:
+        return hist[1:], None
+
+    ri_sz = nbins_ + numpy.sum(hist[1:]) + 1
+    ri = numpy.zeros(int(ri_sz), dtype='uint32')
+    func = getattr(kernels, 'reverse_indices_strided_' + name)
+    func(buf, hist, ri, nbins_, buf.shape[0], ri_sz, dims, strides, ndim,
+         minv, maxv, max_bin, binsize)
+
+    return hist[1:], ri[1:]
+
+
+def _shift_params(data, minv, maxv, max_bin, binsize, nbins):
+    """
+    Returns a tuple of (minv, limit, shift) for the shift kernels if data is
+    of an integer type and binsize is a power of two, otherwise None.
+    An element is within the histogram if its offset from minv lies
+    within [0, limit], limit combining the maxv and max_bin tests of the
+    other kernels, and its bin is then the offset shifted right by
+    shift.
+    """
+    name = data.dtype.name
+    if ((name not in ('int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32',
+                      'int64')) | (binsize < 1)):
+        return None
+
+    binsize = int(binsize)
+    if (binsize & (binsize - 1)):
+        return None
+
+    # The elements are less than max_bin, which is a double within the
+    # kernels, and lie within the nbins bins
+    limit = min(int(maxv) - int(minv),
+                int(numpy.ceil(numpy.float64(max_bin))) - 1 - int(minv),
+                int(nbins) * binsize - 1)
+
+    # Beyond 2**53 the division by binsize within the other kernels is
+    # inexact, hence the results could differ
+    if ((name == 'int64') & (limit >= 2**53)):
+        return None
+
+    return int(minv), limit, binsize.bit_length() - 1
+
+
+def _shift_histogram(data, buf, params, nbins, reverse_indices=False):
+    """
+    Computes the histogram, and optionally the reverse indices, of
+    integer data with a power of two binsize. params is the tuple
+    returned by _shift_params, and buf the memory of data as returned by
+    _strided_buffer.
+    Returns a tuple of (hist, ri), ri being None unless reverse_indices
+    is set.
+    """
+    kernels = _idl_histogram.idl_histogram
+    name = data.dtype.name
+    minv, limit, shift = params
+
+    dims = numpy.array(data.shape, dtype='int64')
+    strides = numpy.array(data.strides, dtype='int64') // data.dtype.itemsize
+    ndim = dims.shape[0]
+
+    # The first bin holds the out of range elements, as per the other
+    # kernels
+    nbins_ = int(nbins) + 1
+    hist = numpy.zeros(nbins_, dtype='uint32')
+    func = getattr(kernels, 'histogram_shift_' + name)
+    func(buf, hist, buf.shape[0], nbins_, dims, strides, ndim, minv, limit,
+         shift)
+
+    if not reverse_indices:
+        return hist[1:], None
+
+    ri_sz = nbins_ + numpy.sum(hist[1:]) + 1
+    ri = numpy.zeros(int(ri_sz), dtype='uint32')
+    func = getattr(kernels, 'reverse_indices_shift_' + name)
+    func(buf, hist, ri, nbins_, buf.shape[0], ri_sz, dims, strides, ndim,
+         minv, limit, shift)
+
+    return hist[1:], ri[1:]
+
+
+def _add_input(hist, input_arr):
+    """
+    Adds input_arr to hist, the result taking the shape of the larger of
+    the two arrays.
+    """
+    input_arr = input_arr.ravel()
+    if (input_arr.shape[0] < hist.shape[0]):
+        msg = "Error. Input array does not have enough elements."
+        raise ValueError(msg)
+    temp = numpy.zeros(input_arr.shape, dtype='uint32')
+    temp[0:hist.shape[0]] = hist
+    temp += input_arr
+    return temp
+
+
+def _check_edges(edges):
+    """
+    Returns the bin edges as a float64 array, checking that they are
+    1-Dimensional, finite and monotonically increasing.
+    """
+    edges = numpy.array(edges, dtype='float64')
+    if ((edges.ndim != 1) or (edges.shape[0] < 2)):
+        msg = "Error. edges must be a 1D array of at least 2 elements."
+        raise ValueError(msg)
+    if ((not numpy.isfinite(edges).all()) or (numpy.diff(edges) < 0).any()):
+        msg = "Error. edges must be finite and monotonically increasing."
+        raise ValueError(msg)
+    return edges
+
+
+def _log_edges(data, binsize, maxv, minv, nbins, nan):
+    """
+    Returns a tuple of (edges, maxv) for bins evenly spaced in log10,
+    following the rules of the linear bins with binsize in decades.
+    """
+    if (minv is None):
+        positive = data[data > 0]
+        if (positive.size == 0):
+            msg = "Error. log requires data containing positive values."
+            raise ValueError(msg)
+        minv = numpy.min(positive)
+
+    if (maxv is None):
+        if nan:
+            maxv = numpy.nanmax(data)
+        else:
+            maxv = numpy.max(data)
+
+    minv = float(minv)
+    maxv = float(maxv)
+    if (minv <= 0):
+        raise ValueError("Error. minv must be positive when log is set.")
+
+    lmin = numpy.log10(minv)
+    lmax = numpy.log10(max(maxv, minv))
+
+    # The last edge is maxv when nbins alone is set, barring rounding
+    fit = False
+    if (binsize is None) & (nbins is None):
+        binsize = 1.0
+        nbins = numpy.floor((lmax - lmin) / binsize) + 1
+    elif (binsize is None):
+        binsize = (lmax - lmin) / nbins
+        fit = True
+    elif (nbins is None):
+        nbins = numpy.floor((lmax - lmin) / binsize) + 1
+    else:
+        maxv = 10**(nbins * binsize + lmin)
+
+    if (binsize <= 0):
+        raise ValueError("Error. Binsize = 0, histogram can't be computed.")
+
+    edges = 10**(lmin + binsize * numpy.arange(int(nbins) + 1))
+    edges[0] = minv
+    if fit:
+        edges[-1] = maxv
+
+    return edges, maxv
+
+
+def _edges_histogram(data, edges, maxv, log, backend, reverse_indices):
+    """
+    Computes the histogram, and optionally the reverse indices, of 1D
+    data for bins of arbitrary width. Elements are included if they lie
+    within edges[0] and the lesser of maxv and edges[-1], inclusive.
+    Returns a tuple of (hist, ri), ri being None unless reverse_indices
+    is set.
+    """
+    nbins = edges.shape[0] - 1
+
+    if (data.dtype.name != 'float32'):
+        data = data.astype('float64', copy=False)
+
+    if ((backend == 'numpy') | (data.shape[0] == 0)):
+        array = data.astype('float64', copy=False)
+        valid = (array >= edges[0]) & (array <= min(maxv, edges[-1]))
+        idx = numpy.flatnonzero(valid)
+        bins = numpy.searchsorted(edges, array[idx], side='right') - 1
+        bins = numpy.minimum(bins, nbins - 1)
+        hist = numpy.bincount(bins, minlength=nbins).astype('uint32')
+        if not reverse_indices:
+            return hist, None
+        return hist, _numpy_reverse_indices(hist, bins, idx)
+
+    kernels = _idl_histogram.idl_histogram
+    name = 'float' if (data.dtype.name == 'float32') else 'dfloat'
+
+    # The kernels can estimate the bin of log spaced edges from the
+    # logarithm rather than searching the edges. The logarithm costs about
+    # as much as a search of several thousand edges.
+    if (log & (nbins > LOG_SEARCH_BINS)):
+        lmin = numpy.log10(edges[0])
+        lbinsz = numpy.log10(edges[1]) - lmin
+    else:
+        lmin = 0.0
+        lbinsz = 0.0
+
+    n = data.shape[0]
+    ne = edges.shape[0]
+    nbins_ = nbins + 1
+    hist = numpy.zeros(nbins_, dtype='uint32')
+    func = getattr(kernels, 'histogram_edges_' + name)
+    func(data, hist, edges, n, nbins_, ne, maxv, lmin, lbinsz)
+
+    if not reverse_indices:
+        return hist[1:], None
+
+    ri_sz = nbins_ + numpy.sum(hist[1:]) + 1
+    ri = numpy.zeros(int(ri_sz), dtype='uint32')
+    func = getattr(kernels, 'reverse_indices_edges_' + name)
+    func(data, hist, ri, edges, nbins_, n, ri_sz, ne, maxv, lmin, lbinsz)
+
+    return hist[1:], ri[1:]
+
+
+def _numpy_bins(data, minv, maxv, max_bin, binsize):
+    """
+    Returns a tuple of (idx, bins); the indices of the elements of 1D
+    data within the histogram, and their (int64) bins.
+    The data is converted to the type of the kernel that would've been
+    used, the difference from minv is computed in that type, and the
+    division by binsize and the comparison with max_bin are carried out
+    in double precision, as per the Fortran kernels.
+    """
+    kind = {'int8': 'int16',
+            'uint8': 'int16',
+            'int16': 'int16',
+            'uint16': 'int32',
+            'int32': 'int32',
+            'uint32': 'int64',
+            'int64': 'int64',
+            'uint64': 'int64',
+            'float32': 'float32',
+            'float64': 'float64'}[data.dtype.name]
+
+    array = data.astype(kind, copy=False)
+    minv = numpy.array(minv).astype(kind)
+    maxv = numpy.array(maxv).astype(kind)
+
+    valid = ((array <= maxv) & (array >= minv) &
+             (array < numpy.float64(max_bin)))
+    idx = numpy.flatnonzero(valid)
+    bins = numpy.floor((array[idx] - minv) / numpy.float64(binsize))
+
+    return idx, bins.astype('int64')
+
+
+def _estimate_occupied(data, minv, maxv, max_bin, binsize):
+    """
+    Returns the number of occupied bins of the histogram of data, estimated
+    from a random sample of SPARSE_SAMPLE elements via the GEE estimator
+    (Charikar et al., 2000), or counted if data is no larger than the
+    sample.
+    """
+    n = data.size
+    if (n <= SPARSE_SAMPLE):
+        bins = _numpy_bins(data.ravel(), minv, maxv, max_bin, binsize)[1]
+        return numpy.unique(bins).shape[0]
+
+    # A fixed seed, so that the choice of engine is repeatable
+    pos = numpy.random.default_rng(0).integers(0, n, SPARSE_SAMPLE)
+    bins = _numpy_bins(data.flat[pos], minv, maxv, max_bin, binsize)[1]
+    counts = numpy.unique(bins, return_counts=True)[1]
+
+    # Bins seen once within the sample are scaled up, the others being
+    # assumed to be common
+    once = numpy.count_nonzero(counts == 1)
+    scale = numpy.sqrt(n / numpy.float64(SPARSE_SAMPLE))
+
+    return int(scale * once) + counts.shape[0] - once
+
+
+def _hashed_histogram(data, minv, maxv, max_bin, binsize, backend,
+                      reverse_indices=False, nocc=0):
+    """
+    Computes the occupied bins of the histogram of an N-D array, by
+    hashing the bin of each element rather than allocating every bin.
+    The hash table is sized for nocc, the estimated number of occupied
+    bins, and the array is walked in place, as per the strided kernels.
+    Returns a tuple of (ids, hist, ri); the ascending (int64) bins that
+    contain at least one element, their counts, and the reverse indices
+    of those bins, ri being None unless reverse_indices is set.
+    """
+    buf = None
+    if ((backend != 'numpy') & (data.size != 0)):
+        buf = _strided_buffer(data)
+        if buf is None:
+            data = numpy.ascontiguousarray(data)
+            buf = _strided_buffer(data)
+
+    if buf is None:
+        return _numpy_hashed_histogram(data.ravel(), minv, maxv, max_bin,
+                                       binsize, reverse_indices)
+
+    kernels = _idl_histogram.idl_histogram
+    name = data.dtype.name
+    if (name == 'uint64'):
+        # Treated as int64 by the contiguous kernels
+        name = 'int64'
+
+    dims = numpy.array(data.shape, dtype='int64')
+    strides = numpy.array(data.strides, dtype='int64') // data.dtype.itemsize
+    ndim = dims.shape[0]
+
+    # A table over half full is restarted at 8 times the size
+    tsize = 2048
+    while (tsize < 4 * nocc):
+        tsize *= 2
+    func = getattr(kernels, 'hash_bins_' + name)
+    while True:
+        keys = numpy.full(tsize, -1, dtype='int64')
+        counts = numpy.zeros(tsize, dtype='uint32')
+        nocc = func(buf, keys, counts, buf.shape[0], tsize, dims, strides,
+                    ndim, minv, maxv, max_bin, binsize)
+        if (nocc >= 0):
+            break
+        tsize *= 8
+
+    occupied = numpy.flatnonzero(keys != -1)
+    order = numpy.argsort(keys[occupied])
+    occupied = occupied[order]
+    ids = keys[occupied]
+    hist = counts[occupied]
+
+    if not reverse_indices:
+        return ids, hist, None
+
+    if (nocc == 0):
+        return ids, hist, numpy.ones(1, dtype='uint32')
+
+    # The rank of each occupied slot is its sparse bin
+    rank = numpy.zeros(tsize, dtype='int32')
+    rank[occupied] = numpy.arange(nocc, dtype='int32')
+
+    ri = numpy.zeros(nocc + 1 + int(hist.sum()), dtype='uint32')
+    func = getattr(kernels, 'reverse_indices_hashed_' + name)
+    func(buf, keys, rank, hist, ri, buf.shape[0], tsize, nocc, ri.shape[0],
+         dims, strides, ndim, minv, maxv, max_bin, binsize)
+
+    return ids, hist, ri
+
+
+def _numpy_hashed_histogram(data, minv, maxv, max_bin, binsize,
+                            reverse_indices=False):
+    """
+    A numpy equivalent of _hashed_histogram for 1D data, the occupied bins
+    of each chunk of CHUNK_SIZE elements being found by sorting, then
+    merged.
+    """
+    n = data.shape[0]
+    chunks = [(i, min(i + CHUNK_SIZE, n)) for i in range(0, n, CHUNK_SIZE)]
+    ids = [numpy.zeros(0, dtype='int64')]
+    counts = [numpy.zeros(0, dtype='int64')]
+    for start, stop in chunks:
+        bins = _numpy_bins(data[start:stop], minv, maxv, max_bin, binsize)[1]
+        chunk_ids, chunk_counts = numpy.unique(bins, return_counts=True)
+        ids.append(chunk_ids)
+        counts.append(chunk_counts)
+
+    ids, merged = numpy.unique(numpy.concatenate(ids), return_inverse=True)
+    hist = numpy.zeros(ids.shape[0], dtype='uint32')
+    numpy.add.at(hist, merged, numpy.concatenate(counts))
+
+    if not reverse_indices:
+        return ids, hist, None
+
+    # The sparse bin of each element, negative for elements outside the
+    # histogram
+    sbins = numpy.full(data.shape[0], -1, dtype='int32')
+    for start, stop in chunks:
+        idx, bins = _numpy_bins(data[start:stop], minv, maxv, max_bin,
+                                binsize)
+        sbins[start:stop][idx] = numpy.searchsorted(ids, bins)
+
+    idx = numpy.flatnonzero(sbins >= 0)
+
+    return ids, hist, _numpy_reverse_indices(hist, sbins[idx], idx)
+
+
+def _compact(hist, ri=None):
+    """
+    Returns a tuple of (ids, hist, ri) for the occupied bins of a dense
+    histogram and its reverse indices, ri being None if not given.
+    """
+    ids = numpy.flatnonzero(hist)
+    if ri is None:
+        return ids, hist[ids], None
+
+    nbins = hist.shape[0]
+    nocc = ids.shape[0]
+    offsets = ri[ids].astype('int64') - (nbins - nocc)
+    compact = numpy.empty(nocc + 1 + ri.shape[0] - nbins - 1,
+                          dtype='uint32')
+    compact[0:nocc] = offsets
+    compact[nocc] = compact.shape[0]
+    compact[nocc+1:] = ri[nbins+1:]
+
+    return ids, hist[ids], compact
+
+
+def _numpy_reverse_indices(hist, bins, idx):
+    """
+    Returns the reverse indices given the histogram, the bin of each
+    element within the histogram, and the indices of those elements.
+    """
+    nbins = hist.shape[0]
+
+    # A stable sort retains the ascending order of the indices within each
+    # bin. Casting the bins to the smallest type allows numpy to use a
+    # radix sort.
+    if (nbins <= 2**16):
+        bins = bins.astype('uint16')
+    order = numpy.argsort(bins, kind='stable')
+
+    ri = numpy.empty(nbins + 1 + idx.shape[0], dtype='uint32')
+    ri[0] = nbins + 1
+    numpy.cumsum(hist, out=ri[1:nbins+1])
+    ri[1:nbins+1] += nbins + 1
+    ri[nbins+1:] = idx[order]
+
+    return ri
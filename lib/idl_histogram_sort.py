@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import numpy
+from idl_functions import histogram
+from idl_functions.idl_bin_percentile import bin_percentile
+
+
+def histogram_sort(data, binsize=None, maxv=None, minv=None, nbins=None,
+                   nan=False):
+    """
+    A stable counting sort of data via the reverse indices of histogram.
+
+    Returns the permutation that orders the elements of data by bin, and
+    the boundaries of each bin within that permutation. The cost is
+    O(N + nbins), rather than O(N log N) for an argsort.
+
+    :param data:
+        A numpy array of any dimension. It is treated as 1D.
+
+    :param binsize:
+        (Optional) The binsize. See histogram.
+
+    :param maxv:
+        (Optional) The maximum value. See histogram.
+
+    :param minv:
+        (Optional) The minimum value. See histogram.
+
+    :param nbins:
+        (Optional) The number of bins. See histogram.
+
+    :param nan:
+        If set to True (Default is False) then nan values will be
+        accounted for and excluded. See histogram.
+
+    :return:
+        A tuple of (perm, bounds). perm is a 1D numpy array of the
+        indices of data ordered by bin, preserving the original order
+        within a bin. Elements outside the histogram range are excluded.
+        bounds is a 1D numpy array of length nbins + 1, such that the
+        indices of bin i are perm[bounds[i]:bounds[i+1]].
+
+    Example:
+
+        >>> perm, bounds = histogram_sort(classes, minv=0)
+        >>> sorted_values = values.ravel()[perm]
+        >>> values_of_class_i = sorted_values[bounds[i]:bounds[i+1]]
+
+    :author:
+        Josh Sixsmith, josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au
+
+    :history:
+        * 19/10/2026: Created
+
+    :copyright:
+        Copyright (c) 2014, Josh Sixsmith
+        All rights reserved.
+
+        Redistribution and use in source and binary forms, with or without
+        modification, are permitted provided that the following conditions are met:
+
+        1. Redistributions of source code must retain the above copyright notice, this
+           list of conditions and the following disclaimer.
+        2. Redistributions in binary form must reproduce the above copyright notice,
+           this list of conditions and the following disclaimer in the documentation
+           and/or other materials provided with the distribution.
+
+        THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+        ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+        WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+        DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+        ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+        (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+        LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+        ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+        (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+        SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+        The views and conclusions contained in the software and documentation are those
+        of the authors and should not be interpreted as representing official policies,
+        either expressed or implied, of the FreeBSD Project.
+
+    """
+    h = histogram(data, binsize=binsize, maxv=maxv, minv=minv, nbins=nbins,
+                  nan=nan, reverse_indices='ri')
+    ri = h['ri']
+    nbins_ = h['histogram'].shape[0]
+
+    # The first nbins + 1 elements of ri are the offsets of each bin, the
+    # remainder is the permutation
+    perm = ri[nbins_+1:]
+    bounds = ri[0:nbins_+1].astype('int64') - (nbins_ + 1)
+
+    return perm, bounds
+
+
+def group_by(data, values=None, reduce='median', percentile=None,
+             binsize=None, maxv=None, minv=None, nbins=None, nan=False):
+    """
+    Groups values by the histogram bins of data, and reduces each group.
+
+    The groups are formed by histogram_sort, and the order statistics
+    (median and percentile) are computed by bin_percentile.
+
+    :param data:
+        A numpy array whose histogram bins define the groups, e.g. a
+        class or zone map.
+
+    :param values:
+        (Optional) A numpy array of the same size as data, containing
+        the values to be reduced. Defaults to data.
+
+    :param reduce:
+        The reduction applied to each group. One of 'count', 'sum',
+        'mean', 'min', 'max', 'median' (Default) or 'percentile'.
+
+    :param percentile:
+        A scalar or list of percentiles in the range [0, 100].
+        Required when reduce is 'percentile'. Values between ranks are
+        linearly interpolated, as per numpy.percentile.
+
+    :param binsize:
+        (Optional) The binsize. See histogram.
+
+    :param maxv:
+        (Optional) The maximum value. See histogram.
+
+    :param minv:
+        (Optional) The minimum value. See histogram.
+
+    :param nbins:
+        (Optional) The number of bins. See histogram.
+
+    :param nan:
+        If set to True (Default is False) then nan values within data
+        will be excluded. See histogram.
+
+    :return:
+        A 1D numpy array containing the reduction of each bin. Empty
+        bins are NaN (0 for 'count' and 'sum'). For 'percentile' with a
+        list of percentiles, an array of shape (npercentiles, nbins).
+
+    Example:
+
+        >>> medians = group_by(zones, image, minv=0)
+        >>> p = group_by(zones, image, reduce='percentile',
+        ...              percentile=[5, 95], minv=0)
+
+    :author:
+        Josh Sixsmith, josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au
+
+    :history:
+        * 19/10/2026: Created
+
+    :copyright:
+        Copyright (c) 2014, Josh Sixsmith
+        All rights reserved.
+
+        Redistribution and use in source and binary forms, with or without
+        modification, are permitted provided that the following conditions are met:
+
+        1. Redistributions of source code must retain the above copyright notice, this
+           list of conditions and the following disclaimer.
+        2. Redistributions in binary form must reproduce the above copyright notice,
+           this list of conditions and the following disclaimer in the documentation
+           and/or other materials provided with the distribution.
+
+        THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+        ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+        WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+        DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+        ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+        (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+        LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+        ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+        (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+        SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+        The views and conclusions contained in the software and documentation are those
+        of the authors and should not be interpreted as representing official policies,
+        either expressed or implied, of the FreeBSD Project.
+
+    """
+    reductions = ['count', 'sum', 'mean', 'min', 'max', 'median',
+                  'percentile']
+    if reduce not in reductions:
+        msg = "Error. reduce must be one of {}".format(reductions)
+        raise ValueError(msg)
+
+    if values is None:
+        values = data
+
+    if (values.size != data.size):
+        raise ValueError('Error. values must be the same size as data.')
+
+    if (reduce == 'median'):
+        percentile = 50
+    elif ((reduce == 'percentile') & (percentile is None)):
+        raise ValueError('Error. percentile is required.')
+
+    if reduce in ('median', 'percentile'):
+        h = histogram(data, binsize=binsize, maxv=maxv, minv=minv,
+                      nbins=nbins, nan=nan, reverse_indices='ri')
+        return bin_percentile(values, h['ri'], percentile)
+
+    values = values.ravel()
+    perm, bounds = histogram_sort(data, binsize=binsize, maxv=maxv,
+                                  minv=minv, nbins=nbins, nan=nan)
+
+    grouped = values[perm]
+    counts = numpy.diff(bounds)
+    nonempty = counts > 0
+    starts = bounds[0:-1][nonempty]
+
+    if (reduce == 'count'):
+        return counts
+
+    if (reduce in ('sum', 'mean')):
+        result = numpy.zeros(counts.shape, dtype='float64')
+        if (starts.shape[0] > 0):
+            result[nonempty] = numpy.add.reduceat(grouped, starts,
+                                                  dtype='float64')
+        if (reduce == 'mean'):
+            result[~nonempty] = numpy.nan
+            result[nonempty] /= counts[nonempty]
+        return result
+
+    result = numpy.full(counts.shape, numpy.nan)
+
+    if (reduce == 'min'):
+        if (starts.shape[0] > 0):
+            result[nonempty] = numpy.minimum.reduceat(grouped, starts)
+        return result
+
+    if (starts.shape[0] > 0):
+        result[nonempty] = numpy.maximum.reduceat(grouped, starts)
+
+    return result
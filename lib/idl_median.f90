@@ -0,0 +1,173 @@
+MODULE idl_median
+    IMPLICIT NONE
+    ! Author: Josh Sixsmith, josh.sixsmith@gmail.com
+    !
+    ! Copyright
+    !
+    ! Copyright (c) 2014, Josh Sixsmith
+    ! All rights reserved.
+
+    ! Redistribution and use in source and binary forms, with or without
+    ! modification, are permitted provided that the following conditions are met:
+
+    ! 1. Redistributions of source code must retain the above copyright notice, this
+    !    list of conditions and the following disclaimer. 
+    ! 2. Redistributions in binary form must reproduce the above copyright notice,
+    !    this list of conditions and the following disclaimer in the documentation
+    !    and/or other materials provided with the distribution. 
+
+    ! THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ! ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    ! WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+    ! DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+    ! ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+    ! (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+    ! LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+    ! ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+    ! (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+    ! SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+    ! The views and conclusions contained in the software and documentation are those
+    ! of the authors and should not be interpreted as representing official policies, 
+    ! either expressed or implied, of the FreeBSD Project.
+    !
+
+CONTAINS
+
+    ! Sliding window filters over an image of bins, i.e. the ranks of the
+    ! distinct values of an image. A histogram is kept for every column
+    ! of the window's rows, so that moving the window along a row adds
+    ! one column histogram and removes another, and moving down a row
+    ! adds one element to, and removes one from, each column histogram;
+    ! the cost per element being independent of the window size.
+    ! For the rank statistics the bins are grouped into coarse bins of
+    ! nfine bins. The coarse window histogram is updated for every
+    ! element, whereas a fine segment is only brought up to date when the
+    ! rank is found to lie within it.
+
+    SUBROUTINE window_filter(bins, out, n, o_sz, nbins, nfine, nrows, ncols, ry, rx, &
+                             stat, rank, nout, r0, r1, c0, c1)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, o_sz, nbins, nfine, nrows, ncols, ry, rx, stat, rank, nout
+       INTEGER*8 :: r0, r1, c0, c1, nc, wx, wc0, ntc, i, j, e, b, k, s, t, acc
+       INTEGER*8 :: p, q, jj, best, lo, hi
+       INTEGER*4, DIMENSION(n), INTENT(IN) :: bins
+       !f2py depend(n), bins
+
+       INTEGER*4, DIMENSION(o_sz), INTENT(INOUT) :: out
+       !f2py depend(o_sz), out
+
+       INTEGER*4, DIMENSION(:, :), ALLOCATABLE :: colf, colc
+       INTEGER*4, DIMENSION(:), ALLOCATABLE :: hf, hc
+       INTEGER*8, DIMENSION(:), ALLOCATABLE :: last
+       !f2py threadsafe
+
+       ! bins is a C ordered (nrows, ncols) array of zero based bins, and
+       ! the window spans 2*ry+1 rows and 2*rx+1 columns. The rows r0:r1
+       ! and columns c0:c1 are filtered, their windows lying within the
+       ! array, so that disjoint tiles can be filtered concurrently.
+       ! stat 0 writes the bin at rank (zero based) within the window, and
+       ! the nout - 1 following ranks to the subsequent planes of out;
+       ! stat 1 writes the mode, the lowest bin of the highest count.
+       nc = (nbins + nfine - 1) / nfine
+       wx = 2 * rx + 1
+       wc0 = c0 - rx
+       ntc = c1 + rx - wc0 + 1
+
+       ! Column 0 is empty, standing in for the column preceding the first
+       allocate(colf(nbins, 0:ntc), colc(nc, 0:ntc), hf(nbins), hc(nc), last(nc))
+       colf = 0
+       colc = 0
+
+       ! The column histograms of the first window's rows, bar the last
+       do i = r0 - ry, r0 + ry - 1
+          p = (i - 1) * ncols + wc0 - 1
+          do jj = 1, ntc
+             b = bins(p + jj) + 1
+             colf(b, jj) = colf(b, jj) + 1
+             colc((b - 1) / nfine + 1, jj) = colc((b - 1) / nfine + 1, jj) + 1
+          enddo
+       enddo
+
+       do i = r0, r1
+          ! Add the row entering the window, and remove the row leaving
+          p = (i + ry - 1) * ncols + wc0 - 1
+          q = (i - ry - 2) * ncols + wc0 - 1
+          do jj = 1, ntc
+             b = bins(p + jj) + 1
+             colf(b, jj) = colf(b, jj) + 1
+             colc((b - 1) / nfine + 1, jj) = colc((b - 1) / nfine + 1, jj) + 1
+             if (i .gt. r0) then
+                b = bins(q + jj) + 1
+                colf(b, jj) = colf(b, jj) - 1
+                colc((b - 1) / nfine + 1, jj) = colc((b - 1) / nfine + 1, jj) - 1
+             endif
+          enddo
+
+          ! The window histograms of the columns preceding the first window
+          if (stat .eq. 1) then
+             hf = 0
+             do jj = 1, wx - 1
+                hf = hf + colf(:, jj)
+             enddo
+          else
+             hc = 0
+             do jj = 1, wx - 1
+                hc = hc + colc(:, jj)
+             enddo
+             ! Every fine segment is out of date
+             last = -wx
+          endif
+
+          ! e is the last column of the window
+          do e = wx, ntc
+             j = (i - 1) * ncols + wc0 + e - 1 - rx
+             if (stat .eq. 1) then
+                hf = hf + colf(:, e) - colf(:, e - wx)
+                best = 1
+                do b = 2, nbins
+                   if (hf(b) .gt. hf(best)) best = b
+                enddo
+                out(j) = int(best - 1, 4)
+                cycle
+             endif
+
+             hc = hc + colc(:, e) - colc(:, e - wx)
+             do s = 1, nout
+                t = rank + s - 1
+                acc = 0
+                do k = 1, nc
+                   if (acc + hc(k) .gt. t) exit
+                   acc = acc + hc(k)
+                enddo
+
+                ! Bring the fine segment of coarse bin k up to date
+                lo = (k - 1) * nfine + 1
+                hi = min(k * nfine, nbins)
+                if (e - last(k) .ge. wx) then
+                   hf(lo:hi) = 0
+                   do jj = e - wx + 1, e
+                      hf(lo:hi) = hf(lo:hi) + colf(lo:hi, jj)
+                   enddo
+                else
+                   do jj = last(k) + 1, e
+                      hf(lo:hi) = hf(lo:hi) + colf(lo:hi, jj) - colf(lo:hi, jj - wx)
+                   enddo
+                endif
+                last(k) = e
+
+                do b = lo, hi
+                   acc = acc + hf(b)
+                   if (acc .gt. t) exit
+                enddo
+                out(j + (s - 1) * n) = int(b - 1, 4)
+             enddo
+          enddo
+       enddo
+
+       deallocate(colf, colc, hf, hc, last)
+
+    END SUBROUTINE window_filter
+
+END MODULE idl_median
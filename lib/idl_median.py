@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import numpy
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import ndimage
+from idl_functions import histogram
+try:
+    import _idl_median
+except ImportError:
+    _idl_median = None
+
+# The size in bytes of the column histograms of a tile, bounding the
+# memory used by each thread
+TILE_BYTES = 2**23
+
+# The number of rows of a tile, beyond those required by the window
+TILE_ROWS = 256
+
+# The maximum number of distinct values for which the window histograms
+# are used to compute a rank (see _use_kernel)
+MAX_BINS = 2**16
+
+
+def median(array, width=None, even=False, nthreads=None):
+    """
+    Replicates the median function available within IDL
+    (Interactive Data Language, EXELISvis). Computes the median of an
+    array, or if width is set, applies a median filter.
+
+    :param array:
+        A numpy array of any type. If width is set, array must be 1D
+        or 2D.
+
+    :param width:
+        (Optional) The odd width of the neighbourhood of the median
+        filter; a width x width window for 2D arrays. Elements within
+        width/2 of the edges of the array are not modified.
+
+    :param even:
+        If set to True (Default is False) and width is not set, then the
+        mean of the two middle values is returned when array contains an
+        even number of elements, rather than the upper of the two.
+
+    :param nthreads:
+        (Optional) The number of threads over which the tiles of the
+        array are filtered. Default is the number of CPUs.
+
+    :return:
+        The median value of array if width is not set, otherwise the
+        filtered array, of the same type as array.
+
+    Example:
+
+        >>> m = median(image)
+        >>> smooth = median(image, 5)
+
+    :notes:
+        The filter maintains a histogram of the window, updated
+        incrementally as the window slides (Perreault & Hebert, 2007), so
+        that the cost per element is independent of width. The bins of
+        the histogram are the distinct values of array, and the cost per
+        element is proportional to the square root of their number.
+        The histograms are therefore used when array contains no more
+        than 65536 distinct values, and the width x width window no fewer
+        than 1/8 of the square root of their number, e.g. any width for
+        8-bit data, and widths of 7 or more for 16-bit data spanning its
+        full range. Otherwise, such as for floating point data or small
+        windows, each window is selected from directly via
+        scipy.ndimage.rank_filter, whose cost is proportional to
+        width x width.
+        NaN's are not accounted for.
+
+    :author:
+        Josh Sixsmith, josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au
+
+    :history:
+        * 19/10/2026: Created
+        * 19/10/2026: Windows with many distinct values relative to their
+                      size are filtered via scipy.ndimage.rank_filter.
+
+    :copyright:
+        Copyright (c) 2014, Josh Sixsmith
+        All rights reserved.
+
+        Redistribution and use in source and binary forms, with or without
+        modification, are permitted provided that the following conditions are met:
+
+        1. Redistributions of source code must retain the above copyright notice, this
+           list of conditions and the following disclaimer.
+        2. Redistributions in binary form must reproduce the above copyright notice,
+           this list of conditions and the following disclaimer in the documentation
+           and/or other materials provided with the distribution.
+
+        THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+        ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+        WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+        DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+        ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+        (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+        LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+        ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+        (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+        SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+        The views and conclusions contained in the software and documentation are those
+        of the authors and should not be interpreted as representing official policies,
+        either expressed or implied, of the FreeBSD Project.
+
+    """
+    if width is None:
+        values = numpy.asarray(array).ravel()
+        n = values.shape[0]
+        if (n == 0):
+            raise ValueError('Error. array contains no elements.')
+        part = numpy.partition(values, [(n - 1) // 2, n // 2])
+        if (even & (n % 2 == 0)):
+            return (part[n//2 - 1] + numpy.float64(part[n//2])) / 2
+        return part[n//2]
+
+    values, out, frac = _window_filter(array, width, 'median', nthreads)
+
+    return values[out[0]]
+
+
+def percentile_filter(array, width, percentile=50, nthreads=None):
+    """
+    Computes a percentile of the width x width neighbourhood of every
+    element of a 1D or 2D array.
+
+    :param array:
+        A 1D or 2D numpy array of any type.
+
+    :param width:
+        The odd width of the neighbourhood. Elements within width/2 of
+        the edges of the array are not modified.
+
+    :param percentile:
+        The percentile in the range [0, 100]. Default is 50. Values
+        between ranks are linearly interpolated, as per
+        numpy.percentile.
+
+    :param nthreads:
+        (Optional) The number of threads over which the tiles of the
+        array are filtered. Default is the number of CPUs.
+
+    :return:
+        A float64 numpy array of the same shape as array.
+
+    Example:
+
+        >>> p90 = percentile_filter(image, 7, 90)
+
+    :notes:
+        See median.
+
+    :author:
+        Josh Sixsmith, josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au
+
+    :history:
+        * 19/10/2026: Created
+    """
+    if ((percentile < 0) | (percentile > 100)):
+        raise ValueError('Error. percentile must be between 0 and 100.')
+
+    values, out, frac = _window_filter(array, width, percentile, nthreads)
+
+    result = values[out[0]].astype('float64')
+    if (out.shape[0] == 2):
+        differ = out[0] != out[1]
+        upper = values[out[1][differ]].astype('float64')
+        result[differ] += frac * (upper - result[differ])
+
+    return result
+
+
+def mode_filter(array, width, nthreads=None):
+    """
+    Computes the most frequent value of the width x width neighbourhood
+    of every element of a 1D or 2D array, e.g. to smooth a
+    classification. Ties are resolved to the lowest value.
+
+    :param array:
+        A 1D or 2D numpy array of any type.
+
+    :param width:
+        The odd width of the neighbourhood. Elements within width/2 of
+        the edges of the array are not modified.
+
+    :param nthreads:
+        (Optional) The number of threads over which the tiles of the
+        array are filtered. Default is the number of CPUs.
+
+    :return:
+        A numpy array of the same shape and type as array.
+
+    Example:
+
+        >>> smooth = mode_filter(classes, 5)
+
+    :notes:
+        As per median, the cost per element is independent of width,
+        however it is proportional to the number of distinct values of
+        array, and is therefore best suited to classifications. Arrays
+        with more than 16 distinct values per element of the window are
+        instead filtered by sorting each window.
+
+    :author:
+        Josh Sixsmith, josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au
+
+    :history:
+        * 19/10/2026: Created
+    """
+    values, out, frac = _window_filter(array, width, 'mode', nthreads)
+
+    return values[out[0]]
+
+
+def _ranks(array):
+    """
+    Returns a tuple of (values, bins); the distinct values of array in
+    ascending order, and the (int32) index of each element within them.
+    Integer arrays spanning a range no larger than the array are
+    histogrammed, others are sorted.
+    """
+    if ((array.dtype.kind in 'iu') & (array.dtype.itemsize <= 4) &
+            (array.size != 0)):
+        minv = int(array.min())
+        span = int(array.max()) - minv + 1
+        if (span <= max(array.size, 2**16)):
+            # The offsets from minv are histogrammed, as the number of bins
+            # can't be represented by the narrower types
+            offset = array.astype('int64')
+            offset -= minv
+            hist = histogram(offset, minv=0, maxv=span - 1)
+            occupied = hist['histogram'] != 0
+            values = (numpy.flatnonzero(occupied) + minv).astype(array.dtype)
+            lut = (numpy.cumsum(occupied) - 1).astype('int32')
+            return values, lut[offset]
+
+    values, bins = numpy.unique(array, return_inverse=True)
+
+    return values, bins.reshape(array.shape).astype('int32')
+
+
+def _window_filter(array, width, stat, nthreads=None):
+    """
+    Applies a sliding window filter to the bins of array. stat is one of
+    'median', 'mode', or a percentile.
+    Returns a tuple of (values, out, frac); the distinct values of array,
+    the bins of the result, of shape (nout,) + array.shape, and the
+    interpolation fraction between the two planes of out if nout is 2.
+    """
+    array = numpy.asarray(array)
+    if array.ndim not in (1, 2):
+        raise TypeError('Error. array must be 1D or 2D.')
+    if ((int(width) != width) or (width < 1) or (width % 2 == 0)):
+        raise ValueError('Error. width must be an odd positive integer.')
+
+    rx = int(width) // 2
+    ry = rx if (array.ndim == 2) else 0
+
+    values, bins = _ranks(array)
+    shape = array.shape
+    bins = numpy.ascontiguousarray(bins.reshape(-1, shape[-1]))
+    nrows, ncols = bins.shape
+    nbins = values.shape[0]
+
+    count = (2 * ry + 1) * (2 * rx + 1)
+    frac = 0.0
+    if (stat == 'median'):
+        rank = count // 2
+        nout = 1
+    elif (stat == 'mode'):
+        rank = 0
+        nout = 1
+    else:
+        pos = stat / 100.0 * (count - 1)
+        rank = int(numpy.floor(pos))
+        frac = pos - rank
+        nout = 2 if ((frac > 0) & (rank + 1 < count)) else 1
+
+    # The elements near the edges are copied
+    out = numpy.empty((nout, nrows, ncols), dtype='int32')
+    out[:] = bins
+    if ((nrows <= 2 * ry) | (ncols <= 2 * rx)):
+        return values, out.reshape((nout,) + shape), frac
+
+    if not _use_kernel(nbins, count, stat):
+        if (stat == 'mode'):
+            _numpy_mode(bins, out, ry, rx)
+        else:
+            _select_filter(bins, out, ry, rx, rank)
+        return values, out.reshape((nout,) + shape), frac
+
+    # The mode requires the full window histogram
+    if (stat == 'mode'):
+        nfine = nbins
+    else:
+        nfine = 1 << (int(numpy.ceil(numpy.log2(max(nbins, 1)) / 2)))
+
+    # Tiles whose column histograms are within TILE_BYTES
+    tcols = max(64, TILE_BYTES // (4 * (nbins + nbins // nfine + 1)) - 2 * rx)
+    trows = max(TILE_ROWS, 4 * ry)
+    tiles = [(r, min(r + trows, nrows - ry) - 1, c,
+              min(c + tcols, ncols - rx) - 1)
+             for r in range(ry, nrows - ry, trows)
+             for c in range(rx, ncols - rx, tcols)]
+
+    func = _idl_median.idl_median.window_filter
+    flat = bins.ravel()
+    res = out.ravel()
+
+    def run(tile):
+        r0, r1, c0, c1 = tile
+        func(flat, res, flat.shape[0], res.shape[0], nbins, nfine, nrows,
+             ncols, ry, rx, int(stat == 'mode'), rank, nout, r0 + 1, r1 + 1,
+             c0 + 1, c1 + 1)
+
+    if nthreads is None:
+        nthreads = cpu_count()
+
+    if ((nthreads == 1) | (len(tiles) == 1)):
+        for tile in tiles:
+            run(tile)
+    else:
+        pool = ThreadPool(min(nthreads, len(tiles)))
+        pool.map(run, tiles)
+        pool.close()
+        pool.join()
+
+    return values, out.reshape((nout,) + shape), frac
+
+
+def _use_kernel(nbins, count, stat):
+    """
+    Returns True if the window histograms of the compiled kernel are
+    expected to be quicker than selecting from each window of count
+    elements.
+    The histogram search of a rank costs of the order of sqrt(nbins) per
+    element, and that of the mode nbins, while selection costs of the
+    order of count.
+    """
+    if (_idl_median is None):
+        return False
+
+    if (stat == 'mode'):
+        return nbins <= 16 * count
+
+    return (nbins <= MAX_BINS) & (64 * count * count >= nbins)
+
+
+def _select_filter(bins, out, ry, rx, rank):
+    """
+    Computes the ranks rank, rank + 1, ... of each window of bins
+    into the planes of out via scipy.ndimage.rank_filter. The elements
+    near the edges are left unmodified.
+    """
+    nrows, ncols = bins.shape
+    rows = slice(ry, nrows - ry)
+    cols = slice(rx, ncols - rx)
+    for s in range(out.shape[0]):
+        result = ndimage.rank_filter(bins, rank + s,
+                                     size=(2 * ry + 1, 2 * rx + 1))
+        out[s, rows, cols] = result[rows, cols]
+
+
+def _numpy_mode(bins, out, ry, rx):
+    """
+    A numpy equivalent of the mode of the window_filter kernel, used
+    when the compiled extension is unavailable or there are many distinct
+    values. The windows are sorted a block of rows at a time.
+    """
+    nrows, ncols = bins.shape
+    windows = sliding_window_view(bins, (2 * ry + 1, 2 * rx + 1))
+    step = max(1, 2**20 // (windows.shape[1] * windows[0, 0].size))
+    pos = numpy.arange(windows[0, 0].size)
+
+    for i in range(0, windows.shape[0], step):
+        block = numpy.sort(windows[i:i+step].reshape(
+            -1, windows.shape[1], windows[0, 0].size), axis=-1)
+        rows = slice(ry + i, ry + i + block.shape[0])
+        cols = slice(rx, ncols - rx)
+
+        # The length of the run ending at each element of the sorted
+        # windows, the first of the longest runs being the mode
+        starts = numpy.ones(block.shape, dtype='bool')
+        starts[..., 1:] = block[..., 1:] != block[..., :-1]
+        first = numpy.maximum.accumulate(numpy.where(starts, pos, 0),
+                                         axis=-1)
+        longest = numpy.argmax(pos - first, axis=-1)
+        out[0, rows, cols] = numpy.take_along_axis(
+            block, longest[..., None], axis=-1)[..., 0]
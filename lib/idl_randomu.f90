@@ -0,0 +1,195 @@
+MODULE idl_randomu
+    IMPLICIT NONE
+    ! Author: Josh Sixsmith, josh.sixsmith@gmail.com
+    !
+    ! Copyright
+    !
+    ! Copyright (c) 2014, Josh Sixsmith
+    ! All rights reserved.
+
+    ! Redistribution and use in source and binary forms, with or without
+    ! modification, are permitted provided that the following conditions are met:
+
+    ! 1. Redistributions of source code must retain the above copyright notice, this
+    !    list of conditions and the following disclaimer. 
+    ! 2. Redistributions in binary form must reproduce the above copyright notice,
+    !    this list of conditions and the following disclaimer in the documentation
+    !    and/or other materials provided with the distribution. 
+
+    ! THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ! ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    ! WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+    ! DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+    ! ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+    ! (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+    ! LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+    ! ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+    ! (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+    ! SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+    ! The views and conclusions contained in the software and documentation are those
+    ! of the authors and should not be interpreted as representing official policies, 
+    ! either expressed or implied, of the FreeBSD Project.
+    !
+
+CONTAINS
+
+    SUBROUTINE ran1_float(state, res, n)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, i
+       INTEGER*4, DIMENSION(34), INTENT(INOUT) :: state
+       REAL*4, DIMENSION(n), INTENT(INOUT) :: res
+       !f2py depend(n), res
+       !f2py threadsafe
+       INTEGER*4, PARAMETER :: IA=16807, IM=2147483647, IQ=127773, IR=2836
+       INTEGER*4, PARAMETER :: NTAB=32, NDIV=1+(IM-1)/NTAB
+       REAL*8, PARAMETER :: AM=1.0d0/IM
+       REAL*4, PARAMETER :: EPS=1.2e-7, RNMX=1-EPS
+       INTEGER*4 :: idum, iy, j, k
+
+       ! The minimal standard generator of Park and Miller with a
+       ! Bays-Durham shuffle (ran1 of Numerical Recipes).
+       ! state(1) holds idum, state(2) iy and state(3:34) the shuffle table.
+       ! A zero iy (or a non-positive idum) initialises the table from idum
+       ! As per ran1, the deviate is computed in double precision prior to
+       ! conversion
+       idum = state(1)
+       iy = state(2)
+       if ((idum .le. 0) .or. (iy .eq. 0)) then
+          idum = max(-idum, 1)
+          do j = NTAB + 8, 1, -1
+             k = idum / IQ
+             idum = IA * (idum - k * IQ) - IR * k
+             if (idum .lt. 0) idum = idum + IM
+             if (j .le. NTAB) state(j + 2) = idum
+          enddo
+          iy = state(3)
+       endif
+
+       do i = 1, n
+          ! Schrage's method, to compute IA * idum mod IM without overflow
+          k = idum / IQ
+          idum = IA * (idum - k * IQ) - IR * k
+          if (idum .lt. 0) idum = idum + IM
+          j = 1 + iy / NDIV
+          iy = state(j + 2)
+          state(j + 2) = idum
+          res(i) = min(real(AM * iy, 4), RNMX)
+       enddo
+
+       state(1) = idum
+       state(2) = iy
+
+    END SUBROUTINE ran1_float
+
+    SUBROUTINE gasdev_float(state, res, n)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, i
+       INTEGER*4, DIMENSION(34), INTENT(INOUT) :: state
+       REAL*4, DIMENSION(n), INTENT(INOUT) :: res
+       !f2py depend(n), res
+       !f2py threadsafe
+       REAL*4, DIMENSION(2) :: v
+       REAL*4 :: rsq, fac
+
+       ! The polar form of the Box-Muller transform (gasdev of Numerical
+       ! Recipes), each accepted pair of uniforms yielding two deviates.
+       ! The second deviate of a pair is returned first, as per gasdev
+       i = 1
+       do while (i .le. n)
+          rsq = 0
+          do while ((rsq .ge. 1) .or. (rsq .eq. 0))
+             call ran1_float(state, v, 2_8)
+             v = 2 * v - 1
+             rsq = v(1) * v(1) + v(2) * v(2)
+          enddo
+          fac = sqrt(-2 * log(rsq) / rsq)
+          res(i) = v(2) * fac
+          if (i .lt. n) res(i + 1) = v(1) * fac
+          i = i + 2
+       enddo
+
+    END SUBROUTINE gasdev_float
+
+    SUBROUTINE ran1_dfloat(state, res, n)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, i
+       INTEGER*4, DIMENSION(34), INTENT(INOUT) :: state
+       REAL*8, DIMENSION(n), INTENT(INOUT) :: res
+       !f2py depend(n), res
+       !f2py threadsafe
+       INTEGER*4, PARAMETER :: IA=16807, IM=2147483647, IQ=127773, IR=2836
+       INTEGER*4, PARAMETER :: NTAB=32, NDIV=1+(IM-1)/NTAB
+       REAL*8, PARAMETER :: AM=1.0d0/IM
+       REAL*8, PARAMETER :: EPS=2.2d-16, RNMX=1-EPS
+       INTEGER*4 :: idum, iy, j, k
+
+       ! The minimal standard generator of Park and Miller with a
+       ! Bays-Durham shuffle (ran1 of Numerical Recipes).
+       ! state(1) holds idum, state(2) iy and state(3:34) the shuffle table.
+       ! A zero iy (or a non-positive idum) initialises the table from idum
+       ! As per ran1, the deviate is computed in double precision prior to
+       ! conversion
+       idum = state(1)
+       iy = state(2)
+       if ((idum .le. 0) .or. (iy .eq. 0)) then
+          idum = max(-idum, 1)
+          do j = NTAB + 8, 1, -1
+             k = idum / IQ
+             idum = IA * (idum - k * IQ) - IR * k
+             if (idum .lt. 0) idum = idum + IM
+             if (j .le. NTAB) state(j + 2) = idum
+          enddo
+          iy = state(3)
+       endif
+
+       do i = 1, n
+          ! Schrage's method, to compute IA * idum mod IM without overflow
+          k = idum / IQ
+          idum = IA * (idum - k * IQ) - IR * k
+          if (idum .lt. 0) idum = idum + IM
+          j = 1 + iy / NDIV
+          iy = state(j + 2)
+          state(j + 2) = idum
+          res(i) = min(real(AM * iy, 8), RNMX)
+       enddo
+
+       state(1) = idum
+       state(2) = iy
+
+    END SUBROUTINE ran1_dfloat
+
+    SUBROUTINE gasdev_dfloat(state, res, n)
+       IMPLICIT NONE
+
+       INTEGER*8 :: n, i
+       INTEGER*4, DIMENSION(34), INTENT(INOUT) :: state
+       REAL*8, DIMENSION(n), INTENT(INOUT) :: res
+       !f2py depend(n), res
+       !f2py threadsafe
+       REAL*8, DIMENSION(2) :: v
+       REAL*8 :: rsq, fac
+
+       ! The polar form of the Box-Muller transform (gasdev of Numerical
+       ! Recipes), each accepted pair of uniforms yielding two deviates.
+       ! The second deviate of a pair is returned first, as per gasdev
+       i = 1
+       do while (i .le. n)
+          rsq = 0
+          do while ((rsq .ge. 1) .or. (rsq .eq. 0))
+             call ran1_dfloat(state, v, 2_8)
+             v = 2 * v - 1
+             rsq = v(1) * v(1) + v(2) * v(2)
+          enddo
+          fac = sqrt(-2 * log(rsq) / rsq)
+          res(i) = v(2) * fac
+          if (i .lt. n) res(i + 1) = v(1) * fac
+          i = i + 2
+       enddo
+
+    END SUBROUTINE gasdev_dfloat
+
+END MODULE idl_randomu
@@ -2,12 +2,26 @@
 
 from __future__ import print_function
 from __future__ import absolute_import
-from numpy.random import RandomState
-from numpy.random import mtrand
+import time
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
+import numpy
+from numpy.random import Generator
+from numpy.random import Philox
+from numpy.random import SeedSequence
+from numpy.random import default_rng
+try:
+    import _idl_randomu
+except ImportError:
+    _idl_randomu = None
+
+# The number of elements generated by each stream in the parallel mode.
+# It is fixed so that the result does not depend on the number of threads.
+CHUNK_SIZE = 2**20
 
 
 def randomu(seed, di=None, binomial=None, double=False, gamma=False,
-            normal=False, poisson=False):
+            normal=False, poisson=False, nthreads=None, ran1=False):
     """
     Replicates the randomu function avaiable within IDL
     (Interactive Data Language, EXELISvis).
@@ -22,9 +36,10 @@ def randomu(seed, di=None, binomial=None, double=False, gamma=False,
     poisson
 
     :param seed:
-        If seed is not of type mtrand.RandomState, then a new state is
-        initialised. Othersise seed will be used to generate the random
-        values.
+        If seed is of type numpy.random.Generator, then seed will be
+        used to generate the random values. Otherwise a new Generator
+        is initialised from seed, which can be None, an integer or a
+        numpy.random.SeedSequence (see numpy.random.default_rng).
 
     :param di:
         A list specifying the dimensions of the resulting array. If di
@@ -66,6 +81,24 @@ def randomu(seed, di=None, binomial=None, double=False, gamma=False,
         uniform deviates in the range [0..2^32-1], using the Mersenne
         Twister algorithm. All other keywords will be ignored.
 
+    :param nthreads:
+        If set, the values are generated in parallel using nthreads
+        threads. The array is split into chunks of CHUNK_SIZE elements,
+        each drawn from an independent stream spawned from the
+        SeedSequence of seed. The result is reproducible, and
+        independent of nthreads, but differs from the serial result.
+        Set to 0 to use the number of CPUs. Default is None (serial).
+
+    :param ran1:
+        If set to True, then the uniform and normal deviates are
+        generated by the ran1 generator of Numerical Recipes (the
+        Park-Miller minimal standard with a Bays-Durham shuffle),
+        and the polar Box-Muller method of gasdev, as used by IDL's
+        /RAN1 keyword. seed can then be None (seeded from the
+        clock), an integer or the state returned by a previous call,
+        which is a 34 element int32 array. The spare normal deviate of
+        an odd length draw is not carried between calls.
+
     :return:
         A NumPy array of uniformly distributed random numbers of the
         specified dimensions.
@@ -81,6 +114,11 @@ def randomu(seed, di=None, binomial=None, double=False, gamma=False,
         >>> x, sd = randomu(seed, [1000], poisson=1.5)
         >>> # Return a scalar from a uniform distribution
         >>> x, sd = randomu(seed)
+        >>> # A reproducible 1e9 element draw, generated in parallel
+        >>> x, sd = randomu(42, [1000000000], nthreads=0)
+        >>> # The ran1 sequence, continued by passing back the state
+        >>> x, sd = randomu(-1, [100, 100], ran1=True)
+        >>> x, sd = randomu(sd, [100, 100], ran1=True)
 
     :author:
         Josh Sixsmith, josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au
@@ -121,9 +159,10 @@ def randomu(seed, di=None, binomial=None, double=False, gamma=False,
         dtype = 'float32'
 
     # Check the seed
-    # http://stackoverflow.com/questions/5836335/consistenly-create-same-random-numpy-array
-    if type(seed) != mtrand.RandomState:
-        seed = RandomState()
+    if ran1:
+        seed = _ran1_state(seed)
+    elif not isinstance(seed, Generator):
+        seed = default_rng(seed)
 
     if di is not None:
         if type(di) is not list:
@@ -166,26 +205,289 @@ def randomu(seed, di=None, binomial=None, double=False, gamma=False,
             msg = "Error. binomial must contain [n,p] trials & probability."
             raise ValueError(msg)
 
-        n = binomial[0]
-        p = binomial[1]
+    # The uniform, normal and gamma distributions are generated directly
+    # in the requested precision. The binomial and poisson distributions
+    # are integer valued and need to be converted
+    def draw(rng, size, out=None):
+        if binomial:
+            res = rng.binomial(binomial[0], binomial[1], size)
+        elif gamma:
+            return rng.standard_gamma(gamma, size=size, dtype=dtype, out=out)
+        elif normal:
+            return rng.standard_normal(size=size, dtype=dtype, out=out)
+        elif poisson:
+            res = rng.poisson(poisson, size)
+        else:
+            return rng.random(size=size, dtype=dtype, out=out)
+
+        if out is None:
+            return res.astype(dtype)
+        out[:] = res
+        return out
+
+    if ran1:
+        if (binomial or gamma or poisson):
+            msg = "Error. ran1 supports the uniform and normal distributions."
+            raise ValueError(msg)
+        if nthreads is not None:
+            raise ValueError("Error. ran1 is a serial generator.")
+        if _idl_randomu is None:
+            msg = "Error. ran1 requires the compiled _idl_randomu extension."
+            raise ImportError(msg)
+        res = numpy.empty(dims, dtype=dtype)
+        if normal:
+            kernel = {'float32': _idl_randomu.idl_randomu.gasdev_float,
+                      'float64': _idl_randomu.idl_randomu.gasdev_dfloat}
+        else:
+            kernel = {'float32': _idl_randomu.idl_randomu.ran1_float,
+                      'float64': _idl_randomu.idl_randomu.ran1_dfloat}
+        flat = res.reshape(-1)
+        if (flat.shape[0] > 0):
+            kernel[dtype](seed, flat, flat.shape[0])
+    elif nthreads is None:
+        res = draw(seed, dims)
+    else:
+        res = numpy.empty(dims, dtype=dtype)
+        _parallel_draw(seed, draw, res.reshape(-1), nthreads)
+
+    if di is None:
+        res = res[0]
+
+    return res, seed
+
+
+def _ran1_state(seed):
+    """
+    Returns the ran1 state, initialising it from an integer seed, or
+    from the clock if seed is None.
+    """
+    if isinstance(seed, numpy.ndarray):
+        if (seed.shape != (34,)):
+            raise ValueError("Error. The ran1 state must have 34 elements.")
+        return seed.astype('int32')
+
+    if seed is None:
+        seed = int(time.time())
+    elif not isinstance(seed, (int, numpy.integer)):
+        msg = "Error. seed must be None, an integer or a ran1 state."
+        raise TypeError(msg)
+
+    # A negative idum initialises the shuffle table
+    state = numpy.zeros(34, dtype='int32')
+    state[0] = -(abs(int(seed)) % 2147483647)
+
+    return state
+
+
+def _parallel_draw(seed, draw, out, nthreads):
+    """
+    Fills out in chunks of CHUNK_SIZE elements, each chunk drawn from
+    an independent stream spawned from the SeedSequence of seed.
+    """
+    if nthreads == 0:
+        nthreads = cpu_count()
+
+    nchunks = max(1, -(-out.shape[0] // CHUNK_SIZE))
+    streams = seed.bit_generator.seed_seq.spawn(nchunks)
+
+    def fill(i):
+        chunk = out[i*CHUNK_SIZE:(i+1)*CHUNK_SIZE]
+        draw(default_rng(streams[i]), chunk.shape, out=chunk)
 
-        res = seed.binomial(n, p, dims)
+    pool = ThreadPool(nthreads)
+    pool.map(fill, range(nchunks))
+    pool.close()
+    pool.join()
 
-    elif gamma:
-        res = seed.gamma(gamma, size=dims)
 
-    elif normal:
-        res = seed.normal(0, 1, dims)
+def randomu_tile(seed, di, tile, tile_index, double=False, normal=False):
+    """
+    Generates a single tile of a logical random array of dimensions di,
+    without generating the remainder of the array.
+
+    Every element is derived from a counter based stream (Philox) keyed
+    by seed, at a counter given by the element's position within the
+    logical array. A tile can therefore be regenerated on its own from
+    seed and tile_index, and the logical array is identical for any
+    choice of tile dimensions.
+
+    :param seed:
+        An integer or numpy.random.SeedSequence from which the key of
+        the stream is derived.
+
+    :param di:
+        A list specifying the dimensions of the logical array, in the
+        same order as randomu, i.e. [D1, D2, ...Dn] (x,y,z...).
 
-    elif poisson:
-        res = seed.poisson(poisson, dims)
+    :param tile:
+        A list specifying the dimensions of a tile, in the same order as
+        di. Tiles at the upper edges are truncated to fit within di.
 
+    :param tile_index:
+        The index of the tile, counting the tiles in row major (numpy)
+        order.
+
+    :param double:
+        If set to True, then double precision values are returned.
+
+    :param normal:
+        If set to True, then random deviates will be generated from a
+        normal distribution (via the Box-Muller transform). Otherwise
+        uniform deviates in the range [0, 1).
+
+    :return:
+        A tuple of (slices, values), where slices is a tuple of slice
+        objects locating the tile within the logical numpy array, and
+        values is a numpy array containing the tile.
+
+    Example:
+
+        >>> # Generate tile 7 of a 100000 by 100000 array of noise
+        >>> slices, values = randomu_tile(42, [100000, 100000],
+        ...                               [4096, 4096], 7)
+
+    :author:
+        Josh Sixsmith, josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au
+
+    :history:
+        * 19/10/2026: Created
+    """
+    dims, tdims = _check_tiles(di, tile)
+    ntiles = [-(-d // t) for d, t in zip(dims, tdims)]
+    if ((tile_index < 0) | (tile_index >= numpy.prod(ntiles))):
+        raise IndexError('Error. tile_index is out of bounds!')
+
+    tindex = numpy.unravel_index(tile_index, ntiles)
+    slices = tuple(slice(int(i) * t, min((int(i) + 1) * t, d))
+                   for i, t, d in zip(tindex, tdims, dims))
+
+    key = _key(seed)
+    dtype = 'float64' if double else 'float32'
+
+    return slices, _fill_tile(key, dims, slices, dtype, normal)
+
+
+def randomu_tiles(seed, di, tile, double=False, normal=False):
+    """
+    Iterates over the tiles of a logical random array of dimensions di.
+    See randomu_tile.
+
+    :param seed:
+        An integer or numpy.random.SeedSequence from which the key of
+        the stream is derived.
+
+    :param di:
+        A list specifying the dimensions of the logical array, in the
+        same order as randomu, i.e. [D1, D2, ...Dn] (x,y,z...).
+
+    :param tile:
+        A list specifying the dimensions of a tile, in the same order as
+        di.
+
+    :param double:
+        If set to True, then double precision values are returned.
+
+    :param normal:
+        If set to True, then random deviates will be generated from a
+        normal distribution.
+
+    :return:
+        A generator yielding a tuple of (tile_index, slices, values) for
+        each tile, in row major order.
+
+    Example:
+
+        >>> for i, slices, values in randomu_tiles(42, [20000, 20000],
+        ...                                        [20000, 256]):
+        ...     outds[slices] = values
+
+    :author:
+        Josh Sixsmith, josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au
+
+    :history:
+        * 19/10/2026: Created
+    """
+    dims, tdims = _check_tiles(di, tile)
+    ntiles = int(numpy.prod([-(-d // t) for d, t in zip(dims, tdims)]))
+    for i in range(ntiles):
+        slices, values = randomu_tile(seed, di, tile, i, double=double,
+                                      normal=normal)
+        yield i, slices, values
+
+
+def _check_tiles(di, tile):
+    """
+    Checks the logical and tile dimensions, returning both in numpy
+    order.
+    """
+    if (type(di) is not list) | (type(tile) is not list):
+        raise TypeError("Dimensions must be a list.")
+    if len(di) > 8:
+        raise ValueError("Error. More than 8 dimensions specified.")
+    if len(di) != len(tile):
+        raise ValueError("Error. tile must have the same length as di.")
+    if (min(di) < 1) | (min(tile) < 1):
+        raise ValueError("Error. Dimensions must be positive.")
+
+    return di[::-1], tile[::-1]
+
+
+def _key(seed):
+    """
+    Derives the Philox key from seed.
+    """
+    if isinstance(seed, SeedSequence):
+        ss = seed
+    elif isinstance(seed, (int, numpy.integer)):
+        ss = SeedSequence(int(seed))
     else:
-        res = seed.uniform(size=dims)
+        msg = "Error. seed must be an integer or a SeedSequence."
+        raise TypeError(msg)
 
-    res = res.astype(dtype)
+    return ss.generate_state(2, dtype='uint64')
 
-    if di is None:
-        res = res[0]
 
-    return res, seed
+def _fill_tile(key, dims, slices, dtype, normal):
+    """
+    Generates the values of the logical array at slices. Element i of
+    the logical array is derived from the raw 64 bit output i of the
+    stream, or outputs 2i and 2i+1 for the normal distribution.
+    """
+    ndim = len(dims)
+    tshape = tuple(s.stop - s.start for s in slices)
+    strides = numpy.cumprod((dims[1:] + [1])[::-1])[::-1]
+
+    # Each contiguous run of the tile within the logical array spans the
+    # axes from k onwards, where the axes beyond k are fully covered
+    k = ndim - 1
+    while ((k > 0) & (tshape[k] == dims[k])):
+        k -= 1
+    run = int(numpy.prod(tshape[k:]))
+
+    # The flat index at which each run starts
+    starts = numpy.zeros(tshape[0:k], dtype='int64') + slices[k].start * \
+             strides[k]
+    for axis in range(k):
+        coord = numpy.arange(slices[axis].start, slices[axis].stop)
+        shape = [1] * k
+        shape[axis] = -1
+        starts = starts + coord.reshape(shape) * strides[axis]
+
+    per = 2 if normal else 1
+    out = numpy.empty((starts.size, run), dtype=dtype)
+    for i, start in enumerate(starts.ravel()):
+        offset = int(start) * per
+        bitgen = Philox(key=key, counter=offset // 4)
+        raw = bitgen.random_raw(run * per + offset % 4)[offset % 4:]
+        if normal:
+            # Box-Muller; u1 is in (0, 1] to avoid log(0)
+            u1 = ((raw[0::2] >> 11) + 1) * 2.0**-53
+            u2 = (raw[1::2] >> 11) * 2.0**-53
+            out[i] = numpy.sqrt(-2.0 * numpy.log(u1)) * \
+                     numpy.cos(2.0 * numpy.pi * u2)
+        elif (dtype == 'float32'):
+            out[i] = (raw >> 40) * numpy.float32(2.0**-24)
+        else:
+            out[i] = (raw >> 11) * 2.0**-53
+
+    return out.reshape(tshape)
@@ -0,0 +1,840 @@
+MODULE idl_region_grow
+    IMPLICIT NONE
+    ! Author: Josh Sixsmith, josh.sixsmith@gmail.com
+    !
+    ! Copyright
+    !
+    ! Copyright (c) 2014, Josh Sixsmith
+    ! All rights reserved.
+
+    ! Redistribution and use in source and binary forms, with or without
+    ! modification, are permitted provided that the following conditions are met:
+
+    ! 1. Redistributions of source code must retain the above copyright notice, this
+    !    list of conditions and the following disclaimer. 
+    ! 2. Redistributions in binary form must reproduce the above copyright notice,
+    !    this list of conditions and the following disclaimer in the documentation
+    !    and/or other materials provided with the distribution. 
+
+    ! THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ! ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    ! WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+    ! DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+    ! ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+    ! (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+    ! LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+    ! ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+    ! (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+    ! SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+    ! The views and conclusions contained in the software and documentation are those
+    ! of the authors and should not be interpreted as representing official policies, 
+    ! either expressed or implied, of the FreeBSD Project.
+    !
+
+CONTAINS
+
+    SUBROUTINE flood_fill_int8(buf, mask, queue, b_sz, a_sz, ncols, rstride, cstride, nseeds, lower, upper, &
+                                 all_neighbors, nregion)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, a_sz, ncols, rstride, cstride, nrows, nseeds, head, tail, idx, nidx, r, c, rr, cc, p
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+       INTEGER*1, DIMENSION(a_sz), INTENT(INOUT) :: mask
+       !f2py depend(a_sz), mask
+       INTEGER*8, DIMENSION(a_sz), INTENT(INOUT) :: queue
+       !f2py depend(a_sz), queue
+
+       REAL*8 :: lower, upper
+       INTEGER*1 :: v
+       INTEGER :: all_neighbors, k, nnbr
+       INTEGER*8, INTENT(OUT) :: nregion
+       INTEGER*8, DIMENSION(8), PARAMETER :: dr = (/-1, 0, 0, 1, -1, -1, 1, 1/)
+       INTEGER*8, DIMENSION(8), PARAMETER :: dc = (/0, -1, 1, 0, -1, 1, -1, 1/)
+       !f2py threadsafe
+
+       ! The queue holds 0-based flat indices. On entry the first nseeds
+       ! elements are the seeds, already flagged within mask. Every accepted
+       ! pixel is appended to the queue, so on exit queue(1:nregion) is the
+       ! grown region and only the region and its border are ever visited.
+       ! The image is read in place from buf, pixel (r, c) being held at
+       ! buf(r * rstride + c * cstride + 1). Unsigned types are passed as the
+       ! signed type of the same size, and converted via iand.
+       nrows = a_sz / ncols
+       nnbr = 4
+       if (all_neighbors .ne. 0) nnbr = 8
+
+       head = 1
+       tail = nseeds
+       do while (head .le. tail)
+          idx = queue(head)
+          head = head + 1
+          r = idx / ncols
+          c = idx - r * ncols
+          do k = 1, nnbr
+             rr = r + dr(k)
+             cc = c + dc(k)
+             if ((rr .lt. 0) .or. (rr .ge. nrows) .or. (cc .lt. 0) .or. (cc .ge. ncols)) cycle
+             nidx = rr * ncols + cc + 1
+             if (mask(nidx) .ne. 0) cycle
+             p = rr * rstride + cc * cstride + 1
+             v = buf(p)
+             if ((v .lt. lower) .or. (v .gt. upper)) cycle
+             mask(nidx) = 1
+             tail = tail + 1
+             queue(tail) = nidx - 1
+          enddo
+       enddo
+
+       nregion = tail
+
+    END SUBROUTINE flood_fill_int8
+
+    SUBROUTINE flood_fill_uint8(buf, mask, queue, b_sz, a_sz, ncols, rstride, cstride, nseeds, lower, upper, &
+                                 all_neighbors, nregion)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, a_sz, ncols, rstride, cstride, nrows, nseeds, head, tail, idx, nidx, r, c, rr, cc, p
+       INTEGER*1, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+       INTEGER*1, DIMENSION(a_sz), INTENT(INOUT) :: mask
+       !f2py depend(a_sz), mask
+       INTEGER*8, DIMENSION(a_sz), INTENT(INOUT) :: queue
+       !f2py depend(a_sz), queue
+
+       REAL*8 :: lower, upper
+       INTEGER*2 :: v
+       INTEGER :: all_neighbors, k, nnbr
+       INTEGER*8, INTENT(OUT) :: nregion
+       INTEGER*8, DIMENSION(8), PARAMETER :: dr = (/-1, 0, 0, 1, -1, -1, 1, 1/)
+       INTEGER*8, DIMENSION(8), PARAMETER :: dc = (/0, -1, 1, 0, -1, 1, -1, 1/)
+       !f2py threadsafe
+       nrows = a_sz / ncols
+       nnbr = 4
+       if (all_neighbors .ne. 0) nnbr = 8
+
+       head = 1
+       tail = nseeds
+       do while (head .le. tail)
+          idx = queue(head)
+          head = head + 1
+          r = idx / ncols
+          c = idx - r * ncols
+          do k = 1, nnbr
+             rr = r + dr(k)
+             cc = c + dc(k)
+             if ((rr .lt. 0) .or. (rr .ge. nrows) .or. (cc .lt. 0) .or. (cc .ge. ncols)) cycle
+             nidx = rr * ncols + cc + 1
+             if (mask(nidx) .ne. 0) cycle
+             p = rr * rstride + cc * cstride + 1
+             v = iand(int(buf(p), 2), 255_2)
+             if ((v .lt. lower) .or. (v .gt. upper)) cycle
+             mask(nidx) = 1
+             tail = tail + 1
+             queue(tail) = nidx - 1
+          enddo
+       enddo
+
+       nregion = tail
+
+    END SUBROUTINE flood_fill_uint8
+
+    SUBROUTINE flood_fill_int16(buf, mask, queue, b_sz, a_sz, ncols, rstride, cstride, nseeds, lower, upper, &
+                                 all_neighbors, nregion)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, a_sz, ncols, rstride, cstride, nrows, nseeds, head, tail, idx, nidx, r, c, rr, cc, p
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+       INTEGER*1, DIMENSION(a_sz), INTENT(INOUT) :: mask
+       !f2py depend(a_sz), mask
+       INTEGER*8, DIMENSION(a_sz), INTENT(INOUT) :: queue
+       !f2py depend(a_sz), queue
+
+       REAL*8 :: lower, upper
+       INTEGER*2 :: v
+       INTEGER :: all_neighbors, k, nnbr
+       INTEGER*8, INTENT(OUT) :: nregion
+       INTEGER*8, DIMENSION(8), PARAMETER :: dr = (/-1, 0, 0, 1, -1, -1, 1, 1/)
+       INTEGER*8, DIMENSION(8), PARAMETER :: dc = (/0, -1, 1, 0, -1, 1, -1, 1/)
+       !f2py threadsafe
+       nrows = a_sz / ncols
+       nnbr = 4
+       if (all_neighbors .ne. 0) nnbr = 8
+
+       head = 1
+       tail = nseeds
+       do while (head .le. tail)
+          idx = queue(head)
+          head = head + 1
+          r = idx / ncols
+          c = idx - r * ncols
+          do k = 1, nnbr
+             rr = r + dr(k)
+             cc = c + dc(k)
+             if ((rr .lt. 0) .or. (rr .ge. nrows) .or. (cc .lt. 0) .or. (cc .ge. ncols)) cycle
+             nidx = rr * ncols + cc + 1
+             if (mask(nidx) .ne. 0) cycle
+             p = rr * rstride + cc * cstride + 1
+             v = buf(p)
+             if ((v .lt. lower) .or. (v .gt. upper)) cycle
+             mask(nidx) = 1
+             tail = tail + 1
+             queue(tail) = nidx - 1
+          enddo
+       enddo
+
+       nregion = tail
+
+    END SUBROUTINE flood_fill_int16
+
+    SUBROUTINE flood_fill_uint16(buf, mask, queue, b_sz, a_sz, ncols, rstride, cstride, nseeds, lower, upper, &
+                                 all_neighbors, nregion)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, a_sz, ncols, rstride, cstride, nrows, nseeds, head, tail, idx, nidx, r, c, rr, cc, p
+       INTEGER*2, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+       INTEGER*1, DIMENSION(a_sz), INTENT(INOUT) :: mask
+       !f2py depend(a_sz), mask
+       INTEGER*8, DIMENSION(a_sz), INTENT(INOUT) :: queue
+       !f2py depend(a_sz), queue
+
+       REAL*8 :: lower, upper
+       INTEGER*4 :: v
+       INTEGER :: all_neighbors, k, nnbr
+       INTEGER*8, INTENT(OUT) :: nregion
+       INTEGER*8, DIMENSION(8), PARAMETER :: dr = (/-1, 0, 0, 1, -1, -1, 1, 1/)
+       INTEGER*8, DIMENSION(8), PARAMETER :: dc = (/0, -1, 1, 0, -1, 1, -1, 1/)
+       !f2py threadsafe
+       nrows = a_sz / ncols
+       nnbr = 4
+       if (all_neighbors .ne. 0) nnbr = 8
+
+       head = 1
+       tail = nseeds
+       do while (head .le. tail)
+          idx = queue(head)
+          head = head + 1
+          r = idx / ncols
+          c = idx - r * ncols
+          do k = 1, nnbr
+             rr = r + dr(k)
+             cc = c + dc(k)
+             if ((rr .lt. 0) .or. (rr .ge. nrows) .or. (cc .lt. 0) .or. (cc .ge. ncols)) cycle
+             nidx = rr * ncols + cc + 1
+             if (mask(nidx) .ne. 0) cycle
+             p = rr * rstride + cc * cstride + 1
+             v = iand(int(buf(p), 4), 65535_4)
+             if ((v .lt. lower) .or. (v .gt. upper)) cycle
+             mask(nidx) = 1
+             tail = tail + 1
+             queue(tail) = nidx - 1
+          enddo
+       enddo
+
+       nregion = tail
+
+    END SUBROUTINE flood_fill_uint16
+
+    SUBROUTINE flood_fill_int32(buf, mask, queue, b_sz, a_sz, ncols, rstride, cstride, nseeds, lower, upper, &
+                                 all_neighbors, nregion)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, a_sz, ncols, rstride, cstride, nrows, nseeds, head, tail, idx, nidx, r, c, rr, cc, p
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+       INTEGER*1, DIMENSION(a_sz), INTENT(INOUT) :: mask
+       !f2py depend(a_sz), mask
+       INTEGER*8, DIMENSION(a_sz), INTENT(INOUT) :: queue
+       !f2py depend(a_sz), queue
+
+       REAL*8 :: lower, upper
+       INTEGER*4 :: v
+       INTEGER :: all_neighbors, k, nnbr
+       INTEGER*8, INTENT(OUT) :: nregion
+       INTEGER*8, DIMENSION(8), PARAMETER :: dr = (/-1, 0, 0, 1, -1, -1, 1, 1/)
+       INTEGER*8, DIMENSION(8), PARAMETER :: dc = (/0, -1, 1, 0, -1, 1, -1, 1/)
+       !f2py threadsafe
+       nrows = a_sz / ncols
+       nnbr = 4
+       if (all_neighbors .ne. 0) nnbr = 8
+
+       head = 1
+       tail = nseeds
+       do while (head .le. tail)
+          idx = queue(head)
+          head = head + 1
+          r = idx / ncols
+          c = idx - r * ncols
+          do k = 1, nnbr
+             rr = r + dr(k)
+             cc = c + dc(k)
+             if ((rr .lt. 0) .or. (rr .ge. nrows) .or. (cc .lt. 0) .or. (cc .ge. ncols)) cycle
+             nidx = rr * ncols + cc + 1
+             if (mask(nidx) .ne. 0) cycle
+             p = rr * rstride + cc * cstride + 1
+             v = buf(p)
+             if ((v .lt. lower) .or. (v .gt. upper)) cycle
+             mask(nidx) = 1
+             tail = tail + 1
+             queue(tail) = nidx - 1
+          enddo
+       enddo
+
+       nregion = tail
+
+    END SUBROUTINE flood_fill_int32
+
+    SUBROUTINE flood_fill_uint32(buf, mask, queue, b_sz, a_sz, ncols, rstride, cstride, nseeds, lower, upper, &
+                                 all_neighbors, nregion)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, a_sz, ncols, rstride, cstride, nrows, nseeds, head, tail, idx, nidx, r, c, rr, cc, p
+       INTEGER*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+       INTEGER*1, DIMENSION(a_sz), INTENT(INOUT) :: mask
+       !f2py depend(a_sz), mask
+       INTEGER*8, DIMENSION(a_sz), INTENT(INOUT) :: queue
+       !f2py depend(a_sz), queue
+
+       REAL*8 :: lower, upper
+       INTEGER*8 :: v
+       INTEGER :: all_neighbors, k, nnbr
+       INTEGER*8, INTENT(OUT) :: nregion
+       INTEGER*8, DIMENSION(8), PARAMETER :: dr = (/-1, 0, 0, 1, -1, -1, 1, 1/)
+       INTEGER*8, DIMENSION(8), PARAMETER :: dc = (/0, -1, 1, 0, -1, 1, -1, 1/)
+       !f2py threadsafe
+       nrows = a_sz / ncols
+       nnbr = 4
+       if (all_neighbors .ne. 0) nnbr = 8
+
+       head = 1
+       tail = nseeds
+       do while (head .le. tail)
+          idx = queue(head)
+          head = head + 1
+          r = idx / ncols
+          c = idx - r * ncols
+          do k = 1, nnbr
+             rr = r + dr(k)
+             cc = c + dc(k)
+             if ((rr .lt. 0) .or. (rr .ge. nrows) .or. (cc .lt. 0) .or. (cc .ge. ncols)) cycle
+             nidx = rr * ncols + cc + 1
+             if (mask(nidx) .ne. 0) cycle
+             p = rr * rstride + cc * cstride + 1
+             v = iand(int(buf(p), 8), 4294967295_8)
+             if ((v .lt. lower) .or. (v .gt. upper)) cycle
+             mask(nidx) = 1
+             tail = tail + 1
+             queue(tail) = nidx - 1
+          enddo
+       enddo
+
+       nregion = tail
+
+    END SUBROUTINE flood_fill_uint32
+
+    SUBROUTINE flood_fill_int64(buf, mask, queue, b_sz, a_sz, ncols, rstride, cstride, nseeds, lower, upper, &
+                                 all_neighbors, nregion)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, a_sz, ncols, rstride, cstride, nrows, nseeds, head, tail, idx, nidx, r, c, rr, cc, p
+       INTEGER*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+       INTEGER*1, DIMENSION(a_sz), INTENT(INOUT) :: mask
+       !f2py depend(a_sz), mask
+       INTEGER*8, DIMENSION(a_sz), INTENT(INOUT) :: queue
+       !f2py depend(a_sz), queue
+
+       REAL*8 :: lower, upper
+       INTEGER*8 :: v
+       INTEGER :: all_neighbors, k, nnbr
+       INTEGER*8, INTENT(OUT) :: nregion
+       INTEGER*8, DIMENSION(8), PARAMETER :: dr = (/-1, 0, 0, 1, -1, -1, 1, 1/)
+       INTEGER*8, DIMENSION(8), PARAMETER :: dc = (/0, -1, 1, 0, -1, 1, -1, 1/)
+       !f2py threadsafe
+       nrows = a_sz / ncols
+       nnbr = 4
+       if (all_neighbors .ne. 0) nnbr = 8
+
+       head = 1
+       tail = nseeds
+       do while (head .le. tail)
+          idx = queue(head)
+          head = head + 1
+          r = idx / ncols
+          c = idx - r * ncols
+          do k = 1, nnbr
+             rr = r + dr(k)
+             cc = c + dc(k)
+             if ((rr .lt. 0) .or. (rr .ge. nrows) .or. (cc .lt. 0) .or. (cc .ge. ncols)) cycle
+             nidx = rr * ncols + cc + 1
+             if (mask(nidx) .ne. 0) cycle
+             p = rr * rstride + cc * cstride + 1
+             v = buf(p)
+             if ((v .lt. lower) .or. (v .gt. upper)) cycle
+             mask(nidx) = 1
+             tail = tail + 1
+             queue(tail) = nidx - 1
+          enddo
+       enddo
+
+       nregion = tail
+
+    END SUBROUTINE flood_fill_int64
+
+    SUBROUTINE flood_fill_uint64(buf, mask, queue, b_sz, a_sz, ncols, rstride, cstride, nseeds, lower, upper, &
+                                 all_neighbors, nregion)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, a_sz, ncols, rstride, cstride, nrows, nseeds, head, tail, idx, nidx, r, c, rr, cc, p
+       INTEGER*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+       INTEGER*1, DIMENSION(a_sz), INTENT(INOUT) :: mask
+       !f2py depend(a_sz), mask
+       INTEGER*8, DIMENSION(a_sz), INTENT(INOUT) :: queue
+       !f2py depend(a_sz), queue
+
+       REAL*8 :: lower, upper
+       REAL*8 :: v
+       INTEGER :: all_neighbors, k, nnbr
+       INTEGER*8, INTENT(OUT) :: nregion
+       INTEGER*8, DIMENSION(8), PARAMETER :: dr = (/-1, 0, 0, 1, -1, -1, 1, 1/)
+       INTEGER*8, DIMENSION(8), PARAMETER :: dc = (/0, -1, 1, 0, -1, 1, -1, 1/)
+       !f2py threadsafe
+       nrows = a_sz / ncols
+       nnbr = 4
+       if (all_neighbors .ne. 0) nnbr = 8
+
+       head = 1
+       tail = nseeds
+       do while (head .le. tail)
+          idx = queue(head)
+          head = head + 1
+          r = idx / ncols
+          c = idx - r * ncols
+          do k = 1, nnbr
+             rr = r + dr(k)
+             cc = c + dc(k)
+             if ((rr .lt. 0) .or. (rr .ge. nrows) .or. (cc .lt. 0) .or. (cc .ge. ncols)) cycle
+             nidx = rr * ncols + cc + 1
+             if (mask(nidx) .ne. 0) cycle
+             p = rr * rstride + cc * cstride + 1
+             v = real(buf(p), 8)
+             if (buf(p) .lt. 0) v = v + 18446744073709551616.0_8
+             if ((v .lt. lower) .or. (v .gt. upper)) cycle
+             mask(nidx) = 1
+             tail = tail + 1
+             queue(tail) = nidx - 1
+          enddo
+       enddo
+
+       nregion = tail
+
+    END SUBROUTINE flood_fill_uint64
+
+    SUBROUTINE flood_fill_float32(buf, mask, queue, b_sz, a_sz, ncols, rstride, cstride, nseeds, lower, upper, &
+                                 all_neighbors, nregion)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, a_sz, ncols, rstride, cstride, nrows, nseeds, head, tail, idx, nidx, r, c, rr, cc, p
+       REAL*4, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+       INTEGER*1, DIMENSION(a_sz), INTENT(INOUT) :: mask
+       !f2py depend(a_sz), mask
+       INTEGER*8, DIMENSION(a_sz), INTENT(INOUT) :: queue
+       !f2py depend(a_sz), queue
+
+       REAL*8 :: lower, upper
+       REAL*4 :: v
+       INTEGER :: all_neighbors, k, nnbr
+       INTEGER*8, INTENT(OUT) :: nregion
+       INTEGER*8, DIMENSION(8), PARAMETER :: dr = (/-1, 0, 0, 1, -1, -1, 1, 1/)
+       INTEGER*8, DIMENSION(8), PARAMETER :: dc = (/0, -1, 1, 0, -1, 1, -1, 1/)
+       !f2py threadsafe
+       nrows = a_sz / ncols
+       nnbr = 4
+       if (all_neighbors .ne. 0) nnbr = 8
+
+       head = 1
+       tail = nseeds
+       do while (head .le. tail)
+          idx = queue(head)
+          head = head + 1
+          r = idx / ncols
+          c = idx - r * ncols
+          do k = 1, nnbr
+             rr = r + dr(k)
+             cc = c + dc(k)
+             if ((rr .lt. 0) .or. (rr .ge. nrows) .or. (cc .lt. 0) .or. (cc .ge. ncols)) cycle
+             nidx = rr * ncols + cc + 1
+             if (mask(nidx) .ne. 0) cycle
+             p = rr * rstride + cc * cstride + 1
+             v = buf(p)
+             if ((v .lt. lower) .or. (v .gt. upper)) cycle
+             mask(nidx) = 1
+             tail = tail + 1
+             queue(tail) = nidx - 1
+          enddo
+       enddo
+
+       nregion = tail
+
+    END SUBROUTINE flood_fill_float32
+
+    SUBROUTINE flood_fill_float64(buf, mask, queue, b_sz, a_sz, ncols, rstride, cstride, nseeds, lower, upper, &
+                                 all_neighbors, nregion)
+       IMPLICIT NONE
+
+       INTEGER*8 :: b_sz, a_sz, ncols, rstride, cstride, nrows, nseeds, head, tail, idx, nidx, r, c, rr, cc, p
+       REAL*8, DIMENSION(b_sz), INTENT(IN) :: buf
+       !f2py depend(b_sz), buf
+       INTEGER*1, DIMENSION(a_sz), INTENT(INOUT) :: mask
+       !f2py depend(a_sz), mask
+       INTEGER*8, DIMENSION(a_sz), INTENT(INOUT) :: queue
+       !f2py depend(a_sz), queue
+
+       REAL*8 :: lower, upper
+       REAL*8 :: v
+       INTEGER :: all_neighbors, k, nnbr
+       INTEGER*8, INTENT(OUT) :: nregion
+       INTEGER*8, DIMENSION(8), PARAMETER :: dr = (/-1, 0, 0, 1, -1, -1, 1, 1/)
+       INTEGER*8, DIMENSION(8), PARAMETER :: dc = (/0, -1, 1, 0, -1, 1, -1, 1/)
+       !f2py threadsafe
+       nrows = a_sz / ncols
+       nnbr = 4
+       if (all_neighbors .ne. 0) nnbr = 8
+
+       head = 1
+       tail = nseeds
+       do while (head .le. tail)
+          idx = queue(head)
+          head = head + 1
+          r = idx / ncols
+          c = idx - r * ncols
+          do k = 1, nnbr
+             rr = r + dr(k)
+             cc = c + dc(k)
+             if ((rr .lt. 0) .or. (rr .ge. nrows) .or. (cc .lt. 0) .or. (cc .ge. ncols)) cycle
+             nidx = rr * ncols + cc + 1
+             if (mask(nidx) .ne. 0) cycle
+             p = rr * rstride + cc * cstride + 1
+             v = buf(p)
+             if ((v .lt. lower) .or. (v .gt. upper)) cycle
+             mask(nidx) = 1
+             tail = tail + 1
+             queue(tail) = nidx - 1
+          enddo
+       enddo
+
+       nregion = tail
+
+    END SUBROUTINE flood_fill_float64
+
+    SUBROUTINE band_limits_int(stack, mask, npix, nb, lower, upper)
+       IMPLICIT NONE
+
+       INTEGER*8 :: npix, nb, p, b
+       INTEGER*2, DIMENSION(npix * nb), INTENT(IN) :: stack
+       !f2py depend(npix, nb), stack
+       INTEGER*1, DIMENSION(npix), INTENT(INOUT) :: mask
+       !f2py depend(npix), mask
+       REAL*8, DIMENSION(nb), INTENT(IN) :: lower, upper
+       !f2py depend(nb), lower, upper
+       !f2py threadsafe
+
+       ! stack is a C ordered (bands, rows, cols) array, so band b of
+       ! pixel p is located at (b - 1) * npix + p
+       do p = 1, npix
+          mask(p) = 1
+          do b = 1, nb
+             if ((stack((b - 1) * npix + p) .lt. lower(b)) .or. &
+                 (stack((b - 1) * npix + p) .gt. upper(b))) then
+                mask(p) = 0
+                exit
+             endif
+          enddo
+       enddo
+
+    END SUBROUTINE band_limits_int
+
+    SUBROUTINE mahalanobis_int(stack, mask, npix, nb, mean, icov, limit)
+       IMPLICIT NONE
+
+       INTEGER*8 :: npix, nb, p, b, k
+       INTEGER*2, DIMENSION(npix * nb), INTENT(IN) :: stack
+       !f2py depend(npix, nb), stack
+       INTEGER*1, DIMENSION(npix), INTENT(INOUT) :: mask
+       !f2py depend(npix), mask
+       REAL*8, DIMENSION(nb), INTENT(IN) :: mean
+       !f2py depend(nb), mean
+       REAL*8, DIMENSION(nb, nb), INTENT(IN) :: icov
+       !f2py depend(nb), icov
+       REAL*8 :: limit, dist
+       REAL*8, DIMENSION(nb) :: diff
+       !f2py threadsafe
+
+       ! The squared distance is evaluated for every pixel in a single
+       ! pass over the stack; icov is symmetric so its ordering is moot
+       do p = 1, npix
+          do b = 1, nb
+             diff(b) = stack((b - 1) * npix + p) - mean(b)
+          enddo
+          dist = 0.0
+          do b = 1, nb
+             do k = 1, nb
+                dist = dist + diff(k) * icov(k, b) * diff(b)
+             enddo
+          enddo
+          mask(p) = 0
+          if (dist .le. limit * limit) mask(p) = 1
+       enddo
+
+    END SUBROUTINE mahalanobis_int
+
+    SUBROUTINE band_limits_long(stack, mask, npix, nb, lower, upper)
+       IMPLICIT NONE
+
+       INTEGER*8 :: npix, nb, p, b
+       INTEGER*4, DIMENSION(npix * nb), INTENT(IN) :: stack
+       !f2py depend(npix, nb), stack
+       INTEGER*1, DIMENSION(npix), INTENT(INOUT) :: mask
+       !f2py depend(npix), mask
+       REAL*8, DIMENSION(nb), INTENT(IN) :: lower, upper
+       !f2py depend(nb), lower, upper
+       !f2py threadsafe
+
+       ! stack is a C ordered (bands, rows, cols) array, so band b of
+       ! pixel p is located at (b - 1) * npix + p
+       do p = 1, npix
+          mask(p) = 1
+          do b = 1, nb
+             if ((stack((b - 1) * npix + p) .lt. lower(b)) .or. &
+                 (stack((b - 1) * npix + p) .gt. upper(b))) then
+                mask(p) = 0
+                exit
+             endif
+          enddo
+       enddo
+
+    END SUBROUTINE band_limits_long
+
+    SUBROUTINE mahalanobis_long(stack, mask, npix, nb, mean, icov, limit)
+       IMPLICIT NONE
+
+       INTEGER*8 :: npix, nb, p, b, k
+       INTEGER*4, DIMENSION(npix * nb), INTENT(IN) :: stack
+       !f2py depend(npix, nb), stack
+       INTEGER*1, DIMENSION(npix), INTENT(INOUT) :: mask
+       !f2py depend(npix), mask
+       REAL*8, DIMENSION(nb), INTENT(IN) :: mean
+       !f2py depend(nb), mean
+       REAL*8, DIMENSION(nb, nb), INTENT(IN) :: icov
+       !f2py depend(nb), icov
+       REAL*8 :: limit, dist
+       REAL*8, DIMENSION(nb) :: diff
+       !f2py threadsafe
+
+       ! The squared distance is evaluated for every pixel in a single
+       ! pass over the stack; icov is symmetric so its ordering is moot
+       do p = 1, npix
+          do b = 1, nb
+             diff(b) = stack((b - 1) * npix + p) - mean(b)
+          enddo
+          dist = 0.0
+          do b = 1, nb
+             do k = 1, nb
+                dist = dist + diff(k) * icov(k, b) * diff(b)
+             enddo
+          enddo
+          mask(p) = 0
+          if (dist .le. limit * limit) mask(p) = 1
+       enddo
+
+    END SUBROUTINE mahalanobis_long
+
+    SUBROUTINE band_limits_dlong(stack, mask, npix, nb, lower, upper)
+       IMPLICIT NONE
+
+       INTEGER*8 :: npix, nb, p, b
+       INTEGER*8, DIMENSION(npix * nb), INTENT(IN) :: stack
+       !f2py depend(npix, nb), stack
+       INTEGER*1, DIMENSION(npix), INTENT(INOUT) :: mask
+       !f2py depend(npix), mask
+       REAL*8, DIMENSION(nb), INTENT(IN) :: lower, upper
+       !f2py depend(nb), lower, upper
+       !f2py threadsafe
+
+       ! stack is a C ordered (bands, rows, cols) array, so band b of
+       ! pixel p is located at (b - 1) * npix + p
+       do p = 1, npix
+          mask(p) = 1
+          do b = 1, nb
+             if ((stack((b - 1) * npix + p) .lt. lower(b)) .or. &
+                 (stack((b - 1) * npix + p) .gt. upper(b))) then
+                mask(p) = 0
+                exit
+             endif
+          enddo
+       enddo
+
+    END SUBROUTINE band_limits_dlong
+
+    SUBROUTINE mahalanobis_dlong(stack, mask, npix, nb, mean, icov, limit)
+       IMPLICIT NONE
+
+       INTEGER*8 :: npix, nb, p, b, k
+       INTEGER*8, DIMENSION(npix * nb), INTENT(IN) :: stack
+       !f2py depend(npix, nb), stack
+       INTEGER*1, DIMENSION(npix), INTENT(INOUT) :: mask
+       !f2py depend(npix), mask
+       REAL*8, DIMENSION(nb), INTENT(IN) :: mean
+       !f2py depend(nb), mean
+       REAL*8, DIMENSION(nb, nb), INTENT(IN) :: icov
+       !f2py depend(nb), icov
+       REAL*8 :: limit, dist
+       REAL*8, DIMENSION(nb) :: diff
+       !f2py threadsafe
+
+       ! The squared distance is evaluated for every pixel in a single
+       ! pass over the stack; icov is symmetric so its ordering is moot
+       do p = 1, npix
+          do b = 1, nb
+             diff(b) = stack((b - 1) * npix + p) - mean(b)
+          enddo
+          dist = 0.0
+          do b = 1, nb
+             do k = 1, nb
+                dist = dist + diff(k) * icov(k, b) * diff(b)
+             enddo
+          enddo
+          mask(p) = 0
+          if (dist .le. limit * limit) mask(p) = 1
+       enddo
+
+    END SUBROUTINE mahalanobis_dlong
+
+    SUBROUTINE band_limits_float(stack, mask, npix, nb, lower, upper)
+       IMPLICIT NONE
+
+       INTEGER*8 :: npix, nb, p, b
+       REAL*4, DIMENSION(npix * nb), INTENT(IN) :: stack
+       !f2py depend(npix, nb), stack
+       INTEGER*1, DIMENSION(npix), INTENT(INOUT) :: mask
+       !f2py depend(npix), mask
+       REAL*8, DIMENSION(nb), INTENT(IN) :: lower, upper
+       !f2py depend(nb), lower, upper
+       !f2py threadsafe
+
+       ! stack is a C ordered (bands, rows, cols) array, so band b of
+       ! pixel p is located at (b - 1) * npix + p
+       do p = 1, npix
+          mask(p) = 1
+          do b = 1, nb
+             if ((stack((b - 1) * npix + p) .lt. lower(b)) .or. &
+                 (stack((b - 1) * npix + p) .gt. upper(b))) then
+                mask(p) = 0
+                exit
+             endif
+          enddo
+       enddo
+
+    END SUBROUTINE band_limits_float
+
+    SUBROUTINE mahalanobis_float(stack, mask, npix, nb, mean, icov, limit)
+       IMPLICIT NONE
+
+       INTEGER*8 :: npix, nb, p, b, k
+       REAL*4, DIMENSION(npix * nb), INTENT(IN) :: stack
+       !f2py depend(npix, nb), stack
+       INTEGER*1, DIMENSION(npix), INTENT(INOUT) :: mask
+       !f2py depend(npix), mask
+       REAL*8, DIMENSION(nb), INTENT(IN) :: mean
+       !f2py depend(nb), mean
+       REAL*8, DIMENSION(nb, nb), INTENT(IN) :: icov
+       !f2py depend(nb), icov
+       REAL*8 :: limit, dist
+       REAL*8, DIMENSION(nb) :: diff
+       !f2py threadsafe
+
+       ! The squared distance is evaluated for every pixel in a single
+       ! pass over the stack; icov is symmetric so its ordering is moot
+       do p = 1, npix
+          do b = 1, nb
+             diff(b) = stack((b - 1) * npix + p) - mean(b)
+          enddo
+          dist = 0.0
+          do b = 1, nb
+             do k = 1, nb
+                dist = dist + diff(k) * icov(k, b) * diff(b)
+             enddo
+          enddo
+          mask(p) = 0
+          if (dist .le. limit * limit) mask(p) = 1
+       enddo
+
+    END SUBROUTINE mahalanobis_float
+
+    SUBROUTINE band_limits_dfloat(stack, mask, npix, nb, lower, upper)
+       IMPLICIT NONE
+
+       INTEGER*8 :: npix, nb, p, b
+       REAL*8, DIMENSION(npix * nb), INTENT(IN) :: stack
+       !f2py depend(npix, nb), stack
+       INTEGER*1, DIMENSION(npix), INTENT(INOUT) :: mask
+       !f2py depend(npix), mask
+       REAL*8, DIMENSION(nb), INTENT(IN) :: lower, upper
+       !f2py depend(nb), lower, upper
+       !f2py threadsafe
+
+       ! stack is a C ordered (bands, rows, cols) array, so band b of
+       ! pixel p is located at (b - 1) * npix + p
+       do p = 1, npix
+          mask(p) = 1
+          do b = 1, nb
+             if ((stack((b - 1) * npix + p) .lt. lower(b)) .or. &
+                 (stack((b - 1) * npix + p) .gt. upper(b))) then
+                mask(p) = 0
+                exit
+             endif
+          enddo
+       enddo
+
+    END SUBROUTINE band_limits_dfloat
+
+    SUBROUTINE mahalanobis_dfloat(stack, mask, npix, nb, mean, icov, limit)
+       IMPLICIT NONE
+
+       INTEGER*8 :: npix, nb, p, b, k
+       REAL*8, DIMENSION(npix * nb), INTENT(IN) :: stack
+       !f2py depend(npix, nb), stack
+       INTEGER*1, DIMENSION(npix), INTENT(INOUT) :: mask
+       !f2py depend(npix), mask
+       REAL*8, DIMENSION(nb), INTENT(IN) :: mean
+       !f2py depend(nb), mean
+       REAL*8, DIMENSION(nb, nb), INTENT(IN) :: icov
+       !f2py depend(nb), icov
+       REAL*8 :: limit, dist
+       REAL*8, DIMENSION(nb) :: diff
+       !f2py threadsafe
+
+       ! The squared distance is evaluated for every pixel in a single
+       ! pass over the stack; icov is symmetric so its ordering is moot
+       do p = 1, npix
+          do b = 1, nb
+             diff(b) = stack((b - 1) * npix + p) - mean(b)
+          enddo
+          dist = 0.0
+          do b = 1, nb
+             do k = 1, nb
+                dist = dist + diff(k) * icov(k, b) * diff(b)
+             enddo
+          enddo
+          mask(p) = 0
+          if (dist .le. limit * limit) mask(p) = 1
+       enddo
+
+    END SUBROUTINE mahalanobis_dfloat
+END MODULE idl_region_grow
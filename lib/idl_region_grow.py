@@ -3,14 +3,24 @@
 from __future__ import print_function
 from __future__ import absolute_import
 import numpy
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 from scipy import ndimage
 from idl_functions import histogram
 from idl_functions import array_indices
 from idl_functions import label_region
+from idl_functions import ReverseIndices
+from idl_functions.idl_histogram import _strided_buffer
+try:
+    import _idl_region_grow
+except ImportError:
+    _idl_region_grow = None
 
 
 def region_grow(array, roipixels, stddev_multiplier=None, all_neighbors=False,
-                threshold=None):
+                threshold=None, method='label', iterate=False,
+                max_iterations=100, statistics=False, mahalanobis=False,
+                output='coords', out=None):
     """
     Grows an roi (Region of Interest) for a given array.
 
@@ -20,11 +30,13 @@ def region_grow(array, roipixels, stddev_multiplier=None, all_neighbors=False,
     connected pixels. 
 
     :param array:
-        A single 2D numpy array.
+        A single 2D numpy array, or a 3D numpy array of shape
+        (bands, rows, cols) such as an RGB or multispectral stack.
 
     :param roipixels:
         A tuple containing a the location of a single pixel, or
         multiple pixel locations.
+        For a 3D array these are the (y,x) locations within a band.
 
     :param stddev_multiplier:
         A value containing the standard deviation multiplier that
@@ -36,10 +48,60 @@ def region_grow(array, roipixels, stddev_multiplier=None, all_neighbors=False,
         If set to True, then all 8 neighbours will be used to search
         for connectivity. Defaults to False
         (only the 4 immediate neighbours are used for connectivity).
+
+    :param threshold:
+        (Optional) A list or tuple of [min, max] defining the lower and
+        upper threshold limits. Takes precedence over stddev_multiplier.
+        For a 3D array, either a single [min, max] applied to every band
+        or a [min, max] for each band, i.e. of shape (bands, 2).
+        A pixel is accepted if every band lies within its limits.
+
+    :param method:
+        The engine used to grow the region. Default is 'label', which
+        thresholds and labels the entire array and retains the segments
+        touching the roi. 'flood' grows outwards from the roi pixels
+        only, so the cost scales with the size of the grown region
+        rather than the size of the array. Both yield the same region.
+
+    :param iterate:
+        If set to True (Default is False), then the region mean and
+        standard deviation are recomputed after each growth step, and
+        the region is grown again using the updated limits, until the
+        region no longer changes. Requires stddev_multiplier, and
+        always uses the flood engine. The region never shrinks.
+
+    :param max_iterations:
+        The maximum number of growth steps when iterate is set.
+        Default is 100.
+
+    :param statistics:
+        If set to True (Default is False), then a dictionary containing
+        the final region 'mean', 'stddev' and the number of
+        'iterations' is also returned. Only used when iterate is set.
+
+    :param mahalanobis:
+        If set to True (Default is False), then for a 3D array, a pixel
+        is accepted if its Mahalanobis distance from the roi mean vector,
+        using the roi covariance, is <= stddev_multiplier. Otherwise
+        the per band limits of the roi are used.
+
+    :param output:
+        The form of the returned region. 'coords' (Default) returns a
+        tuple of (y,x) co-ordinates, 'flat' returns a 1D numpy array
+        of the flat (1D) indices of the region in ascending order, and
+        'mask' returns a 2D boolean array flagging the region pixels.
+
+    :param out:
+        (Optional) A C contiguous 2D bool, uint8 or int8 array with the
+        same (y,x) dimensions as array, that the region is written into
+        when output is 'mask'. It is zeroed first. The flood engine
+        writes into it directly.
  
     :return:
         A tuple of (y,x) 1D numpy arrays containing image co-ordinates
-        of the grown regions.
+        of the grown regions, or the flat indices or mask as specified
+        by output. If iterate and statistics are set, then a tuple of
+        (region, dictionary) is returned.
 
     Example:
 
@@ -62,6 +124,12 @@ def region_grow(array, roipixels, stddev_multiplier=None, all_neighbors=False,
                      REGION_GROW.
        * 27/12/2013: Changed roi keyword to roipixels to bring into
                      line with the keyword used by IDL.
+       * 19/10/2026: Added the method keyword and the flood engine.
+       * 19/10/2026: Added the iterate, max_iterations and statistics
+                     keywords.
+       * 19/10/2026: Added support for multi-band arrays and the
+                     mahalanobis keyword.
+       * 19/10/2026: Added the output and out keywords.
 
     :copyright:
         Copyright (c) 2014, Josh Sixsmith
@@ -93,51 +161,209 @@ def region_grow(array, roipixels, stddev_multiplier=None, all_neighbors=False,
 
     """
 
-    def case_one(array=None, roi=None, threshold=None, stddev_multiplier=None):
-        """
-        Calculates the upper and lower thresholds based on an roi of array.
-        """
-        upper = numpy.max(array[roi])
-        lower = numpy.min(array[roi])
+    if (len(array.shape) not in (2, 3)):
+        raise ValueError('Input array needs to be 2D or 3D in shape!')
 
-        return (upper,lower)
+    _check_roi(roipixels)
 
-    def case_two(array=None, roi=None, threshold=None, stddev_multiplier=None):
-        """
-        No calculation, simply returns the upper and lower thresholds
-        based on given threshold paramater.
-        """
-        upper = threshold[1]
-        lower = threshold[0]
+    if (type(all_neighbors) != bool):
+        raise TypeError('all_neighbors keyword must be of type bool!')
 
-        return (upper,lower)
+    if method not in ('label', 'flood'):
+        raise ValueError("method must be one of 'label' or 'flood'!")
 
-    def case_three(array=None, roi=None, threshold=None,
-                   stddev_multiplier=None):
-        """
-        Calculates the upper and lower thresholds via the roi of an
-        array and a standard deviation multiplier.
-        """
+    if (len(array.shape) == 3):
+        if iterate:
+            raise ValueError('iterate is not supported for a 3D array!')
 
-        # For the case of a single pixel roi, the standard deviation would be
-        # undefined.
-        # So set the mean to equal the pixel value and stdv to 0.0
-        if (roi[0].shape == 1):
-            mean = array[roi]
-            stdv = 0.0
-        else:
-            stdv  = numpy.std(array[roi], ddof=1) # Sample standard deviation
-            limit = stddev_multiplier * stdv
-            mean  = numpy.mean(array[roi])
+        # Reduce the stack to a 2D mask of the accepted pixels, and grow
+        # the region over the mask
+        array = _band_mask(array, roipixels, threshold=threshold,
+                           stddev_multiplier=stddev_multiplier,
+                           mahalanobis=mahalanobis)
+        threshold = [1, 1]
+        stddev_multiplier = None
+    elif mahalanobis:
+        raise ValueError('mahalanobis requires a 3D array!')
 
-        upper = mean + limit
-        lower = mean - limit
+    # Get the array dimensions
+    dims = array.shape
+
+    mask = _check_output(dims, output, out)
+
+    if iterate:
+        if (stddev_multiplier is None) | (threshold is not None):
+            msg = "iterate requires stddev_multiplier, and not threshold!"
+            raise ValueError(msg)
+        if (max_iterations < 1):
+            raise ValueError('max_iterations must be at least 1!')
+
+        grown = _iterate_grow(array, roipixels, stddev_multiplier,
+                              all_neighbors, max_iterations, mask=mask)
+        idx, mask, mean, stdv, iterations = grown
+        idx = _output(dims, idx, output, mask, out)
+
+        if statistics:
+            stats = {'mean': mean,
+                     'stddev': stdv,
+                     'iterations': iterations}
+            return idx, stats
+
+        return idx
+
+    # Get the upper and lower limits to generate the mask
+    upper, lower = _limits(array, roipixels, threshold=threshold,
+                           stddev_multiplier=stddev_multiplier)
+
+    if (method == 'flood'):
+        idx, mask = _flood_fill(array, roipixels, lower, upper,
+                                all_neighbors=all_neighbors, mask=mask)
+    else:
+        idx = _label_grow(array, [roipixels], lower, upper,
+                          all_neighbors=all_neighbors)[0]
+        mask = None
+
+    return _output(dims, idx, output, mask, out)
+
+
+def region_grow_batch(array, roipixels, stddev_multiplier=None,
+                      all_neighbors=False, threshold=None, method='label',
+                      nthreads=None, output='coords'):
+    """
+    Grows many independent rois (Regions of Interest) for a given array.
 
-        return (upper,lower)
+    Equivalent to calling region_grow for each roi, except that the
+    threshold mask, label array and reverse indices are computed only
+    once for all rois sharing the same threshold limits, and the
+    distinct masks are processed in parallel.
 
+    :param array:
+        A single 2D numpy array.
+
+    :param roipixels:
+        A list of rois, each a tuple of (y,x) 1D numpy arrays as
+        accepted by region_grow.
+
+    :param stddev_multiplier:
+        (Optional) A single standard deviation multiplier applied to
+        every roi, or a list containing a multiplier (or None) for
+        each roi.
+
+    :param all_neighbors:
+        If set to True, then all 8 neighbours will be used to search
+        for connectivity. Defaults to False.
+
+    :param threshold:
+        (Optional) A single [min, max] applied to every roi, or a list
+        containing a [min, max] (or None) for each roi. Takes precedence
+        over stddev_multiplier.
+
+    :param method:
+        The engine used to grow the regions; 'label' (Default) or
+        'flood'. See region_grow.
+
+    :param nthreads:
+        The number of threads used to process the distinct masks (or
+        rois when method is 'flood'). Defaults to the number of CPUs.
+
+    :param output:
+        The form of each returned region; 'coords' (Default), 'flat' or
+        'mask'. See region_grow.
+
+    :return:
+        A list containing, for each roi, a tuple of (y,x) 1D numpy
+        arrays of the image co-ordinates of the grown region, or the
+        flat indices or mask as specified by output.
+
+    Example:
+
+        >>> array = numpy.random.randint(0,256, (100,100))
+        >>> rois = [(numpy.array([10]), numpy.array([10])),
+        ...         (numpy.array([50]), numpy.array([50]))]
+        >>> grown = region_grow_batch(array, rois, threshold=[100, 200])
+        >>> grown_a, grown_b = grown
+
+    :history:
+       * 19/10/2026: Created.
+    """
     if (len(array.shape) != 2):
         raise ValueError('Input array needs to be 2D in shape!')
 
+    if not ((type(roipixels) == list) | (type(roipixels) == tuple)):
+        raise TypeError('Roipixels must be a list of rois!')
+
+    for roi in roipixels:
+        _check_roi(roi)
+
+    if (type(all_neighbors) != bool):
+        raise TypeError('all_neighbors keyword must be of type bool!')
+
+    if method not in ('label', 'flood'):
+        raise ValueError("method must be one of 'label' or 'flood'!")
+
+    nroi = len(roipixels)
+
+    # Expand single threshold rules to one per roi
+    if (threshold is None) or numpy.isscalar(threshold[0]):
+        threshold = [threshold] * nroi
+    if not ((type(stddev_multiplier) == list) |
+            (type(stddev_multiplier) == tuple)):
+        stddev_multiplier = [stddev_multiplier] * nroi
+
+    if (len(threshold) != nroi) | (len(stddev_multiplier) != nroi):
+        msg = ("A per roi threshold or stddev_multiplier must contain an "
+               "entry for each roi!")
+        raise ValueError(msg)
+
+    dims = array.shape
+
+    _check_output(dims, output, None)
+
+    if nthreads is None:
+        nthreads = cpu_count()
+
+    limits = [_limits(array, roi, threshold=thresh, stddev_multiplier=mult)
+              for roi, thresh, mult in zip(roipixels, threshold,
+                                           stddev_multiplier)]
+
+    pool = ThreadPool(nthreads)
+
+    if (method == 'flood'):
+        def grow(i):
+            upper, lower = limits[i]
+            return _flood_fill(array, roipixels[i], lower, upper,
+                               all_neighbors=all_neighbors)
+
+        grown = pool.map(grow, range(nroi))
+    else:
+        # Group the rois sharing the same limits, so that each distinct mask
+        # is thresholded, labelled and histogrammed only once
+        groups = {}
+        for i, lim in enumerate(limits):
+            groups.setdefault(lim, []).append(i)
+        groups = list(groups.items())
+
+        def grow(group):
+            (upper, lower), members = group
+            rois = [roipixels[i] for i in members]
+            return _label_grow(array, rois, lower, upper,
+                               all_neighbors=all_neighbors)
+
+        grown = [None] * nroi
+        for (lim, members), idxs in zip(groups, pool.map(grow, groups)):
+            for i, idx in zip(members, idxs):
+                grown[i] = (idx, None)
+
+    pool.close()
+    pool.join()
+
+    return [_output(dims, idx, output, mask) for idx, mask in grown]
+
+
+def _check_roi(roipixels):
+    """
+    Checks that roipixels is a (ndarray,ndarray) or [ndarray,ndarray].
+    """
     if not ((type(roipixels) == list) | (type(roipixels) == tuple)):
         msg = ("Roipixels must be of type tuple or type list containing "
                "(ndarray,ndarray) or [ndarray,ndarray]!")
@@ -151,12 +377,61 @@ def region_grow(array, roipixels, stddev_multiplier=None, all_neighbors=False,
     if (len(roipixels) != 2):
         raise ValueError('Roipixels must be of length 2!')
 
-    if (type(all_neighbors) != bool):
-        raise TypeError('all_neighbors keyword must be of type bool!')
 
-    case_of = {'1': case_one,
-               '2': case_two,
-               '3': case_three}
+def _case_one(array=None, roi=None, threshold=None, stddev_multiplier=None):
+    """
+    Calculates the upper and lower thresholds based on an roi of array.
+    """
+    upper = numpy.max(array[roi])
+    lower = numpy.min(array[roi])
+
+    return (upper,lower)
+
+
+def _case_two(array=None, roi=None, threshold=None, stddev_multiplier=None):
+    """
+    No calculation, simply returns the upper and lower thresholds
+    based on given threshold paramater.
+    """
+    upper = threshold[1]
+    lower = threshold[0]
+
+    return (upper,lower)
+
+
+def _case_three(array=None, roi=None, threshold=None,
+                stddev_multiplier=None):
+    """
+    Calculates the upper and lower thresholds via the roi of an
+    array and a standard deviation multiplier.
+    """
+
+    # For the case of a single pixel roi, the standard deviation would be
+    # undefined.
+    # So set the mean to equal the pixel value and stdv to 0.0
+    if (roi[0].shape[0] == 1):
+        mean = array[roi][0]
+        stdv = 0.0
+    else:
+        stdv  = numpy.std(array[roi], ddof=1) # Sample standard deviation
+        mean  = numpy.mean(array[roi])
+
+    limit = stddev_multiplier * stdv
+
+    upper = mean + limit
+    lower = mean - limit
+
+    return (upper,lower)
+
+
+def _limits(array, roipixels, threshold=None, stddev_multiplier=None):
+    """
+    Determines which threshold rule applies, and returns the
+    (upper, lower) limits for an roi of array.
+    """
+    case_of = {'1': _case_one,
+               '2': _case_two,
+               '3': _case_three}
 
     if (stddev_multiplier is None) & (threshold is None):
         case = '1'
@@ -174,40 +449,375 @@ def region_grow(array, roipixels, stddev_multiplier=None, all_neighbors=False,
     else:
         case = '3'
 
-    # Get the array dimensions
-    dims = array.shape
+    return case_of[case](array, roipixels, threshold=threshold,
+                         stddev_multiplier=stddev_multiplier)
 
-    # Create the index list
-    idx = []
 
-    # Get the upper and lower limits to generate the mask
-    upper, lower = case_of[case](array, roipixels, threshold=threshold,
-                                 stddev_multiplier=stddev_multiplier)
+def _band_mask(stack, roipixels, threshold=None, stddev_multiplier=None,
+               mahalanobis=False):
+    """
+    Evaluates the limits for each pixel of a (bands, rows, cols) stack
+    in a single compiled pass, returning an int8 mask of shape
+    (rows, cols) flagging the accepted pixels.
+    """
+    kernels = _kernels()
+    get_limits = {'int8': kernels.band_limits_int,
+                  'uint8': kernels.band_limits_int,
+                  'int16': kernels.band_limits_int,
+                  'uint16': kernels.band_limits_long,
+                  'int32': kernels.band_limits_long,
+                  'uint32': kernels.band_limits_dlong,
+                  'int64': kernels.band_limits_dlong,
+                  'uint64': kernels.band_limits_dlong,
+                  'float32': kernels.band_limits_float,
+                  'float64': kernels.band_limits_dfloat}
+
+    get_dist = {'int8': kernels.mahalanobis_int,
+                'uint8': kernels.mahalanobis_int,
+                'int16': kernels.mahalanobis_int,
+                'uint16': kernels.mahalanobis_long,
+                'int32': kernels.mahalanobis_long,
+                'uint32': kernels.mahalanobis_dlong,
+                'int64': kernels.mahalanobis_dlong,
+                'uint64': kernels.mahalanobis_dlong,
+                'float32': kernels.mahalanobis_float,
+                'float64': kernels.mahalanobis_dfloat}
+
+    if stack.dtype.name not in get_limits:
+        msg = ("Error. Incompatable Data Type. Compatable Data Types Include: "
+               "int8, uint8, int16, uint16, int32, uint32, int64, uint64, "
+               "float32, float64")
+        raise TypeError(msg)
+
+    nb, rows, cols = stack.shape
+    npix = rows * cols
+    mask = numpy.zeros((rows, cols), dtype='int8')
+
+    # The roi pixels of every band, as (bands, npixels)
+    roi = stack[:, roipixels[0], roipixels[1]].astype('float64')
+
+    if mahalanobis:
+        if (stddev_multiplier is None) | (threshold is not None):
+            msg = "mahalanobis requires stddev_multiplier, and not threshold!"
+            raise ValueError(msg)
+        if (roi.shape[1] < 2):
+            raise ValueError('mahalanobis requires at least 2 roi pixels!')
+
+        mean = roi.mean(axis=1)
+        icov = numpy.linalg.pinv(numpy.atleast_2d(numpy.cov(roi, ddof=1)))
+        get_dist[stack.dtype.name](stack.ravel(), mask.ravel(), npix, nb,
+                                   mean, icov, stddev_multiplier)
+
+        return mask
+
+    if (threshold is not None):
+        threshold = numpy.array(threshold, dtype='float64')
+        if (threshold.shape == (2,)):
+            threshold = numpy.tile(threshold, (nb, 1))
+        if (threshold.shape != (nb, 2)):
+            msg = ("Threshold must be of length 2: [Min,Max], or contain "
+                   "a [Min,Max] for each band!!!")
+            raise ValueError(msg)
+        if (stddev_multiplier is not None):
+            msg = ("Warning!!! Both stddev_multiplier and threshold "
+                   "parameters are set. Using threshold.")
+            print(msg)
+        lower = threshold[:, 0]
+        upper = threshold[:, 1]
+    elif (stddev_multiplier is not None):
+        mean = roi.mean(axis=1)
+        if (roi.shape[1] == 1):
+            stdv = numpy.zeros(nb)
+        else:
+            stdv = roi.std(axis=1, ddof=1)
+        lower = mean - stddev_multiplier * stdv
+        upper = mean + stddev_multiplier * stdv
+    else:
+        lower = roi.min(axis=1)
+        upper = roi.max(axis=1)
+
+    get_limits[stack.dtype.name](stack.ravel(), mask.ravel(), npix, nb,
+                                 lower, upper)
 
+    return mask
+
+
+def _label_grow(array, rois, lower, upper, all_neighbors=False):
+    """
+    Thresholds and labels array once, and returns a list containing the
+    (ordered) flat indices of the segments touching each roi.
+    """
     # Create the mask via the thresholds
     mask = (array >= lower) & (array <= upper)
 
     # The label function segments the image into contiguous blobs
     label_array = label_region(mask, all_neighbors=all_neighbors)
 
-    # Find the labels associated with the roi
-    labels = label_array[roipixels]
-    mx_lab = numpy.max(labels)
+    # Find the labels associated with each roi
+    labels = [label_array[roi] for roi in rois]
+    mx_lab = max([numpy.max(lab) for lab in labels])
 
     # Find unique labels, excluding zero (background)
-    ulabels = (numpy.unique(labels[labels > 0])).tolist()
+    touching = [numpy.unique(lab[lab > 0]) for lab in labels]
+
+    # Generate a histogram to find the label locations, recording the
+    # reverse indices of the labels touching the rois only
+    h = histogram(label_array, minv=0, maxv=mx_lab, reverse_indices='ri',
+                  ri_bins=numpy.concatenate(touching))
+    ri = ReverseIndices(h['ri'])
+
+    # The indices of each label are in ascending order, whereas those of
+    # several labels are concatenated label by label
+    result = [ri.bins(lab) if (lab.shape[0] <= 1) else
+              numpy.sort(ri.bins(lab)) for lab in touching]
+
+    return result
+
+
+def _check_output(dims, output, out):
+    """
+    Checks the output and out keywords. Returns an int8 view of out
+    (zeroed) for the flood engine to write into, or None.
+    """
+    if output not in ('coords', 'flat', 'mask'):
+        raise ValueError("output must be one of 'coords', 'flat' or 'mask'!")
 
-    # Generate a histogram to find the label locations
-    h = histogram(label_array, minv=0, maxv=mx_lab, reverse_indices='ri')
-    hist = h['histogram']
-    ri = h['ri']
+    if out is None:
+        return None
 
-    for lab in ulabels:
-        if hist[lab] == 0:
-            continue
-        idx.extend(ri[ri[lab]:ri[lab+1]])
+    if (output != 'mask'):
+        raise ValueError("out can only be used when output is 'mask'!")
 
-    idx = numpy.array(idx)
-    idx = array_indices(dims, idx, dimensions=True)
+    if (type(out) != numpy.ndarray):
+        raise TypeError('out must be of type ndarray!')
+
+    if out.dtype.name not in ('bool', 'uint8', 'int8'):
+        raise TypeError('out must be of type bool, uint8 or int8!')
+
+    if (out.shape != dims) | (not out.flags.c_contiguous):
+        msg = "out must be C contiguous with the same dimensions as array!"
+        raise ValueError(msg)
+
+    out[...] = 0
+
+    return out.view('int8')
+
+
+def _output(dims, idx, output, mask=None, out=None):
+    """
+    Returns the grown region as co-ordinates, ordered flat indices or
+    a mask. mask is the int8 region mask from the flood engine, if
+    available, and out the caller's array it may be a view of.
+    """
+    if (output == 'mask'):
+        if mask is not None:
+            # The flood engine has already written the region (into out
+            # if it was given)
+            if out is None:
+                out = mask.view('bool')
+        else:
+            if out is None:
+                out = numpy.zeros(dims, dtype='bool')
+            out.ravel()[idx] = 1
+
+        return out
+
+    # The flood engine yields the region in the order it was grown
+    if mask is not None:
+        idx = numpy.sort(idx)
+
+    if (output == 'flat'):
+        return idx
+
+    return _coordinates(dims, idx)
+
+
+def _coordinates(dims, idx):
+    """
+    Converts the flat indices of a grown region to (y,x) co-ordinates.
+    """
+    if (idx.shape[0] == 0):
+        return (idx.copy(), idx.copy())
+
+    return array_indices(dims, idx, dimensions=True)
+
+def _flood_fill(array, roipixels, lower, upper, all_neighbors=False,
+                mask=None):
+    """
+    Grows a region outwards from the roi pixels of a 2D array, accepting
+    connected pixels whose values lie within [lower, upper].
+
+    Only the grown region and its immediate border are visited, so the
+    cost is proportional to the size of the region rather than the array.
+
+    :param array:
+        A single 2D numpy array.
+
+    :param roipixels:
+        A tuple of (y,x) 1D numpy arrays containing the seed locations.
+        Seeds whose values lie outside the limits are ignored.
+
+    :param lower:
+        The lower threshold limit (inclusive).
+
+    :param upper:
+        The upper threshold limit (inclusive).
+
+    :param all_neighbors:
+        If set to True, then all 8 neighbours will be used to search
+        for connectivity. Defaults to False.
+
+    :param mask:
+        (Optional) An int8 array of the same shape as array flagging
+        pixels (value 1) already belonging to the region. It is updated
+        in place. If None, then a new mask is created.
+
+    :return:
+        A tuple of (idx, mask), where idx is a 1D numpy array of the
+        (unordered) flat indices of the grown region, and mask is the
+        int8 array flagging the region pixels.
+    """
+    if mask is None:
+        mask = numpy.zeros(array.shape, dtype='int8')
+
+    # The queue is only ever touched up to the size of the region
+    queue = numpy.empty(array.size, dtype='int64')
+    nseeds = _seed(array, roipixels, lower, upper, mask, queue)
+
+    nregion = _fill(array, mask, queue, nseeds, lower, upper,
+                    all_neighbors=all_neighbors)
+
+    return queue[0:nregion], mask
+
+
+def _seed(array, roipixels, lower, upper, mask, queue):
+    """
+    Flags the roi pixels satisfying the limits, and not already within
+    the region, in mask and writes them to the start of queue.
+    Returns the number of seeds.
+    """
+    seeds = roipixels[0] * array.shape[1] + roipixels[1]
+    values = array[roipixels]
+    seeds = numpy.unique(seeds[(values >= lower) & (values <= upper)])
+    seeds = seeds[mask.ravel()[seeds] == 0]
+    mask.ravel()[seeds] = 1
+    queue[0:seeds.shape[0]] = seeds
+
+    return seeds.shape[0]
+
+
+def _fill(array, mask, queue, nseeds, lower, upper, all_neighbors=False):
+    """
+    Expands the region from the first nseeds pixels held in queue,
+    appending each accepted pixel to queue and flagging it in mask.
+    Returns the number of region pixels held in queue.
+    """
+    names = ('int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32', 'int64',
+             'uint64', 'float32', 'float64')
+    name = array.dtype.name
+    if name not in names:
+        msg = ("Error. Incompatable Data Type. Compatable Data Types Include: "
+               "int8, uint8, int16, uint16, int32, uint32, int64, uint64, "
+               "float32, float64")
+        raise TypeError(msg)
+
+    # The kernels read array in place, with unsigned types viewed as signed
+    buf = _strided_buffer(array)
+    if buf is None:
+        array = numpy.ascontiguousarray(array)
+        buf = _strided_buffer(array)
+    rstride, cstride = [s // array.dtype.itemsize for s in array.strides]
+
+    func = getattr(_kernels(), 'flood_fill_' + name)
+    nregion = func(buf, mask.ravel(), queue, buf.shape[0], array.size,
+                   array.shape[1], rstride, cstride, nseeds, lower, upper,
+                   int(all_neighbors))
+
+    return nregion
+
+
+def _iterate_grow(array, roipixels, stddev_multiplier, all_neighbors=False,
+                  max_iterations=100, mask=None):
+    """
+    Grows a region via the stddev multiplier, updating the region
+    mean and standard deviation after each growth step until the
+    region (and hence its statistics) no longer changes, or
+    max_iterations is reached.
+
+    The region never shrinks, so the statistics are maintained as a
+    running mean and sum of squared deviations, combining those of the
+    newly grown pixels at each step (Chan et al., 1979). This avoids the
+    cancellation of raw sums for data with a large offset.
+
+    Returns a tuple of (idx, mask, mean, stddev, iterations).
+    """
+    # Initial limits are derived from the roi, as per region_grow
+    upper, lower = _case_three(array, roipixels,
+                               stddev_multiplier=stddev_multiplier)
+
+    if mask is None:
+        mask = numpy.zeros(array.shape, dtype='int8')
+    queue = numpy.empty(array.size, dtype='int64')
+    nseeds = _seed(array, roipixels, lower, upper, mask, queue)
+
+    count = 0
+    mean = numpy.nan
+    m2 = 0.0
+    nregion = 0
+    stdv = numpy.nan
+    iterations = 0
+
+    while (iterations < max_iterations):
+        nnew = _fill(array, mask, queue, max(nseeds, nregion), lower, upper,
+                     all_neighbors=all_neighbors)
+        iterations += 1
+
+        # Combine the statistics of the newly grown pixels only
+        new = array.ravel()[queue[nregion:nnew]].astype('float64')
+        grown = nnew - nregion
+        nregion = nnew
+
+        if (grown != 0):
+            new_mean = new.mean()
+            new -= new_mean
+            new_m2 = numpy.dot(new, new)
+            if (count == 0):
+                mean = new_mean
+                m2 = new_m2
+            else:
+                delta = new_mean - mean
+                total = count + grown
+                mean += delta * grown / total
+                m2 += new_m2 + delta * delta * count * grown / total
+            count += grown
+
+        if (count == 0):
+            break
+
+        if (count > 1):
+            stdv = numpy.sqrt(m2 / (count - 1))
+        else:
+            stdv = 0.0
+
+        # No new pixels means the statistics are unchanged
+        if (grown == 0):
+            break
+
+        limit = stddev_multiplier * stdv
+        upper = mean + limit
+        lower = mean - limit
+
+    return queue[0:nregion], mask, mean, stdv, iterations
+
+
+def _kernels():
+    """
+    Returns the compiled kernels, which the flood fill and multi-band
+    paths require.
+    """
+    if _idl_region_grow is None:
+        msg = ("Error. The compiled _idl_region_grow extension is "
+               "unavailable. Use method='label' with a 2D array.")
+        raise ImportError(msg)
 
-    return idx
+    return _idl_region_grow.idl_region_grow
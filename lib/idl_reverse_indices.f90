@@ -0,0 +1,169 @@
+MODULE idl_reverse_indices
+    IMPLICIT NONE
+    ! Author: Josh Sixsmith, josh.sixsmith@gmail.com
+    !
+    ! Copyright
+    !
+    ! Copyright (c) 2014, Josh Sixsmith
+    ! All rights reserved.
+
+    ! Redistribution and use in source and binary forms, with or without
+    ! modification, are permitted provided that the following conditions are met:
+
+    ! 1. Redistributions of source code must retain the above copyright notice, this
+    !    list of conditions and the following disclaimer. 
+    ! 2. Redistributions in binary form must reproduce the above copyright notice,
+    !    this list of conditions and the following disclaimer in the documentation
+    !    and/or other materials provided with the distribution. 
+
+    ! THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+    ! ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+    ! WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+    ! DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+    ! ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+    ! (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+    ! LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+    ! ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+    ! (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+    ! SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+    ! The views and conclusions contained in the software and documentation are those
+    ! of the authors and should not be interpreted as representing official policies, 
+    ! either expressed or implied, of the FreeBSD Project.
+    !
+
+CONTAINS
+
+    ! Reverse indices compressed per bin. The indices of each bin are
+    ! ascending, so they are stored as the differences from the previous
+    ! index of the bin (the first relative to -1), each difference being
+    ! a variable length integer of 7 bits per byte, the high bit flagging
+    ! that another byte follows.
+
+    SUBROUTINE bin_bytes(ri, last, sizes, nbins, ri_sz, base)
+       IMPLICIT NONE
+
+       INTEGER*8 :: nbins, ri_sz, base, b, k, s, e, g, d
+       INTEGER*4, DIMENSION(ri_sz), INTENT(IN) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(nbins), INTENT(INOUT) :: last
+       !f2py depend(nbins), last
+
+       INTEGER*8, DIMENSION(nbins), INTENT(INOUT) :: sizes
+       !f2py depend(nbins), sizes
+
+       INTEGER*8, PARAMETER :: M = 4294967295_8
+       !f2py threadsafe
+
+       ! Adds the number of bytes that encode_chunk will write for each
+       ! bin of a chunk, whose indices are relative to base, to sizes.
+       ! last holds the last index of each bin within the previous chunks.
+       do b = 1, nbins
+          s = iand(int(ri(b), 8), M)
+          e = iand(int(ri(b+1), 8), M)
+          do k = s + 1, e
+             g = base + iand(int(ri(k), 8), M)
+             d = ishft(g - last(b), -7)
+             last(b) = g
+             sizes(b) = sizes(b) + 1
+             do while (d .gt. 0)
+                sizes(b) = sizes(b) + 1
+                d = ishft(d, -7)
+             enddo
+          enddo
+       enddo
+
+    END SUBROUTINE bin_bytes
+
+    SUBROUTINE encode_chunk(ri, last, buf, pos, nbins, ri_sz, nbuf, base)
+       IMPLICIT NONE
+
+       INTEGER*8 :: nbins, ri_sz, nbuf, base, b, k, s, e, g, d, p
+       INTEGER*4, DIMENSION(ri_sz), INTENT(IN) :: ri
+       !f2py depend(ri_sz), ri
+
+       INTEGER*8, DIMENSION(nbins), INTENT(INOUT) :: last
+       !f2py depend(nbins), last
+
+       INTEGER*1, DIMENSION(nbuf), INTENT(INOUT) :: buf
+       !f2py depend(nbuf), buf
+
+       INTEGER*8, DIMENSION(nbins), INTENT(INOUT) :: pos
+       !f2py depend(nbins), pos
+
+       INTEGER*8, PARAMETER :: M = 4294967295_8
+       !f2py threadsafe
+
+       ! Encodes the reverse indices of a chunk of the data, whose
+       ! indices are relative to base, appending the bytes of each bin to
+       ! those of the bin within buf. pos is the current (0 based) end of
+       ! each bin within buf, and last holds the last index of each bin
+       ! within the previous chunks.
+       do b = 1, nbins
+          s = iand(int(ri(b), 8), M)
+          e = iand(int(ri(b+1), 8), M)
+          p = pos(b)
+          do k = s + 1, e
+             g = base + iand(int(ri(k), 8), M)
+             d = g - last(b)
+             last(b) = g
+             do while (d .ge. 128)
+                p = p + 1
+                buf(p) = int(iand(d, 127_8) - 128, 1)
+                d = ishft(d, -7)
+             enddo
+             p = p + 1
+             buf(p) = int(d, 1)
+          enddo
+          pos(b) = p
+       enddo
+
+    END SUBROUTINE encode_chunk
+
+    SUBROUTINE decode_bins(buf, offsets, hist, bins, out, nbuf, nbins, nb, nout)
+       IMPLICIT NONE
+
+       INTEGER*8 :: nbuf, nbins, nb, nout, j, k, o, p, g, d, sh, v
+       INTEGER*1, DIMENSION(nbuf), INTENT(IN) :: buf
+       !f2py depend(nbuf), buf
+
+       INTEGER*8, DIMENSION(nbins+1), INTENT(IN) :: offsets
+       !f2py depend(nbins), offsets
+
+       INTEGER*4, DIMENSION(nbins), INTENT(IN) :: hist
+       !f2py depend(nbins), hist
+
+       INTEGER*8, DIMENSION(nb), INTENT(IN) :: bins
+       !f2py depend(nb), bins
+
+       INTEGER*4, DIMENSION(nout), INTENT(INOUT) :: out
+       !f2py depend(nout), out
+       !f2py threadsafe
+
+       ! Decodes the indices of the given (0 based) bins, concatenated in
+       ! the order given. Indices beyond the int32 range are wrapped, as
+       ! out is uint32 within Python.
+       o = 0
+       do j = 1, nb
+          p = offsets(bins(j) + 1)
+          g = -1
+          do k = 1, iand(int(hist(bins(j) + 1), 8), 4294967295_8)
+             d = 0
+             sh = 0
+             do
+                p = p + 1
+                v = iand(int(buf(p), 8), 255_8)
+                d = ior(d, ishft(iand(v, 127_8), sh))
+                if (v .lt. 128) exit
+                sh = sh + 7
+             enddo
+             g = g + d
+             o = o + 1
+             out(o) = int(merge(g - 4294967296_8, g, g .ge. 2147483648_8), 4)
+          enddo
+       enddo
+
+    END SUBROUTINE decode_bins
+
+END MODULE idl_reverse_indices
@@ -0,0 +1,504 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import numpy
+from idl_functions import array_indices
+try:
+    import _idl_reverse_indices
+except ImportError:
+    _idl_reverse_indices = None
+
+
+class ReverseIndices(object):
+    """
+    A zero-copy wrapper of the reverse indices returned by histogram,
+    providing per-bin access without the ri[ri[i]:ri[i+1]] dance.
+
+    The first nbins + 1 elements of the reverse indices are the offsets
+    of each bin's indices, i.e. the indices of the data falling in bin i
+    are ri[ri[i]:ri[i+1]].
+
+    :param ri:
+        The 1D numpy array of reverse indices returned by histogram.
+
+    Example:
+
+        >>> h = histogram(data, reverse_indices='ri')
+        >>> ri = ReverseIndices(h['ri'])
+        >>> data_at_ith_bin = data[ri.bin(i)]
+        >>> data_at_bins_i_j = data[ri.bins([i, j])]
+        >>> for i, idx in ri:
+        ...     print(i, data[idx])
+        >>> # The (y,x) locations of the ith bin of a 2D array
+        >>> yx = ri.coords(i, array.shape)
+
+    :author:
+        Josh Sixsmith, josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au
+
+    :history:
+        * 19/10/2026: Created
+
+    :copyright:
+        Copyright (c) 2014, Josh Sixsmith
+        All rights reserved.
+
+        Redistribution and use in source and binary forms, with or without
+        modification, are permitted provided that the following conditions are met:
+
+        1. Redistributions of source code must retain the above copyright notice, this
+           list of conditions and the following disclaimer.
+        2. Redistributions in binary form must reproduce the above copyright notice,
+           this list of conditions and the following disclaimer in the documentation
+           and/or other materials provided with the distribution.
+
+        THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+        ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+        WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+        DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+        ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+        (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+        LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+        ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+        (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+        SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+        The views and conclusions contained in the software and documentation are those
+        of the authors and should not be interpreted as representing official policies,
+        either expressed or implied, of the FreeBSD Project.
+
+    """
+
+    def __init__(self, ri):
+        if (type(ri) != numpy.ndarray) or (ri.ndim != 1):
+            raise TypeError('Error. ri must be a 1D numpy array.')
+
+        self.ri = ri
+        self.nbins = int(ri[0]) - 1
+
+    def __len__(self):
+        return self.nbins
+
+    def __getitem__(self, item):
+        # Retain the behaviour of the raw reverse indices
+        return self.ri[item]
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.ri
+        return self.ri.astype(dtype)
+
+    def __iter__(self):
+        """
+        Iterates over the non-empty bins, yielding (bin, indices).
+        """
+        for i in self.nonempty():
+            yield i, self.ri[self.ri[i]:self.ri[i+1]]
+
+    @property
+    def offsets(self):
+        """
+        A view of the nbins + 1 offsets of each bin's indices.
+        """
+        return self.ri[0:self.nbins+1]
+
+    @property
+    def histogram(self):
+        """
+        The number of indices in each bin.
+        """
+        return numpy.diff(self.offsets)
+
+    def nonempty(self):
+        """
+        Returns a 1D numpy array of the bins containing indices.
+        """
+        return numpy.flatnonzero(self.histogram)
+
+    def bin(self, i):
+        """
+        Returns a view of the indices of the ith bin.
+        """
+        if (i < 0) | (i >= self.nbins):
+            raise IndexError('Error. Bin out of bounds!')
+
+        return self.ri[self.ri[i]:self.ri[i+1]]
+
+    def bins(self, bins):
+        """
+        Returns the indices of several bins, concatenated in the order
+        given. A view is returned for a run of consecutive ascending
+        bins, otherwise the indices are gathered in one vectorised step.
+        """
+        bins = numpy.atleast_1d(numpy.asarray(bins, dtype='int64')).ravel()
+
+        if (bins.shape[0] == 0):
+            return self.ri[0:0]
+
+        if ((bins.min() < 0) | (bins.max() >= self.nbins)):
+            raise IndexError('Error. Bin out of bounds!')
+
+        if ((bins.shape[0] == 1) or (numpy.diff(bins) == 1).all()):
+            return self.ri[self.ri[bins[0]]:self.ri[bins[-1]+1]]
+
+        starts = self.ri[bins].astype('int64')
+        counts = self.ri[bins + 1].astype('int64') - starts
+
+        # The position of each bin's indices within the concatenation
+        ends = numpy.cumsum(counts)
+        shift = numpy.repeat(starts - (ends - counts), counts)
+        idx = numpy.arange(ends[-1]) + shift
+
+        return self.ri[idx]
+
+    def coords(self, i, dims):
+        """
+        Returns the multi-dimensional subscripts of the indices of bin
+        i (or a list of bins) for an array of the given dimensions, via
+        array_indices.
+        """
+        if numpy.isscalar(i):
+            idx = self.bin(i)
+        else:
+            idx = self.bins(i)
+
+        return array_indices(dims, idx, dimensions=True)
+
+
+class CompressedReverseIndices(ReverseIndices):
+    """
+    The reverse indices returned by histogram, compressed per bin.
+    Provides the same per-bin access as ReverseIndices, each bin being
+    decompressed upon access, as well as the raw reverse indices via
+    indexing and numpy.asarray. Note that numpy.asarray decompresses
+    every bin, whereas bin_percentile decodes a group of bins at a time.
+
+    The indices of each bin are ascending, so they are stored as the
+    differences from the previous index of the bin, each difference
+    being a variable length integer of 7 bits per byte. Typically one or
+    two bytes per index, rather than the four of the raw uint32 indices.
+
+    :param ri:
+        The 1D numpy array of reverse indices returned by histogram.
+        Alternatively histogram(..., reverse_indices='ri', compress=True)
+        returns a CompressedReverseIndices without ever holding the raw
+        reverse indices of the entire array.
+
+    Example:
+
+        >>> h = histogram(data, reverse_indices='ri', compress=True)
+        >>> ri = h['ri']
+        >>> data_at_ith_bin = data[ri.bin(i)]
+        >>> data_at_ith_bin = data[ri[ri[i]:ri[i+1]]]
+        >>> ri.nbytes
+
+    :author:
+        Josh Sixsmith, josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au
+
+    :history:
+        * 19/10/2026: Created
+
+    :copyright:
+        Copyright (c) 2014, Josh Sixsmith
+        All rights reserved.
+
+        Redistribution and use in source and binary forms, with or without
+        modification, are permitted provided that the following conditions are met:
+
+        1. Redistributions of source code must retain the above copyright notice, this
+           list of conditions and the following disclaimer.
+        2. Redistributions in binary form must reproduce the above copyright notice,
+           this list of conditions and the following disclaimer in the documentation
+           and/or other materials provided with the distribution.
+
+        THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+        ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+        WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+        DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR CONTRIBUTORS BE LIABLE FOR
+        ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+        (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+        LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+        ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+        (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+        SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+        The views and conclusions contained in the software and documentation are those
+        of the authors and should not be interpreted as representing official policies,
+        either expressed or implied, of the FreeBSD Project.
+
+    """
+
+    def __init__(self, ri):
+        if (type(ri) != numpy.ndarray) or (ri.ndim != 1):
+            raise TypeError('Error. ri must be a 1D numpy array.')
+
+        nbins = int(ri[0]) - 1
+        self._encode(nbins, lambda: [(0, ri)])
+
+    @classmethod
+    def from_chunks(cls, nbins, chunks):
+        """
+        Compresses reverse indices computed over consecutive chunks of
+        the data. chunks is a function returning an iterable of
+        (base, ri); ri being the raw reverse indices of a chunk, whose
+        indices are relative to the position base of the chunk within
+        the data. It is called twice; once to size the bytes of each bin,
+        and once to encode the chunks in place, such that only a single
+        chunk is held at a time. A sequence of (base, ri) is also
+        accepted.
+        """
+        if not callable(chunks):
+            chunks = list(chunks)
+            source = lambda: chunks
+        else:
+            source = chunks
+
+        self = cls.__new__(cls)
+        self._encode(nbins, source)
+        return self
+
+    def _encode(self, nbins, chunks):
+        """
+        Sizes the bytes of each bin over every chunk, then encodes each
+        chunk in turn directly into the bytes of its bins.
+        """
+        last = numpy.full(nbins, -1, dtype='int64')
+        sizes = numpy.zeros(nbins, dtype='int64')
+        hist = numpy.zeros(nbins, dtype='uint32')
+        for base, ri in chunks():
+            ri = ri.view('int32')
+            if (ri.shape[0] == nbins + 1):
+                # No indices within the chunk
+                continue
+            _bin_bytes(ri, last, sizes, nbins, ri.shape[0], base)
+            hist += numpy.diff(ri[0:nbins+1]).astype('uint32')
+
+        offsets = numpy.zeros(nbins + 1, dtype='int64')
+        numpy.cumsum(sizes, out=offsets[1:])
+
+        data = numpy.empty(offsets[-1], dtype='uint8')
+        if (data.shape[0] != 0):
+            pos = offsets[0:nbins].copy()
+            last[:] = -1
+            for base, ri in chunks():
+                ri = ri.view('int32')
+                if (ri.shape[0] == nbins + 1):
+                    continue
+                _encode_chunk(ri, last, data, pos, nbins, ri.shape[0],
+                              data.shape[0], base)
+
+        self.nbins = nbins
+        self.data = data
+        self.byte_offsets = offsets
+        self._hist = hist
+        self._offsets = None
+
+    @property
+    def nbytes(self):
+        """
+        The number of bytes occupied by the compressed reverse indices.
+        """
+        return (self.data.nbytes + self.byte_offsets.nbytes +
+                self._hist.nbytes)
+
+    @property
+    def offsets(self):
+        """
+        The nbins + 1 offsets of each bin's indices within the raw
+        reverse indices.
+        """
+        if self._offsets is None:
+            offsets = numpy.zeros(self.nbins + 1, dtype='uint32')
+            numpy.cumsum(self._hist, out=offsets[1:])
+            offsets += self.nbins + 1
+            self._offsets = offsets
+        return self._offsets
+
+    @property
+    def histogram(self):
+        """
+        The number of indices in each bin.
+        """
+        return self._hist
+
+    def _decode(self, bins):
+        """
+        Decodes the indices of the given bins, concatenated in the order
+        given.
+        """
+        bins = numpy.asarray(bins, dtype='int64')
+        out = numpy.empty(numpy.sum(self._hist[bins], dtype='int64'),
+                          dtype='uint32')
+        if (out.shape[0] != 0):
+            _decode_bins(self.data, self.byte_offsets, self._hist, bins, out,
+                         self.data.shape[0], self.nbins, bins.shape[0],
+                         out.shape[0])
+        return out
+
+    def __getitem__(self, item):
+        # Retain the behaviour of the raw reverse indices, decompressing
+        # only the bins spanned by item
+        nbins = self.nbins
+        offsets = self.offsets
+        size = int(offsets[-1])
+
+        if isinstance(item, slice) and (item.step in (None, 1)):
+            start, stop, _ = item.indices(size)
+            stop = max(start, stop)
+            parts = [offsets[start:min(stop, nbins+1)]]
+            start = max(start, nbins + 1)
+            if (stop > start):
+                first = numpy.searchsorted(offsets, start, side='right') - 1
+                final = numpy.searchsorted(offsets, stop - 1, side='right') - 1
+                idx = self._decode(numpy.arange(first, final + 1))
+                begin = start - int(offsets[first])
+                parts.append(idx[begin:begin + stop - start])
+            return numpy.concatenate(parts)
+
+        if numpy.isscalar(item) and numpy.issubdtype(type(item), numpy.integer):
+            item = int(item)
+            if (item < 0):
+                item += size
+            if (item < 0) | (item >= size):
+                raise IndexError('Error. Index out of bounds!')
+            if (item <= nbins):
+                return offsets[item]
+            i = numpy.searchsorted(offsets, item, side='right') - 1
+            return self._decode([i])[item - int(offsets[i])]
+
+        return self.decompress()[item]
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.decompress()
+        return self.decompress().astype(dtype)
+
+    def __iter__(self):
+        """
+        Iterates over the non-empty bins, yielding (bin, indices).
+        """
+        for i in self.nonempty():
+            yield i, self._decode([i])
+
+    def decompress(self):
+        """
+        Returns the raw reverse indices, as returned by histogram.
+        """
+        return numpy.concatenate([self.offsets,
+                                  self._decode(numpy.arange(self.nbins))])
+
+    def bin(self, i):
+        """
+        Returns the indices of the ith bin.
+        """
+        if (i < 0) | (i >= self.nbins):
+            raise IndexError('Error. Bin out of bounds!')
+
+        return self._decode([i])
+
+    def bins(self, bins):
+        """
+        Returns the indices of several bins, concatenated in the order
+        given.
+        """
+        bins = numpy.atleast_1d(numpy.asarray(bins, dtype='int64')).ravel()
+
+        if ((bins.shape[0] != 0) and
+                ((bins.min() < 0) | (bins.max() >= self.nbins))):
+            raise IndexError('Error. Bin out of bounds!')
+
+        return self._decode(bins)
+
+
+def _deltas(ri, last, nbins, base):
+    """
+    Returns a tuple of (bins, delta, nb) for the indices of a chunk; the
+    bin of each index, its difference from the previous index of the bin,
+    and the number of bytes of its variable length integer. last is
+    updated, as per the kernels.
+    """
+    ri = ri.view('uint32')
+    counts = numpy.diff(ri[0:nbins+1]).astype('int64')
+    idx = ri[nbins+1:].astype('int64') + base
+
+    bins = numpy.repeat(numpy.arange(nbins), counts)
+    prev = numpy.empty_like(idx)
+    prev[1:] = idx[:-1]
+    first = numpy.cumsum(counts) - counts
+    occupied = counts > 0
+    prev[first[occupied]] = last[occupied]
+    delta = idx - prev
+    last[occupied] = idx[first[occupied] + counts[occupied] - 1]
+
+    nb = numpy.ones(delta.shape, dtype='int64')
+    for k in range(1, 5):
+        nb += delta >= 2**(7 * k)
+
+    return bins, delta, nb
+
+
+def _bin_bytes(ri, last, sizes, nbins, ri_sz, base):
+    """
+    Adds the number of bytes that _encode_chunk will write for each bin
+    of a chunk to sizes, as per the bin_bytes kernel.
+    """
+    if (_idl_reverse_indices is not None):
+        kernels = _idl_reverse_indices.idl_reverse_indices
+        kernels.bin_bytes(ri, last, sizes, nbins, ri_sz, base)
+        return
+
+    bins, delta, nb = _deltas(ri, last, nbins, base)
+    sizes += numpy.bincount(bins, weights=nb, minlength=nbins).astype('int64')
+
+
+def _encode_chunk(ri, last, buf, pos, nbins, ri_sz, nbuf, base):
+    """
+    Encodes the reverse indices of a chunk, appending the bytes of each
+    bin at pos within buf, as per the encode_chunk kernel.
+    """
+    if (_idl_reverse_indices is not None):
+        kernels = _idl_reverse_indices.idl_reverse_indices
+        kernels.encode_chunk(ri, last, buf.view('int8'), pos, nbins, ri_sz,
+                             nbuf, base)
+        return
+
+    bins, delta, nb = _deltas(ri, last, nbins, base)
+    if (delta.shape[0] == 0):
+        return
+
+    # The bytes of the chunk, ordered by bin
+    elem = numpy.repeat(numpy.arange(delta.shape[0]), nb)
+    k = numpy.arange(elem.shape[0]) - numpy.repeat(numpy.cumsum(nb) - nb, nb)
+    byte = (delta[elem] >> (7 * k)) & 127
+    byte |= (k < nb[elem] - 1) * 128
+
+    # Each bin's bytes are appended at its end within buf
+    sizes = numpy.bincount(bins, weights=nb, minlength=nbins).astype('int64')
+    start = numpy.cumsum(sizes) - sizes
+    owner = bins[elem]
+    buf[pos[owner] + numpy.arange(elem.shape[0]) - start[owner]] = byte
+    pos += sizes
+
+
+def _decode_bins(buf, offsets, hist, bins, out, nbuf, nbins, nb, nout):
+    """
+    Decodes the indices of the given bins, as per the decode_bins
+    kernel.
+    """
+    if (_idl_reverse_indices is not None):
+        kernels = _idl_reverse_indices.idl_reverse_indices
+        kernels.decode_bins(buf.view('int8'), offsets, hist.view('int32'),
+                            bins, out.view('int32'), nbuf, nbins, nb, nout)
+        return
+
+    o = 0
+    for b in bins:
+        seg = buf[offsets[b]:offsets[b+1]].astype('int64')
+        # Group the bytes of each variable length integer
+        end = seg < 128
+        grp = numpy.cumsum(end) - end
+        k = numpy.arange(seg.shape[0]) - numpy.flatnonzero(
+            numpy.r_[True, end[:-1]])[grp]
+        delta = numpy.zeros(int(hist[b]), dtype='int64')
+        numpy.add.at(delta, grp, (seg & 127) << (7 * k))
+        out[o:o+delta.shape[0]] = numpy.cumsum(delta) - 1
+        o += delta.shape[0]
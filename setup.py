@@ -20,9 +20,27 @@ import sys
 from numpy.distutils.core import setup, Extension
 from numpy.distutils import fcompiler
 
+ext_modules = [Extension('_idl_histogram', ['lib/idl_histogram.f90']),
+               Extension('_idl_region_grow', ['lib/idl_region_grow.f90']),
+               Extension('_idl_array_indices',
+                         ['lib/idl_array_indices.f90']),
+               Extension('_idl_bin_percentile',
+                         ['lib/idl_bin_percentile.f90']),
+               Extension('_idl_randomu', ['lib/idl_randomu.f90']),
+               Extension('_idl_reverse_indices',
+                         ['lib/idl_reverse_indices.f90']),
+               Extension('_idl_median', ['lib/idl_median.f90']),
+               Extension('_idl_hist_match', ['lib/idl_hist_match.f90']),
+               Extension('idl_functions.tests.unit_test_idl_hist',
+                         ['tests/unit_test_idl_hist.f90'])]
+
+# Without gnu95 the package is installed without the compiled extensions,
+# and falls back to numpy implementations where available
 avail_fcompilers = fcompiler.available_fcompilers_for_platform()
 if ('gnu95' not in avail_fcompilers):
-    raise RuntimeError("gnu95 required to install idl-functions")
+    print("gnu95 unavailable; idl-functions will be installed without the "
+          "compiled extensions")
+    ext_modules = []
  
 ## setup the python module
 setup(name="idl_functions", # name of the package to import later
@@ -30,11 +48,7 @@ setup(name="idl_functions", # name of the package to import later
       author='Josh Sixsmith',
       author_email='josh.sixsmith@gmail.com, joshua.sixsmith@ga.gov.au',
       url='https://github.com/sixy6e/idl-functions',
-      ext_modules = [
-                     Extension('_idl_histogram', ['lib/idl_histogram.f90']),
-                     Extension('idl_functions.tests.unit_test_idl_hist',
-                               ['tests/unit_test_idl_hist.f90'])
-                    ],
+      ext_modules = ext_modules,
       
      ## Install these to their own directory
      package_dir = {'idl_functions':'lib', 'idl_functions/tests':'tests'},
@@ -33,6 +33,17 @@ if __name__ == '__main__':
         test_file4 = locate('unit_test_idl_bytscl.py', os.getcwd())[0]
         test_file5 = locate('unit_test_idl_region_grow.py', os.getcwd())[0]
         test_file6 = locate('unit_test_idl_randomu.py', os.getcwd())[0]
+        test_file7 = locate('unit_test_idl_array_ravel.py', os.getcwd())[0]
+        test_file8 = locate('unit_test_idl_reverse_indices.py',
+                            os.getcwd())[0]
+        test_file9 = locate('unit_test_idl_histogram_sort.py',
+                            os.getcwd())[0]
+        test_file10 = locate('unit_test_idl_bin_percentile.py',
+                             os.getcwd())[0]
+        test_file11 = locate('unit_test_idl_functions_import.py',
+                             os.getcwd())[0]
+        test_file12 = locate('unit_test_idl_median.py', os.getcwd())[0]
+        test_file13 = locate('unit_test_idl_hist_match.py', os.getcwd())[0]
 
         # Get the directory path that contains the unittest script and change
         # to that directory
@@ -56,3 +67,17 @@ if __name__ == '__main__':
         subprocess.call(['python', test_file5])
         print("Testing idl_randomu")
         subprocess.call(['python', test_file6])
+        print("Testing idl_array_ravel")
+        subprocess.call(['python', test_file7])
+        print("Testing idl_reverse_indices")
+        subprocess.call(['python', test_file8])
+        print("Testing idl_histogram_sort")
+        subprocess.call(['python', test_file9])
+        print("Testing idl_bin_percentile")
+        subprocess.call(['python', test_file10])
+        print("Testing idl_functions imports")
+        subprocess.call(['python', test_file11])
+        print("Testing idl_median")
+        subprocess.call(['python', test_file12])
+        print("Testing idl_hist_match")
+        subprocess.call(['python', test_file13])
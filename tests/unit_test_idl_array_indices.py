@@ -78,5 +78,48 @@ class IDL_array_indices_Tester(unittest.TestCase):
         index = 10001
         self.assertRaises(IndexError, array_indices, self.array_2D, index)
 
+    def test_higher_dimensions(self):
+        """
+        Test that a 5D index yields the same subscripts as numpy.
+        """
+        dims = (2, 3, 4, 5, 6)
+        index = numpy.random.randint(0, 720, (1000))
+        control = numpy.unravel_index(index, dims)
+        ind5D = array_indices(dims, index, dimensions=True)
+        for a, b in zip(control, ind5D):
+            self.assertTrue((a == b).all())
+
+    def test_int32(self):
+        """
+        Test that the subscripts are int32 when the dimensions permit,
+        and that uint32 indices (such as reverse indices) are handled.
+        """
+        index = numpy.array([0, 9999, 5050], dtype='uint32')
+        ind2D = array_indices(self.array_2D, index)
+        self.assertEqual(ind2D[0].dtype.name, 'int32')
+        self.assertEqual(ind2D[0].tolist(), [0, 99, 50])
+        self.assertEqual(ind2D[1].tolist(), [0, 99, 50])
+
+    def test_out(self):
+        """
+        Test that the subscripts are written into the out array.
+        """
+        wh = numpy.where(self.array_1D_2 == 66)[0]
+        out = numpy.zeros((3, wh.shape[0]), dtype='int64')
+        ind3D = array_indices(self.array_3D, wh, out=out)
+        control = numpy.where(self.array_3D == 66)
+        for i in range(3):
+            self.assertTrue(ind3D[i].base is out)
+            self.assertTrue((out[i] == control[i]).all())
+
+    def test_out_shape(self):
+        """
+        Test that an out array of the wrong shape raises an error.
+        """
+        index = numpy.arange(10)
+        out = numpy.zeros((3, 10), dtype='int64')
+        self.assertRaises(ValueError, array_indices, self.array_2D, index,
+                          out=out)
+
 if __name__ == '__main__':
     unittest.main()
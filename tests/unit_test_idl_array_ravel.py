@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import sys
+import os
+import unittest
+import numpy
+
+# Need to temporarily append to the PYTHONPATH in order to import the 
+# newly built array_ravel function
+sys.path.append(os.getcwd())
+from idl_functions import array_indices
+from idl_functions import array_ravel
+
+
+class IDL_array_ravel_Tester(unittest.TestCase):
+
+    """
+    A unit testing procedure for the array_ravel function.
+    """
+
+    def setUp(self):
+        self.array_1D_1 = numpy.random.randint(0,256,(10000))
+        self.array_1D_2 = numpy.random.randint(0,256,(30000))
+        self.array_2D = self.array_1D_1.reshape(100,100)
+        self.array_3D = self.array_1D_2.reshape((3,100,100))
+
+    def test_2D_indices(self):
+        """
+        The returned 1D index should be the same as control.
+        """
+        control = numpy.where(self.array_1D_1 == 66)[0]
+        wh = numpy.where(self.array_2D == 66)
+        ind1D = array_ravel(self.array_2D, wh)
+        self.assertTrue((control == ind1D).all())
+
+    def test_dimensions(self):
+        """
+        Test that the dimensions keyword works and yields the same
+        result as the control.
+        """
+        control = numpy.where(self.array_1D_2 == 66)[0]
+        wh = numpy.where(self.array_3D == 66)
+        ind1D = array_ravel(self.array_3D.shape, wh, dimensions=True)
+        self.assertTrue((control == ind1D).all())
+
+    def test_round_trip(self):
+        """
+        Test that the subscripts returned by array_indices are converted
+        back to the original index.
+        """
+        dims = (2, 3, 4, 5, 6)
+        index = numpy.random.randint(0, 720, (1000))
+        ind = array_indices(dims, index, dimensions=True)
+        ind1D = array_ravel(dims, ind, dimensions=True)
+        self.assertTrue((index == ind1D).all())
+
+    def test_out(self):
+        """
+        Test that the index is written into the out array.
+        """
+        wh = numpy.where(self.array_2D == 66)
+        out = numpy.zeros(wh[0].shape, dtype='int64')
+        ind1D = array_ravel(self.array_2D, wh, out=out)
+        self.assertTrue(ind1D is out)
+        self.assertTrue((out == numpy.where(self.array_1D_1 == 66)[0]).all())
+
+    def test_coords_length(self):
+        """
+        Test that subscripts not matching the number of dimensions raise
+        an error.
+        """
+        coords = (numpy.arange(10),)
+        self.assertRaises(ValueError, array_ravel, self.array_2D, coords)
+
+    def test_out_of_bounds_lower(self):
+        """
+        Test that a subscript outside the array bounds raises an error.
+        """
+        coords = (numpy.array([5]), numpy.array([-5]))
+        self.assertRaises(IndexError, array_ravel, self.array_2D, coords)
+
+    def test_out_of_bounds_upper(self):
+        """
+        Test that a subscript outside the array bounds raises an error.
+        """
+        coords = (numpy.array([5]), numpy.array([100]))
+        self.assertRaises(IndexError, array_ravel, self.array_2D, coords)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import sys
+import os
+import unittest
+import numpy
+
+# Need to temporarily append to the PYTHONPATH in order to import the
+# newly built bin_percentile function
+sys.path.append(os.getcwd())
+from idl_functions import histogram
+from idl_functions import bin_percentile
+
+
+class IDL_bin_percentile_Tester(unittest.TestCase):
+
+    """
+    A unit testing procedure for the bin_percentile function.
+    """
+
+    def setUp(self):
+        self.zones = numpy.random.randint(0, 20, (100, 100))
+        # Leave one zone empty
+        self.zones[self.zones == 7] = 0
+        h = histogram(self.zones, minv=0, reverse_indices='ri')
+        self.ri = h['ri']
+
+    def control(self, array, percentile):
+        """
+        Evaluates the percentiles per zone with numpy.
+        """
+        result = numpy.zeros((len(percentile), 20))
+        for i in range(20):
+            if i == 7:
+                result[:, i] = numpy.nan
+                continue
+            result[:, i] = numpy.percentile(array[self.zones == i],
+                                            percentile)
+        return result
+
+    def test_median(self):
+        """
+        Test that the default is the median of each bin.
+        """
+        array = numpy.random.randn(100, 100)
+        result = bin_percentile(array, self.ri)
+        control = numpy.array([numpy.median(array[self.zones == i])
+                               for i in range(20)])
+        control[7] = numpy.nan
+        self.assertEqual(result.shape, (20,))
+        self.assertTrue(numpy.allclose(result, control, equal_nan=True))
+
+    def test_percentiles(self):
+        """
+        Test a list of unordered percentiles against numpy.percentile.
+        """
+        array = numpy.random.randn(100, 100)
+        pct = [95, 5, 50, 0, 100, 33.3]
+        result = bin_percentile(array, self.ri, pct)
+        self.assertEqual(result.shape, (6, 20))
+        self.assertTrue(numpy.allclose(result, self.control(array, pct),
+                                       equal_nan=True))
+
+    def test_float32(self):
+        """
+        Test the float32 kernel.
+        """
+        array = numpy.random.randn(100, 100).astype('float32')
+        pct = [5, 95]
+        result = bin_percentile(array, self.ri, pct)
+        self.assertTrue(numpy.allclose(result, self.control(array, pct),
+                                       equal_nan=True, atol=1e-6))
+
+    def test_integer_ties(self):
+        """
+        Test integer data containing many ties.
+        """
+        array = numpy.random.randint(0, 5, (100, 100)).astype('uint8')
+        pct = [10, 25, 50, 75, 90]
+        result = bin_percentile(array, self.ri, pct)
+        self.assertTrue(numpy.allclose(result, self.control(array, pct),
+                                       equal_nan=True))
+
+    def test_reverse_indices_class(self):
+        """
+        Test that a ReverseIndices instance is accepted.
+        """
+        from idl_functions import ReverseIndices
+        array = numpy.random.randn(100, 100)
+        result = bin_percentile(array, ReverseIndices(self.ri), [5])
+        control = bin_percentile(array, self.ri, [5])
+        self.assertTrue(numpy.allclose(result, control, equal_nan=True))
+
+    def test_compressed_reverse_indices(self):
+        """
+        Test that a CompressedReverseIndices is decoded a group of bins at
+        a time, including bins larger than a group.
+        """
+        import idl_functions.idl_bin_percentile as module
+        h = histogram(self.zones, minv=0, reverse_indices='ri',
+                      compress=True)
+        array = numpy.random.randn(100, 100)
+        control = self.control(array, [5, 50])
+        chunk_size = module.CHUNK_SIZE
+        try:
+            for size in [chunk_size, 1000, 10]:
+                module.CHUNK_SIZE = size
+                result = bin_percentile(array, h['ri'], [5, 50])
+                self.assertTrue(numpy.allclose(result, control,
+                                               equal_nan=True))
+        finally:
+            module.CHUNK_SIZE = chunk_size
+
+    def test_invalid(self):
+        """
+        Test that invalid arguments raise errors.
+        """
+        array = numpy.random.randn(100, 100)
+        self.assertRaises(ValueError, bin_percentile, array, self.ri, 101)
+        self.assertRaises(IndexError, bin_percentile, array[0:10], self.ri)
+        self.assertRaises(TypeError, bin_percentile, array.astype('bool'),
+                          self.ri)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import sys
+import os
+import subprocess
+import unittest
+
+# Need to temporarily append to the PYTHONPATH in order to import the
+# newly built idl_functions package
+sys.path.append(os.getcwd())
+
+
+def imported_modules(statement):
+    """
+    Executes statement within a fresh interpreter, returning the names of
+    the imported modules.
+    """
+    script = ("import sys\nsys.path.append({!r})\n{}\n"
+              "print(' '.join(sys.modules))").format(os.getcwd(), statement)
+    out = subprocess.check_output([sys.executable, '-c', script])
+    return out.decode().split()
+
+
+class IDL_functions_import_Tester(unittest.TestCase):
+
+    """
+    A unit testing procedure for the lazy imports of the idl_functions
+    package.
+    """
+
+    @unittest.skipIf(sys.version_info < (3, 7), "requires Python 3.7")
+    def test_import_package(self):
+        """
+        Test that importing the package imports neither scipy nor the
+        compiled extensions.
+        """
+        modules = imported_modules('import idl_functions')
+        self.assertNotIn('scipy', modules)
+        self.assertNotIn('_idl_histogram', modules)
+
+    @unittest.skipIf(sys.version_info < (3, 7), "requires Python 3.7")
+    def test_histogram_without_scipy(self):
+        """
+        Test that histogram and bytscl don't import scipy.
+        """
+        modules = imported_modules('from idl_functions import histogram\n'
+                                   'from idl_functions import bytscl')
+        self.assertNotIn('scipy', modules)
+
+    def test_exports(self):
+        """
+        Test that every public name is accessible.
+        """
+        import idl_functions
+        for name in idl_functions.__all__:
+            self.assertTrue(callable(getattr(idl_functions, name)))
+        self.assertRaises(AttributeError, getattr, idl_functions, 'foo')
+
+if __name__ == '__main__':
+    unittest.main()
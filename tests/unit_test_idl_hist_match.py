@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import sys
+import os
+import unittest
+import numpy
+
+# Need to temporarily append to the PYTHONPATH in order to import the
+# newly built hist_match function
+sys.path.append(os.getcwd())
+from idl_functions import histogram
+from idl_functions import hist_match
+
+
+class IDL_hist_match_Tester(unittest.TestCase):
+
+    """
+    A unit testing procedure for the hist_match function.
+    """
+
+    def setUp(self):
+        self.array = numpy.random.normal(100, 20, (100, 100)).clip(0, 255)
+        self.reference = numpy.random.gamma(2, 30, (80, 90)).clip(0, 255)
+
+    def test_identity(self):
+        """
+        Test that matching an integer array to itself is the identity.
+        """
+        for dtype in ['uint8', 'int16', 'uint16', 'int32']:
+            array = self.array.astype(dtype)
+            matched = hist_match(array, array)
+            self.assertEqual(matched.dtype, array.dtype)
+            self.assertTrue((matched == array).all())
+
+    def test_percentiles(self):
+        """
+        Test that the percentiles of the result match those of the
+        reference, and that the mapping is monotonic.
+        """
+        pct = [5, 25, 50, 75, 95]
+        for dtype in ['uint8', 'float32']:
+            array = self.array.astype(dtype)
+            reference = self.reference.astype(dtype)
+            matched = hist_match(array, reference)
+            self.assertTrue(numpy.allclose(numpy.percentile(matched, pct),
+                                           numpy.percentile(reference, pct),
+                                           atol=2))
+            order = numpy.argsort(array, axis=None, kind='stable')
+            self.assertTrue((numpy.diff(matched.ravel()[order]) >= 0).all())
+
+    def test_reference_hist(self):
+        """
+        Test that a precomputed reference histogram yields the same
+        result as the reference array.
+        """
+        array = self.array.astype('uint16')
+        reference = self.reference.astype('uint16')
+        h = histogram(reference, omin='omin')
+        matched = hist_match(array, h['histogram'], ref_minv=h['omin'],
+                             reference_hist=True)
+        self.assertTrue((matched == hist_match(array, reference)).all())
+        self.assertRaises(Exception, hist_match, array, reference,
+                          ref_minv=0)
+
+    def test_nan(self):
+        """
+        Test that NaN's are excluded and remain NaN.
+        """
+        array = self.array.copy()
+        array[::7] = numpy.nan
+        matched, d = hist_match(array, self.reference, lut='lut')
+        self.assertTrue(numpy.isnan(matched[::7]).all())
+        self.assertTrue(numpy.isfinite(numpy.delete(matched, numpy.s_[::7],
+                                                    axis=0)).all())
+        self.assertTrue(numpy.isfinite(d['lut']).all())
+
+if __name__ == '__main__':
+    unittest.main()
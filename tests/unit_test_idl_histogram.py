@@ -11,6 +11,7 @@ import unit_test_idl_hist
 # newly built histogram function
 sys.path.append(os.getcwd())
 from idl_functions import histogram
+from idl_functions.idl_histogram import BACKENDS
 
 
 class IDL_histogram_Tester(unittest.TestCase):
@@ -256,5 +257,236 @@ class IDL_histogram_Tester(unittest.TestCase):
         diff = h - b
         self.assertEqual(diff.sum(), 10)
 
+    def test_strided(self):
+        """
+        Test that non-contiguous arrays yield the same histogram and
+        reverse indices as their contiguous copies, the reverse indices
+        referring to the C ordered positions.
+        """
+        stack = numpy.random.randint(0, 200, (50, 40, 3))
+        for dtype in ['uint8', 'int16', 'uint16', 'int32', 'float64']:
+            array = stack.astype(dtype)
+            views = [array[:, :, 1], array[::2, 5:, :],
+                     array.transpose(1, 0, 2), array[3:40:3, ::4, 2]]
+            for view in views:
+                h1 = histogram(view, binsize=3, reverse_indices='ri')
+                h2 = histogram(numpy.ascontiguousarray(view), binsize=3,
+                               reverse_indices='ri')
+                self.assertTrue((h1['histogram'] == h2['histogram']).all())
+                self.assertTrue((h1['ri'] == h2['ri']).all())
+
+    @unittest.skipIf('fortran' not in BACKENDS, "requires _idl_histogram")
+    def test_shift(self):
+        """
+        Test that integer data with a power of two binsize, binned by
+        the shift kernels, yields the same histogram and reverse indices
+        as the numpy backend.
+        """
+        array = numpy.random.randint(0, 1000, (60, 50))
+        kwds = [{}, {'binsize': 4}, {'binsize': 16, 'minv': 10},
+                {'minv': 3, 'maxv': 517, 'binsize': 2},
+                {'binsize': 8, 'nbins': 20}]
+        for dtype in ['int16', 'uint16', 'int32', 'uint32', 'int64']:
+            data = array.astype(dtype)
+            for view in [data, data[:, ::3]]:
+                for kwd in kwds:
+                    h1 = histogram(view, reverse_indices='ri',
+                                   backend='fortran', **kwd)
+                    h2 = histogram(view, reverse_indices='ri',
+                                   backend='numpy', **kwd)
+                    self.assertTrue((h1['histogram'] ==
+                                     h2['histogram']).all())
+                    self.assertTrue((h1['ri'] == h2['ri']).all())
+
+    def test_edges(self):
+        """
+        Test that arbitrary bin edges yield the same histogram as
+        numpy.histogram, and that the reverse indices select the elements
+        of each bin.
+        """
+        a = self.array4 * 100
+        edges = [0, 0.5, 3, 10, 10, 42.5, 100]
+        h = histogram(a, edges=edges, reverse_indices='ri', locations='loc')
+        control = numpy.histogram(a, edges)[0]
+        self.assertTrue((h['histogram'] == control).all())
+        self.assertTrue((h['loc'] == edges[:-1]).all())
+        ri = h['ri']
+        for i in range(len(edges) - 1):
+            data = a[ri[ri[i]:ri[i+1]]]
+            self.assertTrue(((data >= edges[i]) & (data <= edges[i+1])).all())
+
+    def test_log(self):
+        """
+        Test that the log spaced bins are evenly spaced in log10, include
+        maxv, and that the backends agree.
+        """
+        a = numpy.random.lognormal(2, 2, 1000)
+        h = histogram(a, log=True, nbins=15, locations='loc')
+        self.assertEqual(h['histogram'].sum(), 1000)
+        self.assertTrue(numpy.allclose(numpy.diff(numpy.log10(h['loc'])),
+                                       (numpy.log10(a.max()) -
+                                        numpy.log10(a.min())) / 15))
+        kwds = [{}, {'binsize': 0.1, 'minv': 0.5, 'maxv': 200},
+                {'binsize': 0.2, 'nbins': 9, 'minv': 1}]
+        for kwd in kwds:
+            for backend in BACKENDS:
+                h1 = histogram(a, log=True, reverse_indices='ri',
+                               backend=backend, **kwd)
+                h2 = histogram(a, log=True, reverse_indices='ri',
+                               backend='numpy', **kwd)
+                self.assertTrue((h1['histogram'] == h2['histogram']).all())
+                self.assertTrue((h1['ri'] == h2['ri']).all())
+
+    def test_sparse(self):
+        """
+        Test that the sparse histogram and reverse indices are those of
+        the occupied bins of the dense histogram.
+        """
+        a = numpy.random.choice([3, 17, 18, 250, 1000], (40, 30))
+        for kwd in [{}, {'binsize': 5}, {'minv': 10}]:
+            h1 = histogram(a, reverse_indices='ri', **kwd)
+            h2 = histogram(a, reverse_indices='ri', sparse='ids', **kwd)
+            ids = numpy.flatnonzero(h1['histogram'])
+            self.assertTrue((h2['ids'] == ids).all())
+            self.assertTrue((h2['histogram'] == h1['histogram'][ids]).all())
+            ri1 = h1['ri']
+            ri2 = h2['ri']
+            for i, b in enumerate(ids):
+                self.assertTrue((ri1[ri1[b]:ri1[b+1]] ==
+                                 ri2[ri2[i]:ri2[i+1]]).all())
+
+    def test_sparse_hashed(self):
+        """
+        Test that a histogram far larger than the array is hashed, and
+        that the backends agree.
+        """
+        ids = numpy.array([0, 7, 10**9, 123456789012, 10**12], dtype='int64')
+        a = numpy.random.choice(ids, 1000)
+        for backend in BACKENDS:
+            h = histogram(a, reverse_indices='ri', sparse='ids',
+                          locations='loc', backend=backend)
+            occupied = numpy.unique(a)
+            self.assertTrue((h['ids'] == occupied).all())
+            self.assertTrue((h['loc'] == occupied).all())
+            ri = h['ri']
+            for i in range(occupied.shape[0]):
+                control = numpy.flatnonzero(a == occupied[i])
+                self.assertTrue((ri[ri[i]:ri[i+1]] == control).all())
+
+    def test_sparse_occupancy(self):
+        """
+        Test that the sparse histogram of an array with few occupied bins
+        relative to nbins, but no more bins than elements, matches the
+        dense histogram for a strided array and each backend.
+        """
+        values = numpy.random.choice(60000, 20, replace=False)
+        a = values[numpy.random.randint(0, 20, (300, 400))].astype('uint16')
+        for array in [a, a[::2, ::3], numpy.random.randint(0, 50, (300, 400))]:
+            h1 = histogram(array, reverse_indices='ri')
+            ids = numpy.flatnonzero(h1['histogram'])
+            ri1 = h1['ri']
+            for backend in BACKENDS:
+                h2 = histogram(array, reverse_indices='ri', sparse='ids',
+                               backend=backend)
+                self.assertTrue((h2['ids'] == ids).all())
+                self.assertTrue((h2['histogram'] ==
+                                 h1['histogram'][ids]).all())
+                ri2 = h2['ri']
+                for i, b in enumerate(ids):
+                    self.assertTrue((ri1[ri1[b]:ri1[b+1]] ==
+                                     ri2[ri2[i]:ri2[i+1]]).all())
+
+    def test_ri_bins(self):
+        """
+        Test that the reverse indices of the selected bins match the full
+        reverse indices, the other bins being empty, and that every bin
+        is still counted.
+        """
+        for array in [self.array5, self.array5[::2, ::3].astype('uint8'),
+                      self.array5.astype('float32')]:
+            for backend in BACKENDS:
+                h1 = histogram(array, reverse_indices='ri', backend=backend)
+                h2 = histogram(array, reverse_indices='ri', ri_bins=[2, 7],
+                               backend=backend)
+                self.assertTrue((h1['histogram'] == h2['histogram']).all())
+                ri1 = h1['ri']
+                ri2 = h2['ri']
+                self.assertEqual(ri2.shape[0],
+                                 12 + h1['histogram'][[2, 7]].sum())
+                for i in range(11):
+                    if i in [2, 7]:
+                        self.assertTrue((ri1[ri1[i]:ri1[i+1]] ==
+                                         ri2[ri2[i]:ri2[i+1]]).all())
+                    else:
+                        self.assertEqual(ri2[i], ri2[i+1])
+        self.assertRaises(IndexError, histogram, self.array5,
+                          reverse_indices='ri', ri_bins=[11])
+        self.assertRaises(Exception, histogram, self.array5, ri_bins=[1])
+
+    def test_axis(self):
+        """
+        Test that the histograms along an axis match the histogram of
+        each element of the remaining dimensions, using common bins.
+        """
+        stack = numpy.random.randint(0, 20, (6, 5, 4))
+        for array in [stack, stack[:, ::2].astype('uint8'),
+                      stack.astype('float32')]:
+            for axis in [0, 2]:
+                for backend in BACKENDS:
+                    h = histogram(array, axis=axis, binsize=3, minv=1,
+                                  maxv=17, nthreads=2, backend=backend)
+                    hist = numpy.moveaxis(h['histogram'], 0, -1)
+                    series = numpy.moveaxis(array, axis, -1)
+                    self.assertEqual(hist.shape[:-1], series.shape[:-1])
+                    for i in numpy.ndindex(series.shape[:-1]):
+                        control = histogram(series[i], binsize=3, minv=1,
+                                            maxv=17)['histogram']
+                        self.assertTrue((hist[i] == control).all())
+        self.assertRaises(Exception, histogram, stack, axis=0,
+                          reverse_indices='ri')
+
+    def test_edges_invalid(self):
+        """
+        Test that invalid edges and conflicting keywords raise errors.
+        """
+        a = self.array4
+        self.assertRaises(ValueError, histogram, a, edges=[1, 0.5, 2])
+        self.assertRaises(ValueError, histogram, a, edges=[0.5])
+        self.assertRaises(ValueError, histogram, a, log=True, minv=0)
+        self.assertRaises(Exception, histogram, a, edges=[0, 1], binsize=1)
+        self.assertRaises(Exception, histogram, a, edges=[0, 1], log=True)
+
+    @unittest.skipIf('fortran' not in BACKENDS, "requires _idl_histogram")
+    def test_backend_numpy(self):
+        """
+        Test that the numpy backend yields the same histogram and reverse
+        indices as the fortran backend.
+        """
+        dtypes = ['int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32',
+                  'int64', 'uint64']
+        arrays = [self.array5.astype(dtype) for dtype in dtypes]
+        arrays.append(self.array4.astype('float32') * 100)
+        arrays.append(self.array4 * 100)
+        arrays.append(numpy.array([1.0, numpy.nan, 3.0, 2.5]))
+        kwds = [{'nan': True}, {'binsize': 3, 'nan': True},
+                {'nbins': 7, 'nan': True}, {'minv': 2, 'maxv': 8}]
+        for array in arrays:
+            for kwd in kwds:
+                h1 = histogram(array, reverse_indices='ri', backend='fortran',
+                               **kwd)
+                h2 = histogram(array, reverse_indices='ri', backend='numpy',
+                               **kwd)
+                h3 = histogram(array, backend='numpy', **kwd)
+                self.assertEqual(h1['histogram'].dtype, h2['histogram'].dtype)
+                self.assertTrue((h1['histogram'] == h2['histogram']).all())
+                self.assertTrue((h1['histogram'] == h3['histogram']).all())
+                self.assertTrue((h1['ri'] == h2['ri']).all())
+
+    def test_backend_invalid(self):
+        """
+        Test that an unknown backend raises a ValueError.
+        """
+        self.assertRaises(ValueError, histogram, self.array1, backend='c')
+
 if __name__ == '__main__':
     unittest.main()
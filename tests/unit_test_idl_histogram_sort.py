@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import sys
+import os
+import unittest
+import numpy
+
+# Need to temporarily append to the PYTHONPATH in order to import the
+# newly built histogram_sort function
+sys.path.append(os.getcwd())
+from idl_functions import histogram_sort
+from idl_functions import group_by
+
+
+class IDL_histogram_sort_Tester(unittest.TestCase):
+
+    """
+    A unit testing procedure for the histogram_sort and group_by functions.
+    """
+
+    def setUp(self):
+        self.zones = numpy.random.randint(0, 10, (100, 100))
+        # Leave one zone empty
+        self.zones[self.zones == 4] = 0
+        self.values = numpy.random.randn(100, 100)
+
+    def test_sort(self):
+        """
+        Test that the permutation is a stable sort of the data.
+        """
+        perm, bounds = histogram_sort(self.zones, minv=0)
+        control = numpy.argsort(self.zones.ravel(), kind='stable')
+        self.assertTrue((perm == control).all())
+
+    def test_bounds(self):
+        """
+        Test that the bounds delimit the elements of each bin.
+        """
+        perm, bounds = histogram_sort(self.zones, minv=0)
+        flat = self.zones.ravel()
+        self.assertEqual(bounds.shape[0], 11)
+        for i in range(10):
+            self.assertTrue((flat[perm[bounds[i]:bounds[i+1]]] == i).all())
+        self.assertEqual(bounds[4], bounds[5])
+
+    def test_sort_excludes_range(self):
+        """
+        Test that elements outside the histogram range are excluded.
+        """
+        perm, bounds = histogram_sort(self.zones, minv=1, maxv=5)
+        self.assertEqual(perm.shape[0], ((self.zones >= 1) &
+                                         (self.zones <= 5)).sum())
+        self.assertEqual(bounds[-1], perm.shape[0])
+
+    def test_reductions(self):
+        """
+        Test the simple reductions against a per zone evaluation.
+        """
+        funcs = {'count': numpy.size,
+                 'sum': numpy.sum,
+                 'mean': numpy.mean,
+                 'min': numpy.min,
+                 'max': numpy.max,
+                 'median': numpy.median}
+        for name in funcs:
+            result = group_by(self.zones, self.values, reduce=name, minv=0)
+            for i in range(10):
+                if i == 4:
+                    continue
+                control = funcs[name](self.values[self.zones == i])
+                self.assertAlmostEqual(result[i], control)
+
+    def test_empty_group(self):
+        """
+        Test that an empty group is 0 for count and sum, NaN otherwise.
+        """
+        self.assertEqual(group_by(self.zones, self.values, reduce='count',
+                                  minv=0)[4], 0)
+        self.assertEqual(group_by(self.zones, self.values, reduce='sum',
+                                  minv=0)[4], 0)
+        self.assertTrue(numpy.isnan(group_by(self.zones, self.values,
+                                             minv=0)[4]))
+
+    def test_percentile(self):
+        """
+        Test the percentiles against numpy.percentile.
+        """
+        result = group_by(self.zones, self.values, reduce='percentile',
+                          percentile=[5, 50, 95], minv=0)
+        self.assertEqual(result.shape, (3, 10))
+        for i in range(10):
+            if i == 4:
+                continue
+            control = numpy.percentile(self.values[self.zones == i],
+                                       [5, 50, 95])
+            self.assertTrue(numpy.allclose(result[:, i], control))
+
+    def test_invalid(self):
+        """
+        Test that invalid arguments raise a ValueError.
+        """
+        self.assertRaises(ValueError, group_by, self.zones, self.values,
+                          reduce='mode')
+        self.assertRaises(ValueError, group_by, self.zones, self.values,
+                          reduce='percentile')
+        self.assertRaises(ValueError, group_by, self.zones,
+                          self.values[0:10])
+
+if __name__ == '__main__':
+    unittest.main()
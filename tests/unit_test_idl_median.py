@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import sys
+import os
+import unittest
+import numpy
+
+# Need to temporarily append to the PYTHONPATH in order to import the
+# newly built median functions
+sys.path.append(os.getcwd())
+from idl_functions import median
+from idl_functions import mode_filter
+from idl_functions import percentile_filter
+
+
+class IDL_median_Tester(unittest.TestCase):
+
+    """
+    A unit testing procedure for the median, mode_filter and
+    percentile_filter functions.
+    """
+
+    def setUp(self):
+        self.array = numpy.random.randint(0, 300, (23, 31)).astype('uint16')
+        self.classes = numpy.random.randint(0, 6, (23, 31)).astype('uint8')
+
+    def control(self, array, width, func):
+        """
+        Evaluates func over the window of every element whose window lies
+        within the array, the others being unmodified.
+        """
+        r = width // 2
+        result = array.astype('float64')
+        for i in range(r, array.shape[0] - r):
+            for j in range(r, array.shape[1] - r):
+                result[i, j] = func(array[i-r:i+r+1, j-r:j+r+1].ravel())
+        return result
+
+    def test_median_value(self):
+        """
+        Test the median of an array, with and without the even keyword.
+        """
+        array = numpy.array([4, 1, 3, 2])
+        self.assertEqual(median(array), 3)
+        self.assertEqual(median(array, even=True), 2.5)
+        self.assertEqual(median(self.array), numpy.median(self.array))
+
+    def test_median_filter(self):
+        """
+        Test the median filter against the median of each window, for
+        integer and floating point data.
+        """
+        for array in [self.array, self.array.astype('float32') / 7]:
+            for width in [1, 3, 7]:
+                result = median(array, width, nthreads=2)
+                control = self.control(array, width, numpy.median)
+                self.assertEqual(result.dtype, array.dtype)
+                self.assertTrue((result == control.astype(array.dtype)).all())
+
+    def test_median_1d(self):
+        """
+        Test the median filter of a 1D array.
+        """
+        array = self.array[0]
+        result = median(array, 5)
+        for j in range(2, array.shape[0] - 2):
+            self.assertEqual(result[j], numpy.median(array[j-2:j+3]))
+        edges = [0, 1, -2, -1]
+        self.assertTrue((result[edges] == array[edges]).all())
+
+    def test_percentile_filter(self):
+        """
+        Test the percentile filter against numpy.percentile.
+        """
+        for pct in [0, 12.5, 90, 100]:
+            result = percentile_filter(self.array, 5, pct)
+            control = self.control(self.array, 5,
+                                   lambda v: numpy.percentile(v, pct))
+            self.assertTrue(numpy.allclose(result, control))
+        self.assertRaises(ValueError, percentile_filter, self.array, 5, 101)
+
+    def test_mode_filter(self):
+        """
+        Test the mode filter, ties resolving to the lowest value.
+        """
+        def mode(v):
+            return numpy.argmax(numpy.bincount(v))
+
+        result = mode_filter(self.classes, 5)
+        control = self.control(self.classes, 5, mode)
+        self.assertEqual(result.dtype, self.classes.dtype)
+        self.assertTrue((result == control).all())
+
+    def test_many_values(self):
+        """
+        Test the filters of arrays with many distinct values relative to
+        the window size, which select from each window directly.
+        """
+        array = numpy.random.random((60, 70)).astype('float32')
+        result = median(array, 3)
+        control = self.control(array, 3, numpy.median)
+        self.assertTrue((result == control.astype(array.dtype)).all())
+        result = percentile_filter(array, 3, 30)
+        control = self.control(array, 3, lambda v: numpy.percentile(v, 30))
+        self.assertTrue(numpy.allclose(result, control))
+
+        def mode(v):
+            return numpy.argmax(numpy.bincount(v))
+
+        classes = numpy.random.randint(0, 200, (60, 70))
+        result = mode_filter(classes, 3)
+        self.assertTrue((result == self.control(classes, 3, mode)).all())
+
+    def test_invalid(self):
+        """
+        Test that invalid widths and dimensions raise errors.
+        """
+        self.assertRaises(ValueError, median, self.array, 4)
+        self.assertRaises(ValueError, median, self.array, 0)
+        self.assertRaises(TypeError, median, self.array.reshape(1, 23, 31),
+                          3)
+
+if __name__ == '__main__':
+    unittest.main()
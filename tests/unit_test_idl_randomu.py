@@ -10,6 +10,9 @@ import numpy
 # newly built randomu function
 sys.path.append(os.getcwd())
 from idl_functions import randomu
+from idl_functions import randomu_tile
+from idl_functions import randomu_tiles
+from idl_functions.idl_randomu import _idl_randomu
 
 
 class IDL_randomu_Tester(unittest.TestCase):
@@ -100,5 +103,109 @@ class IDL_randomu_Tester(unittest.TestCase):
 
         self.assertRaises(ValueError, randomu, **kwds)
 
+    def test_float32(self):
+        """
+        Test that the uniform, normal and gamma distributions are returned
+        as float32, unless double is set.
+        """
+        for kwds in [{}, {'normal': True}, {'gamma': 2}]:
+            x, seed = randomu(None, [10, 10], **kwds)
+            self.assertEqual(x.dtype.name, 'float32')
+            x, seed = randomu(None, [10, 10], double=True, **kwds)
+            self.assertEqual(x.dtype.name, 'float64')
+
+    def test_seed_reproducible(self):
+        """
+        Test that an integer seed is reproducible, and that the returned
+        Generator continues the sequence.
+        """
+        x1, seed = randomu(10, [100])
+        x2, seed = randomu(seed, [100])
+        x3, seed = randomu(10, [200])
+        self.assertTrue((numpy.concatenate([x1, x2]) == x3).all())
+
+    def test_parallel(self):
+        """
+        Test that the parallel mode is independent of the number of
+        threads.
+        """
+        dims = [1000, 2100]
+        x1, seed = randomu(3, dims, normal=True, nthreads=1)
+        x2, seed = randomu(3, dims, normal=True, nthreads=4)
+        self.assertEqual(x1.shape, (2100, 1000))
+        self.assertTrue((x1 == x2).all())
+        x3, seed = randomu(3, dims, poisson=1.5, nthreads=2)
+        self.assertEqual(x3.dtype.name, 'float32')
+
+    def test_tiling_invariant(self):
+        """
+        Test that the logical array is identical for any tiling.
+        """
+        di = [37, 23, 5]
+        for kwds in [{}, {'double': True}, {'normal': True}]:
+            control = None
+            for tile in [[37, 23, 5], [10, 10, 1], [37, 1, 2], [5, 23, 5]]:
+                arr = numpy.zeros(di[::-1], dtype='float64')
+                for i, slices, values in randomu_tiles(9, di, tile, **kwds):
+                    arr[slices] = values
+                if control is None:
+                    control = arr
+                self.assertTrue((arr == control).all())
+
+    def test_tile_regenerable(self):
+        """
+        Test that a tile can be regenerated on its own.
+        """
+        tiles = list(randomu_tiles(9, [100, 60], [30, 30], normal=True))
+        i, slices, values = tiles[5]
+        slices2, values2 = randomu_tile(9, [100, 60], [30, 30], 5,
+                                        normal=True)
+        self.assertEqual(slices, slices2)
+        self.assertTrue((values == values2).all())
+        self.assertEqual(values.shape, (30, 30))
+        self.assertEqual(tiles[-1][2].shape, (30, 10))
+
+    def test_tile_errors(self):
+        """
+        Test that invalid tile arguments raise errors.
+        """
+        self.assertRaises(IndexError, randomu_tile, 1, [10, 10], [5, 5], 4)
+        self.assertRaises(ValueError, randomu_tile, 1, [10, 10], [5], 0)
+        self.assertRaises(TypeError, randomu_tile, None, [10, 10], [5, 5],
+                          0)
+
+    @unittest.skipIf(_idl_randomu is None, "requires _idl_randomu")
+    def test_ran1_minimal_standard(self):
+        """
+        Test the ran1 engine against the published check of the
+        Park-Miller minimal standard, x(10000) = 1043618065 given
+        x(0) = 1. Initialising the shuffle table consumes 40 values.
+        """
+        x, seed = randomu(1, [9960], ran1=True)
+        self.assertEqual(seed[0], 1043618065)
+        self.assertTrue((x > 0).all() & (x < 1).all())
+
+    @unittest.skipIf(_idl_randomu is None, "requires _idl_randomu")
+    def test_ran1_continuation(self):
+        """
+        Test that passing back the ran1 state continues the sequence.
+        """
+        x1, seed = randomu(5, [30], ran1=True, double=True)
+        x2, seed = randomu(seed, [70], ran1=True, double=True)
+        x3, seed = randomu(5, [100], ran1=True, double=True)
+        self.assertTrue((numpy.concatenate([x1, x2]) == x3).all())
+        x, seed = randomu(5, [1000, 100], ran1=True, normal=True)
+        self.assertEqual(x.dtype.name, 'float32')
+        self.assertTrue(abs(x.mean()) < 0.05)
+
+    def test_ran1_distributions(self):
+        """
+        Test that ran1 rejects the distributions it doesn't support.
+        """
+        self.assertRaises(ValueError, randomu, 1, [10], ran1=True,
+                          poisson=2)
+        self.assertRaises(ValueError, randomu, 1, [10], ran1=True,
+                          nthreads=2)
+
 if __name__ == '__main__':
     unittest.main()
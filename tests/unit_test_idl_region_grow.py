@@ -9,6 +9,11 @@ import numpy
 # newly built region_grow function
 sys.path.append(os.getcwd())
 from idl_functions import region_grow
+from idl_functions import region_grow_batch
+from idl_functions.idl_region_grow import _idl_region_grow
+
+# The flood engine requires the compiled extension
+METHODS = ['label', 'flood'] if _idl_region_grow is not None else ['label']
 
 
 class IDL_region_grow_Tester(unittest.TestCase):
@@ -87,7 +92,7 @@ class IDL_region_grow_Tester(unittest.TestCase):
 
     def test_two_dimensional(self):
         """
-        Test that inputing a non 2D array will raise an error.
+        Test that inputing a non 2D or 3D array will raise an error.
         """
         arr = numpy.zeros((100))
         pix = [11, 11]
@@ -96,6 +101,120 @@ class IDL_region_grow_Tester(unittest.TestCase):
         roi = (y, x)
         self.assertRaises(ValueError, region_grow, arr, roi)
 
+    @unittest.skipIf(_idl_region_grow is None, "requires _idl_region_grow")
+    def test_multi_band_threshold(self):
+        """
+        Test that per band thresholds on a 3D array grow the region of
+        pixels satisfying every band.
+        """
+        stack = numpy.zeros((3, 100, 100))
+        stack[:, 45:55, 45:55] = [[[10]], [[20]], [[30]]]
+        # The second band of this block falls outside its threshold
+        stack[:, 45:55, 55:60] = [[[10]], [[50]], [[30]]]
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        threshold = [[5, 15], [15, 25], [25, 35]]
+        for method in ['label', 'flood']:
+            grown = region_grow(stack, roi, threshold=threshold,
+                                method=method)
+            self.assertEqual(grown[0].shape[0], 100)
+            self.assertEqual(grown[1].max(), 54)
+
+    @unittest.skipIf(_idl_region_grow is None, "requires _idl_region_grow")
+    def test_multi_band_mahalanobis(self):
+        """
+        Test that the mahalanobis distance on a 3D array grows the same
+        region as a control mask.
+        """
+        stack = numpy.random.randint(0, 100, (3, 100, 100)).astype('float32')
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        grown = region_grow(stack, roi, stddev_multiplier=2.0,
+                            mahalanobis=True, method='flood')
+        values = stack[:, y, x].astype('float64')
+        icov = numpy.linalg.pinv(numpy.cov(values, ddof=1))
+        diff = stack.reshape(3, -1).T - values.mean(axis=1)
+        dist = numpy.sum(numpy.dot(diff, icov) * diff, axis=1)
+        mask = (dist <= 4.0).reshape(100, 100).astype('uint8')
+        control = region_grow(mask, roi, threshold=[1, 1], method='flood')
+        self.assertTrue((grown[0] == control[0]).all())
+        self.assertTrue((grown[1] == control[1]).all())
+
+    def test_output_flat(self):
+        """
+        Test that the flat output contains the same region as the
+        co-ordinates.
+        """
+        array = self.array3.copy()
+        array[49:52, 49:52] = 15
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        for method in METHODS:
+            control = region_grow(array, roi, threshold=[10, 20],
+                                  method=method)
+            flat = region_grow(array, roi, threshold=[10, 20],
+                               method=method, output='flat')
+            self.assertTrue((flat == control[0] * 100 + control[1]).all())
+
+    def test_output_segments(self):
+        """
+        Test that the flat output is in ascending order when the roi
+        touches several segments.
+        """
+        array = numpy.ones((6, 6), dtype='int32')
+        array[:, 3] = 0
+        roi = (numpy.array([0, 0]), numpy.array([0, 5]))
+        expected = numpy.flatnonzero(array)
+        for method in METHODS:
+            flat = region_grow(array, roi, threshold=[1, 1], method=method,
+                               output='flat')
+            self.assertTrue((flat == expected).all())
+            grown = region_grow_batch(array, [roi], threshold=[1, 1],
+                                      method=method, output='flat')[0]
+            self.assertTrue((grown == expected).all())
+
+    def test_output_mask(self):
+        """
+        Test that the mask output is written into a user supplied array.
+        """
+        array = self.array3.copy()
+        array[49:52, 49:52] = 15
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        control = region_grow(array, roi, threshold=[10, 20])
+        for method in METHODS:
+            for dtype in ['bool', 'uint8']:
+                out = numpy.ones((100, 100), dtype=dtype)
+                mask = region_grow(array, roi, threshold=[10, 20],
+                                   method=method, output='mask', out=out)
+                self.assertTrue(mask is out)
+                self.assertEqual(out.sum(), control[0].shape[0])
+                self.assertTrue(out[control].all())
+            mask = region_grow(array, roi, threshold=[10, 20],
+                               method=method, output='mask')
+            self.assertEqual(mask.dtype.name, 'bool')
+            self.assertEqual(mask.sum(), control[0].shape[0])
+
+    def test_output_out_shape(self):
+        """
+        Test that an out array of the wrong shape raises an error.
+        """
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        kwds = {'array': self.array3, 'roipixels': roi, 'output': 'mask',
+                'out': numpy.zeros((10, 10), dtype='bool')}
+        self.assertRaises(ValueError, region_grow, **kwds)
+
     def test_roi_type1(self):
         """
         Test that an roi not of type list or tuple raises an error.
@@ -133,5 +252,205 @@ class IDL_region_grow_Tester(unittest.TestCase):
         kwds = {'array': array, 'roipixels': roi, 'threshold': threshold}
         self.assertRaises(ValueError, region_grow, **kwds)
 
+    @unittest.skipIf(_idl_region_grow is None, "requires _idl_region_grow")
+    def test_flood_threshold(self):
+        """
+        Test that the flood method grows the same region as the label
+        method when using the threshold keyword.
+        """
+        array = self.array3.copy()
+        array[49:52, 49:52] = 15
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        control = region_grow(array, roi, threshold=[10, 20])
+        grown = region_grow(array, roi, threshold=[10, 20], method='flood')
+        control = numpy.sort(control[0] * 100 + control[1])
+        self.assertTrue((grown[0] * 100 + grown[1] == control).all())
+
+    @unittest.skipIf(_idl_region_grow is None, "requires _idl_region_grow")
+    def test_flood_stddev_mult(self):
+        """
+        Test that the flood method grows the same region as the label
+        method when using the stddev_multiplier keyword, and all
+        8 neighbours.
+        """
+        array = self.array5.copy()
+        array[10:13, 10:13] = self.array6
+        pix = [11, 11]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        kwds = {'stddev_multiplier': 1.0, 'all_neighbors': True}
+        control = region_grow(array, roi, **kwds)
+        grown = region_grow(array, roi, method='flood', **kwds)
+        control = numpy.sort(control[0] * 100 + control[1])
+        self.assertTrue((grown[0] * 100 + grown[1] == control).all())
+
+    @unittest.skipIf(_idl_region_grow is None, "requires _idl_region_grow")
+    def test_flood_types(self):
+        """
+        Test that the flood method grows the same region as the label
+        method for each datatype, including the high values of unsigned
+        types, and for a non-contiguous array.
+        """
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        for dtype in ['int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32',
+                      'int64', 'uint64', 'float32', 'float64']:
+            # The limits are float64, so uint64 values are spaced to
+            # remain distinct
+            scale = 2**12 if (dtype == 'uint64') else 1
+            array = self.array3.astype(dtype) * scale
+            if (dtype[0] == 'u'):
+                array += numpy.iinfo(dtype).max - 31 * scale
+            lower = array[roi].min()
+            for arr in [array, numpy.asfortranarray(array),
+                        numpy.repeat(array, 2, axis=1)[:, ::2]]:
+                kwds = {'threshold': [lower, lower + 10 * scale]}
+                control = region_grow(arr, roi, **kwds)
+                grown = region_grow(arr, roi, method='flood', **kwds)
+                control = numpy.sort(control[0] * 100 + control[1])
+                self.assertTrue((grown[0] * 100 + grown[1] == control).all())
+
+    def test_method(self):
+        """
+        Test that an unknown method raises an error.
+        """
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        kwds = {'array': self.array3, 'roipixels': roi, 'method': 'bfs'}
+        self.assertRaises(ValueError, region_grow, **kwds)
+
+    def test_batch(self):
+        """
+        Test that each region grown by the batch function is the same as
+        the region grown individually, using per roi thresholds.
+        """
+        array = self.array3.copy()
+        array[9:12, 9:12] = 15
+        array[49:52, 49:52] = 25
+        rois = []
+        for pix in [[10, 10], [50, 50], [10, 10]]:
+            x = numpy.arange(9) % 3 + (pix[1] - 1)
+            y = numpy.arange(9) % 3 + (pix[0] - 1)
+            rois.append((y, x))
+        thresholds = [[10, 20], [20, 30], [10, 20]]
+        grown = region_grow_batch(array, rois, threshold=thresholds)
+        self.assertEqual(len(grown), 3)
+        for roi, thresh, region in zip(rois, thresholds, grown):
+            control = region_grow(array, roi, threshold=thresh)
+            self.assertTrue((control[0] == region[0]).all())
+            self.assertTrue((control[1] == region[1]).all())
+
+    @unittest.skipIf(_idl_region_grow is None, "requires _idl_region_grow")
+    def test_batch_flood(self):
+        """
+        Test that the batch function yields the same regions using the
+        flood method and a single stddev multiplier.
+        """
+        array = self.array5.copy()
+        array[10:13, 10:13] = self.array6
+        rois = []
+        for pix in [[11, 11], [50, 50]]:
+            x = numpy.arange(9) % 3 + (pix[1] - 1)
+            y = numpy.arange(9) % 3 + (pix[0] - 1)
+            rois.append((y, x))
+        control = region_grow_batch(array, rois, stddev_multiplier=1.0)
+        grown = region_grow_batch(array, rois, stddev_multiplier=1.0,
+                                  method='flood', nthreads=2)
+        for a, b in zip(control, grown):
+            a = numpy.sort(a[0] * 100 + a[1])
+            self.assertTrue((a == b[0] * 100 + b[1]).all())
+
+    def test_batch_threshold_length(self):
+        """
+        Test that per roi thresholds not matching the number of rois
+        raises an error.
+        """
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        rois = [(y, x), (y, x), (y, x)]
+        kwds = {'array': self.array3, 'roipixels': rois,
+                'threshold': [[10, 20], [20, 30]]}
+        self.assertRaises(ValueError, region_grow_batch, **kwds)
+
+    @unittest.skipIf(_idl_region_grow is None, "requires _idl_region_grow")
+    def test_iterate_statistics(self):
+        """
+        Test that the statistics returned by the iterative mode are those
+        of the final grown region.
+        """
+        # A ramp, so that each step widens the limits
+        array = numpy.add.outer(numpy.arange(100), numpy.arange(100)) * 0.1
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        grown, stats = region_grow(array, roi, stddev_multiplier=2.0,
+                                   iterate=True, statistics=True)
+        control = region_grow(array, roi, stddev_multiplier=2.0)
+        self.assertTrue(grown[0].shape[0] > control[0].shape[0])
+        self.assertTrue(stats['iterations'] > 1)
+        self.assertAlmostEqual(stats['mean'], array[grown].mean())
+        self.assertAlmostEqual(stats['stddev'], array[grown].std(ddof=1))
+
+    @unittest.skipIf(_idl_region_grow is None, "requires _idl_region_grow")
+    def test_iterate_offset(self):
+        """
+        Test that the statistics of the iterative mode are accurate for
+        data with a large offset.
+        """
+        array = 1e8 + numpy.random.normal(0, 1, (100, 100))
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        grown, stats = region_grow(array, roi, stddev_multiplier=1.0,
+                                   iterate=True, statistics=True)
+        values = array[grown]
+        self.assertTrue(stats['stddev'] > 0)
+        self.assertAlmostEqual(stats['mean'], values.mean(), places=5)
+        self.assertAlmostEqual(stats['stddev'], values.std(ddof=1), places=5)
+
+    @unittest.skipIf(_idl_region_grow is None, "requires _idl_region_grow")
+    def test_iterate_max_iterations(self):
+        """
+        Test that a single iteration yields the same region as the
+        non iterative stddev multiplier.
+        """
+        array = numpy.add.outer(numpy.arange(100), numpy.arange(100)) * 0.1
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        grown, stats = region_grow(array, roi, stddev_multiplier=2.0,
+                                   iterate=True, max_iterations=1,
+                                   statistics=True)
+        control = region_grow(array, roi, stddev_multiplier=2.0,
+                              method='flood')
+        self.assertEqual(stats['iterations'], 1)
+        self.assertTrue((grown[0] == control[0]).all())
+        self.assertTrue((grown[1] == control[1]).all())
+
+    def test_iterate_stddev(self):
+        """
+        Test that the iterative mode without a stddev multiplier raises
+        an error.
+        """
+        pix = [50, 50]
+        x = numpy.arange(9) % 3 + (pix[1] - 1)
+        y = numpy.arange(9) % 3 + (pix[0] - 1)
+        roi = (y, x)
+        kwds = {'array': self.array3, 'roipixels': roi, 'iterate': True,
+                'threshold': [10, 20]}
+        self.assertRaises(ValueError, region_grow, **kwds)
+
 if __name__ == '__main__':
     unittest.main()
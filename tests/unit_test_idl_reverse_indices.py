@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+
+from __future__ import absolute_import
+import sys
+import os
+import unittest
+import numpy
+
+# Need to temporarily append to the PYTHONPATH in order to import the 
+# newly built ReverseIndices class
+sys.path.append(os.getcwd())
+from idl_functions import histogram
+from idl_functions import ReverseIndices
+from idl_functions import CompressedReverseIndices
+
+
+class IDL_reverse_indices_Tester(unittest.TestCase):
+
+    """
+    A unit testing procedure for the ReverseIndices class.
+    """
+
+    def setUp(self):
+        self.array1 = numpy.random.randint(0, 11, (100, 100))
+        h = histogram(self.array1, minv=0, reverse_indices='ri')
+        self.hist = h['histogram']
+        self.raw = h['ri']
+        self.ri = ReverseIndices(h['ri'])
+
+    def test_nbins(self):
+        """
+        Test that the number of bins is retrieved from the offsets.
+        """
+        self.assertEqual(len(self.ri), self.hist.shape[0])
+        self.assertTrue((self.ri.histogram == self.hist).all())
+
+    def test_bin(self):
+        """
+        Test that a bin is a view of the reverse indices, containing the
+        indices of the data in that bin.
+        """
+        idx = self.ri.bin(5)
+        self.assertTrue(numpy.shares_memory(idx, self.raw))
+        control = numpy.where(self.array1.ravel() == 5)[0]
+        self.assertTrue((idx == control).all())
+
+    def test_raw_indexing(self):
+        """
+        Test that the raw reverse indices indexing is retained.
+        """
+        ri = self.ri
+        self.assertTrue((ri[ri[3]:ri[4]] == self.ri.bin(3)).all())
+
+    def test_bins(self):
+        """
+        Test that several bins are concatenated in the order given.
+        """
+        control = numpy.concatenate([self.ri.bin(7), self.ri.bin(2),
+                                     self.ri.bin(9)])
+        self.assertTrue((self.ri.bins([7, 2, 9]) == control).all())
+
+    def test_bins_consecutive(self):
+        """
+        Test that a run of consecutive bins is a view.
+        """
+        idx = self.ri.bins([3, 4, 5, 6])
+        self.assertTrue(numpy.shares_memory(idx, self.raw))
+        control = numpy.concatenate([self.ri.bin(i) for i in range(3, 7)])
+        self.assertTrue((idx == control).all())
+
+    def test_iterate(self):
+        """
+        Test that iteration yields only the non-empty bins.
+        """
+        a = numpy.array([0, 0, 5, 5, 5, 9])
+        ri = ReverseIndices(histogram(a, reverse_indices='ri')['ri'])
+        bins = [(i, idx.tolist()) for i, idx in ri]
+        self.assertEqual(bins, [(0, [0, 1]), (5, [2, 3, 4]), (9, [5])])
+
+    def test_coords(self):
+        """
+        Test that the co-ordinates of a bin index the data in that bin.
+        """
+        yx = self.ri.coords(8, self.array1.shape)
+        self.assertEqual(yx[0].shape[0], self.hist[8])
+        self.assertTrue((self.array1[yx] == 8).all())
+
+    def test_bin_out_of_bounds(self):
+        """
+        Test that a bin outside the histogram raises an error.
+        """
+        self.assertRaises(IndexError, self.ri.bin, 11)
+        self.assertRaises(IndexError, self.ri.bins, [1, -1])
+
+
+class IDL_compressed_reverse_indices_Tester(unittest.TestCase):
+
+    """
+    A unit testing procedure for the CompressedReverseIndices class.
+    """
+
+    def setUp(self):
+        self.array1 = numpy.random.randint(0, 11, (100, 100))
+        h = histogram(self.array1, minv=0, reverse_indices='ri')
+        self.raw = h['ri']
+        self.ri = CompressedReverseIndices(h['ri'])
+
+    def test_decompress(self):
+        """
+        Test that the raw reverse indices are recovered, including via
+        numpy.asarray and slicing.
+        """
+        raw = self.raw
+        ri = self.ri
+        self.assertTrue((ri.decompress() == raw).all())
+        self.assertTrue((numpy.asarray(ri) == raw).all())
+        self.assertTrue((ri[ri[3]:ri[4]] == raw[raw[3]:raw[4]]).all())
+        self.assertTrue((ri[5:200] == raw[5:200]).all())
+        self.assertEqual(ri[-1], raw[-1])
+        self.assertLess(ri.nbytes, raw.nbytes)
+
+    def test_bins(self):
+        """
+        Test the per-bin access against the raw reverse indices.
+        """
+        raw = ReverseIndices(self.raw)
+        ri = self.ri
+        self.assertEqual(len(ri), len(raw))
+        self.assertTrue((ri.histogram == raw.histogram).all())
+        for i in range(len(ri)):
+            self.assertTrue((ri.bin(i) == raw.bin(i)).all())
+        self.assertTrue((ri.bins([7, 2, 9]) == raw.bins([7, 2, 9])).all())
+        for (i, idx), (j, control) in zip(ri, raw):
+            self.assertTrue((idx == control).all())
+
+    def test_histogram_compress(self):
+        """
+        Test that histogram computes the compressed reverse indices over
+        chunks of the array, including a non-contiguous array.
+        """
+        from idl_functions import idl_histogram
+        chunk_size = idl_histogram.CHUNK_SIZE
+        idl_histogram.CHUNK_SIZE = 999
+        try:
+            for array in [self.array1, self.array1[:, ::3].astype('uint16')]:
+                h1 = histogram(array, reverse_indices='ri')
+                h2 = histogram(array, reverse_indices='ri', compress=True)
+                self.assertTrue(isinstance(h2['ri'], CompressedReverseIndices))
+                self.assertTrue((h1['histogram'] == h2['histogram']).all())
+                self.assertTrue((h2['ri'].decompress() == h1['ri']).all())
+        finally:
+            idl_histogram.CHUNK_SIZE = chunk_size
+
+if __name__ == '__main__':
+    unittest.main()